@@ -72,7 +72,7 @@ from xmodule.exceptions import SerializationError
 from xmodule.modulestore import COURSE_ROOT, LIBRARY_ROOT, ModuleStoreEnum
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import DuplicateCourseError, InvalidProctoringProvider, ItemNotFoundError
-from xmodule.modulestore.xml_exporter import export_course_to_xml, export_library_to_xml
+from xmodule.modulestore.xml_exporter import CourseExportManager, LibraryExportManager, export_to_tarball
 from xmodule.modulestore.xml_importer import CourseImportException, import_course_from_xml, import_library_from_xml
 from .outlines import update_outline_from_modulestore
 from .outlines_regenerate import CourseOutlineRegenerate
@@ -359,16 +359,20 @@ def create_export_tarball(course_block, course_key, context, status=None):
 
     try:
         if isinstance(course_key, LibraryLocator):
-            export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
+            export_manager_class, courselike_key = LibraryExportManager, course_key
         else:
-            export_course_to_xml(modulestore(), contentstore(), course_block.id, root_dir, name)
+            export_manager_class, courselike_key = CourseExportManager, course_block.id
 
-        if status:
-            status.set_state('Compressing')
-            status.increment_completed_steps()
+        # The static assets are streamed into the archive while the OLX is exported,
+        # so only the OLX is staged in root_dir.
         LOGGER.debug('tar file being generated at %s', export_file.name)
         with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
-            tar_file.add(root_dir / name, arcname=name)
+            export_to_tarball(
+                export_manager_class, modulestore(), contentstore(), courselike_key, root_dir, name, tar_file,
+            )
+            if status:
+                status.set_state('Compressing')
+                status.increment_completed_steps()
 
     except SerializationError as exc:
         LOGGER.exception('There was an error exporting %s', course_key, exc_info=True)
@@ -195,8 +195,8 @@ class TestCourseListing(ModuleStoreTestCase):
             # Verify fetched accessible courses list is a list of CourseSummery instances
             self.assertTrue(all(isinstance(course, CourseSummary) for course in courses_list_by_staff))
 
-            # Now count the db queries for staff
-            with check_mongo_calls(2):
+            # Now count the db queries for staff: the split course summaries are read from MySQL
+            with check_mongo_calls(1):
                 list(_accessible_courses_summary_iter(self.request))
 
     def test_get_course_list_with_invalid_course_location(self):
@@ -1327,6 +1327,12 @@ MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
 COURSE_IMPORT_EXPORT_STORAGE = 'django.core.files.storage.FileSystemStorage'
 COURSE_METADATA_EXPORT_STORAGE = 'django.core.files.storage.FileSystemStorage'
 
+# .. setting_name: COURSE_IMPORT_STATIC_CONTENT_WORKERS
+# .. setting_default: 4
+# .. setting_description: Number of static files of a course to upload concurrently to the
+#   content store during a course import.
+COURSE_IMPORT_STATIC_CONTENT_WORKERS = 4
+
 
 ##### EMBARGO #####
 EMBARGO_SITE_REDIRECT_URL = None
@@ -2437,6 +2443,33 @@ SOFTWARE_SECURE_VERIFICATION_ROUTING_KEY = 'edx.lms.core.default'
 # Rate limit for regrading tasks that a grading policy change can kick off
 POLICY_CHANGE_TASK_RATE_LIMIT = '900/h'
 
+# .. setting_name: POLICY_CHANGE_GRADES_MAX_CONCURRENT_TASKS
+# .. setting_default: 4
+# .. setting_description: Maximum number of regrading tasks that a grading policy change of a single
+#   course keeps queued or running at a time, so that regrading a large course does not saturate the
+#   grades queue.
+POLICY_CHANGE_GRADES_MAX_CONCURRENT_TASKS = 4
+
+# .. setting_name: POLICY_CHANGE_GRADES_TARGET_TASK_SECONDS
+# .. setting_default: 120
+# .. setting_description: Target duration, in seconds, of each regrading task kicked off by a grading
+#   policy change. The number of learners regraded by each task is adapted to the measured time it
+#   takes to regrade a learner in the course.
+POLICY_CHANGE_GRADES_TARGET_TASK_SECONDS = 120
+
+# .. setting_name: POLICY_CHANGE_GRADES_MAX_BATCH_SIZE
+# .. setting_default: 1000
+# .. setting_description: Maximum number of learners regraded by a single regrading task kicked off by
+#   a grading policy change.
+POLICY_CHANGE_GRADES_MAX_BATCH_SIZE = 1000
+
+# .. setting_name: POLICY_CHANGE_GRADES_STALE_SECONDS
+# .. setting_default: 3600
+# .. setting_description: Number of seconds after which a regrade kicked off by a grading policy change
+#   whose progress was not updated, such as when its tasks were killed, is considered abandoned. Must be
+#   longer than the time limit of a regrading task.
+POLICY_CHANGE_GRADES_STALE_SECONDS = 3600
+
 # .. setting_name: DEFAULT_GRADE_DESIGNATIONS
 # .. setting_default: ['A', 'B', 'C', 'D']
 # .. setting_description: The default 'pass' grade cutoff designations to be used. The failure grade
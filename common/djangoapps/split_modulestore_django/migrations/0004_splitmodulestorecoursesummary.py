@@ -0,0 +1,28 @@
+# Generated by Django 3.2.23 on 2026-10-16 10:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('split_modulestore_django', '0003_alter_historicalsplitmodulestorecourseindex_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SplitModulestoreCourseSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('branch', models.CharField(max_length=255)),
+                ('version', models.CharField(max_length=24)),
+                ('course_info', models.JSONField(default=dict)),
+                ('course_index', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='summaries', to='split_modulestore_django.splitmodulestorecourseindex')),
+            ],
+            options={
+                'verbose_name_plural': 'Split modulestore course summaries',
+                'unique_together': {('course_index', 'branch')},
+            },
+        ),
+    ]
@@ -163,3 +163,31 @@ class SplitModulestoreCourseIndex(models.Model):
         # But don't validate_unique(), it just runs extra queries and the database enforces it anyways.
         self.full_clean(validate_unique=False)
         return super().save(*args, **kwargs)
+
+
+class SplitModulestoreCourseSummary(models.Model):
+    """
+    A materialized summary of the root block of one branch of a course in split modulestore.
+
+    This stores the fields of the course block that CourseSummary needs, so that course
+    summaries can be listed without loading each course's structure from MongoDB. It is
+    written when the course index is updated to point to a new version of the branch.
+    The version it was computed from is stored with it, so a summary that doesn't match the
+    current version of its branch in the course index is out of date and is ignored.
+
+    .. no_pii:
+    """
+    course_index = models.ForeignKey(SplitModulestoreCourseIndex, on_delete=models.CASCADE, related_name="summaries")
+    # The full name of the branch, e.g. ModuleStoreEnum.BranchName.draft
+    branch = models.CharField(max_length=255)
+    # The ObjectId of the structure that this summary was computed from, hex-encoded.
+    version = models.CharField(max_length=24)
+    # The {field name: json value} dict of the summary fields set on the course block.
+    course_info = models.JSONField(default=dict)
+
+    def __str__(self):
+        return f"Course Summary ({self.course_index.course_id}, {self.branch})"
+
+    class Meta:
+        unique_together = [("course_index", "branch")]
+        verbose_name_plural = "Split modulestore course summaries"
@@ -0,0 +1,51 @@
+""" Unit tests for the materialized SplitModulestoreCourseSummary projection """
+
+from common.djangoapps.split_modulestore_django.models import SplitModulestoreCourseSummary
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, check_mongo_calls
+
+
+class SplitModulestoreCourseSummaryTest(ModuleStoreTestCase):
+    """ Unit tests for the course summaries of split modulestore """
+
+    def setUp(self):
+        super().setUp()
+        self.split_store = self.store._get_modulestore_by_type(  # pylint: disable=protected-access
+            ModuleStoreEnum.Type.split
+        )
+        self.courses = [
+            CourseFactory.create(org='SummaryX', number=f'Course{number}', run='Run', display_name=f'Course {number}')
+            for number in range(3)
+        ]
+
+    def get_summaries(self, **kwargs):
+        with self.split_store.branch_setting(ModuleStoreEnum.Branch.draft_preferred):
+            return self.split_store.get_course_summaries(**kwargs)
+
+    def test_summaries_kept_up_to_date(self):
+        with check_mongo_calls(0):
+            summaries = self.get_summaries()
+        assert [summary.display_name for summary in summaries] == ['Course 0', 'Course 1', 'Course 2']
+
+        self.courses[1].display_name = 'Renamed'
+        self.update_course(self.courses[1], self.user.id)
+        with check_mongo_calls(0):
+            summaries = self.get_summaries()
+        assert summaries[1].display_name == 'Renamed'
+        assert summaries[1].id == self.courses[1].id
+
+    def test_paged_summaries(self):
+        with check_mongo_calls(0):
+            summaries = self.get_summaries(offset=1, limit=1)
+        assert [summary.id for summary in summaries] == [self.courses[1].id]
+        assert [summary.id for summary in self.get_summaries(offset=2, limit=10)] == [self.courses[2].id]
+
+    def test_missing_summaries_computed(self):
+        SplitModulestoreCourseSummary.objects.all().delete()
+        with check_mongo_calls(1):
+            summaries = self.get_summaries()
+        assert [summary.display_name for summary in summaries] == ['Course 0', 'Course 1', 'Course 2']
+        assert SplitModulestoreCourseSummary.objects.filter(branch=ModuleStoreEnum.BranchName.draft).count() == 3
+        with check_mongo_calls(0):
+            assert len(self.get_summaries()) == 3
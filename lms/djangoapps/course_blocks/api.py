@@ -12,6 +12,7 @@ from openedx.core.djangoapps.content.block_structure.api import get_block_struct
 from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
 from openedx.features.content_type_gating.block_transformers import ContentTypeGateTransformer
 
+from .transformed_cache import get_effective_view_key, transformed_cache
 from .transformers import library_content, load_override_data, start_date, user_partitions, visibility
 from .usage_info import CourseUsageInfo
 
@@ -93,6 +94,12 @@ def get_course_blocks(
             exactly equivalent to the blocks that the given user has
             access.
     """
+    use_transformed_cache = (
+        not transformers and
+        not include_completion and
+        not has_individual_student_override_provider() and
+        transformed_cache.is_enabled()
+    )
     if not transformers:
         transformers = BlockStructureTransformers(get_course_block_access_transformers(user))
     if include_completion:
@@ -104,8 +111,97 @@ def get_course_blocks(
         include_has_scheduled_content
     )
 
-    return get_block_structure_manager(starting_block_usage_key.course_key).get_transformed(
+    block_structure_manager = get_block_structure_manager(starting_block_usage_key.course_key)
+    if use_transformed_cache:
+        return _get_shared_transformed(
+            block_structure_manager,
+            transformers,
+            starting_block_usage_key,
+            collected_block_structure,
+        )
+
+    return block_structure_manager.get_transformed(
         transformers,
         starting_block_usage_key,
         collected_block_structure,
     )
+
+
+def get_course_blocks_for_users(
+        users,
+        starting_block_usage_key,
+        collected_block_structure=None,
+        allow_start_dates_in_future=False,
+        include_has_scheduled_content=False,
+):
+    """
+    Returns a list of block structures transformed by the default course
+    block access transformers for each of the given users, starting at
+    starting_block_usage_key.
+
+    Equivalent to calling get_course_blocks for each user, except that
+    the collected block structure is only retrieved and indexed once, and
+    the access filters of all users are applied as masks over the same
+    block table.
+
+    Arguments:
+        users ([django.contrib.auth.models.User]) - Users for which the
+            block structure is to be transformed.
+
+        starting_block_usage_key (UsageKey) - Specifies the starting block
+            of the block structure that is to be transformed.
+
+        collected_block_structure (BlockStructureBlockData) - A
+            block structure retrieved from a prior call to
+            BlockStructureManager.get_collected.  Can be optionally
+            provided if already available, for optimization.
+
+    Returns:
+        [BlockStructureBlockData] - The transformed block structures, in
+            the order of the given users.
+    """
+    transformers_list = []
+    for user in users:
+        transformers = BlockStructureTransformers(get_course_block_access_transformers(user))
+        transformers.usage_info = CourseUsageInfo(
+            starting_block_usage_key.course_key,
+            user,
+            allow_start_dates_in_future,
+            include_has_scheduled_content
+        )
+        transformers_list.append(transformers)
+
+    block_structure_manager = get_block_structure_manager(starting_block_usage_key.course_key)
+    return block_structure_manager.get_transformed_for_usages(
+        transformers_list,
+        starting_block_usage_key,
+        collected_block_structure,
+    )
+
+
+def _get_shared_transformed(block_structure_manager, transformers, starting_block_usage_key, collected_block_structure):
+    """
+    Returns a copy of the block structure transformed by the default
+    course block access transformers, shared by all users with the same
+    effective view of the course as the user in transformers.usage_info.
+    """
+    if not collected_block_structure:
+        collected_block_structure = block_structure_manager.get_collected()
+
+    cache_key = get_effective_view_key(transformers.usage_info, starting_block_usage_key, collected_block_structure)
+    if cache_key is None:
+        return block_structure_manager.get_transformed(
+            transformers,
+            starting_block_usage_key,
+            collected_block_structure,
+        )
+
+    block_structure = transformed_cache.get(cache_key)
+    if block_structure is None:
+        block_structure = block_structure_manager.get_transformed(
+            transformers,
+            starting_block_usage_key,
+            collected_block_structure,
+        )
+        transformed_cache.set(cache_key, block_structure)
+    return block_structure.copy()
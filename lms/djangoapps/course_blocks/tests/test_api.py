@@ -0,0 +1,51 @@
+"""
+Tests for the course_blocks API.
+"""
+
+
+from datetime import datetime, timedelta
+
+from pytz import UTC
+
+from common.djangoapps.student.tests.factories import CourseEnrollmentFactory, UserFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import BlockFactory, CourseFactory
+
+from ..api import get_course_blocks, get_course_blocks_for_users
+
+
+class GetCourseBlocksForUsersTestCase(ModuleStoreTestCase):
+    """
+    Tests for get_course_blocks_for_users.
+    """
+    def setUp(self):
+        super().setUp()
+        self.course = CourseFactory.create()
+        chapter = BlockFactory.create(parent=self.course, category='chapter')
+        sequential = BlockFactory.create(parent=chapter, category='sequential')
+        BlockFactory.create(parent=sequential, category='vertical')
+        BlockFactory.create(parent=chapter, category='sequential', visible_to_staff_only=True)
+        BlockFactory.create(
+            parent=self.course, category='chapter', start=datetime.now(UTC) + timedelta(days=10),
+        )
+
+        self.users = [UserFactory.create() for _ in range(2)]
+        for user in self.users:
+            CourseEnrollmentFactory.create(user=user, course_id=self.course.id)
+        self.users.append(UserFactory.create(is_staff=True))
+        self.users.append(UserFactory.create())
+
+    def test_same_as_get_course_blocks(self):
+        block_structures = get_course_blocks_for_users(self.users, self.course.location)
+        assert len(block_structures) == len(self.users)
+
+        for user, block_structure in zip(self.users, block_structures):
+            expected_block_structure = get_course_blocks(user, self.course.location)
+            assert block_structure.root_block_usage_key == expected_block_structure.root_block_usage_key
+            assert set(block_structure) == set(expected_block_structure)
+            for block_key in expected_block_structure:
+                assert block_structure.get_children(block_key) == expected_block_structure.get_children(block_key)
+                assert block_structure.get_parents(block_key) == expected_block_structure.get_parents(block_key)
+
+        # the staff user sees the blocks hidden from students
+        assert len(block_structures[2]) > len(block_structures[0])
@@ -0,0 +1,106 @@
+"""
+Tests for the transformed block structure cache.
+"""
+
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from freezegun import freeze_time
+from pytz import UTC
+
+from common.djangoapps.student.tests.factories import CourseEnrollmentFactory, UserFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import BlockFactory, CourseFactory
+
+from ..api import get_course_blocks
+from ..transformed_cache import transformed_cache
+
+
+@override_settings(BLOCK_STRUCTURES_SETTINGS={
+    'COURSE_PUBLISH_TASK_DELAY': 30,
+    'TASK_DEFAULT_RETRY_DELAY': 30,
+    'TASK_MAX_RETRIES': 5,
+    'TRANSFORMED_CACHE_MAX_SIZE': 10,
+})
+class TransformedCacheTestCase(ModuleStoreTestCase):
+    """
+    Tests for sharing transformed block structures between users.
+    """
+    def setUp(self):
+        super().setUp()
+        self.course = CourseFactory.create()
+        chapter = BlockFactory.create(parent=self.course, category='chapter')
+        BlockFactory.create(parent=chapter, category='sequential')
+        BlockFactory.create(parent=chapter, category='sequential', visible_to_staff_only=True)
+
+        self.students = [UserFactory.create() for _ in range(2)]
+        for student in self.students:
+            CourseEnrollmentFactory.create(user=student, course_id=self.course.id)
+        self.staff = UserFactory.create(is_staff=True)
+
+        transformed_cache.clear()
+        self.addCleanup(transformed_cache.clear)
+
+    def test_shared_between_students(self):
+        block_structures = [get_course_blocks(student, self.course.location) for student in self.students]
+
+        assert set(block_structures[0]) == set(block_structures[1])
+        assert len(block_structures[0]) == 3
+        assert block_structures[0] is not block_structures[1]
+        assert transformed_cache.stats()['hits'] == 1
+
+    def test_not_shared_with_staff(self):
+        student_block_structure = get_course_blocks(self.students[0], self.course.location)
+        staff_block_structure = get_course_blocks(self.staff, self.course.location)
+
+        assert len(staff_block_structure) == 4
+        assert len(student_block_structure) == 3
+        assert transformed_cache.stats()['hits'] == 0
+
+    def test_not_shared_after_start_date(self):
+        now = datetime.now(UTC)
+        BlockFactory.create(parent=self.course, category='chapter', start=now + timedelta(hours=1))
+
+        with freeze_time(now):
+            assert len(get_course_blocks(self.students[0], self.course.location)) == 3
+            assert len(get_course_blocks(self.students[1], self.course.location)) == 3
+        assert transformed_cache.stats()['hits'] == 1
+
+        with freeze_time(now + timedelta(hours=1, seconds=1)):
+            assert len(get_course_blocks(self.students[1], self.course.location)) == 4
+        assert transformed_cache.stats()['hits'] == 1
+
+    def test_custom_transformers_not_cached(self):
+        get_course_blocks(self.students[0], self.course.location, include_completion=True)
+        assert transformed_cache.stats()['size'] == 0
+
+    def test_hit_queries(self):
+        """
+        A cache hit costs a constant number of queries per learner, fewer
+        than transforming the structure.
+        """
+        student = UserFactory.create()
+        CourseEnrollmentFactory.create(user=student, course_id=self.course.id)
+
+        def _count_queries(user):
+            """
+            Returns the number of queries made to get the course blocks of
+            the user, without the access roles cached on the user object.
+            """
+            user = get_user_model().objects.get(id=user.id)
+            with CaptureQueriesContext(connection) as queries:
+                get_course_blocks(user, self.course.location)
+            return len(queries)
+
+        _count_queries(self.students[0])
+        hit_query_counts = [_count_queries(self.students[1]), _count_queries(student)]
+        assert transformed_cache.stats()['hits'] == 2
+
+        transformed_cache.clear()
+        miss_query_count = _count_queries(self.students[0])
+
+        assert hit_query_counts[0] == hit_query_counts[1]
+        assert hit_query_counts[0] < miss_query_count
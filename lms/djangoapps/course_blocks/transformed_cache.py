@@ -0,0 +1,141 @@
+"""
+Optional process-local cache of block structures transformed by the
+default course block access transformers.
+
+Most learners in a course share the same partition group memberships and
+access results, and therefore the same transformed view of the course.
+Transformed structures are cached under a digest of everything the
+default access transformers depend on for a user:
+
+    * the version of the collected course content,
+    * the starting block and the CourseUsageInfo options,
+    * the user's staff and beta tester access,
+    * whether content type gating applies to the user's enrollment,
+    * the user's group in each of the course's user partitions,
+    * the user's (possibly personalized) dates, and
+    * the next start date of the course's blocks for the user, so that
+      an entry is no longer used once a block it hides becomes visible.
+
+Learners with the same digest share a single transformed structure.
+Requests that depend on data outside of the digest, such as learner
+specific library content selections, masquerading or individual
+student overrides, are never cached.
+"""
+
+
+import hashlib
+from datetime import datetime, timedelta
+
+from edx_when.api import get_dates_for_course
+from pytz import UTC
+
+from common.djangoapps.student.roles import CourseBetaTesterRole
+from lms.djangoapps.courseware.masquerade import get_course_masquerade
+from openedx.core.djangoapps.content.block_structure.process_cache import BlockStructureProcessCache
+from openedx.features.content_type_gating.models import ContentTypeGatingConfig
+from xmodule.partitions.partitions_service import get_user_partition_groups
+
+from .transformers.library_content import ContentLibraryTransformer
+from .transformers.start_date import StartDateTransformer
+from .transformers.user_partitions import UserPartitionTransformer
+
+# .. setting_name: BLOCK_STRUCTURES_SETTINGS['TRANSFORMED_CACHE_MAX_SIZE']
+# .. setting_default: 0
+# .. setting_description: Maximum number of block structures transformed for a user's effective
+#   view of a course to keep in each process, to be shared by learners with the same view.
+#   Set to 0 to disable the transformed block structure cache.
+transformed_cache = BlockStructureProcessCache(
+    max_size_setting='TRANSFORMED_CACHE_MAX_SIZE',
+    metric_name='course_blocks.transformed_cache_hit',
+    replace_outdated=False,
+)
+
+
+def get_effective_view_key(usage_info, starting_block_usage_key, collected_block_structure):
+    """
+    Returns the cache key for the effective view of the course of the
+    user in the given usage_info, as transformed by the default course
+    block access transformers.  Returns None if the view can't be
+    shared with other users.
+
+    Arguments:
+        usage_info (CourseUsageInfo) - The usage info for the transformation.
+
+        starting_block_usage_key (UsageKey) - The starting block of the
+            transformation.
+
+        collected_block_structure (BlockStructureBlockData) - The collected
+            block structure that is to be transformed.
+    """
+    user = usage_info.user
+    course_key = usage_info.course_key
+    if not user.is_authenticated or get_course_masquerade(user, course_key):
+        return None
+
+    # Structures collected before this data was collected are never shared.
+    if collected_block_structure.get_transformer_data(ContentLibraryTransformer, 'has_library_content', True):
+        return None
+    start_dates = collected_block_structure.get_transformer_data(StartDateTransformer, StartDateTransformer.START_DATES)
+    if start_dates is None:
+        return None
+
+    root_block_usage_key = collected_block_structure.root_block_usage_key
+    content_version = collected_block_structure.get_xblock_field(root_block_usage_key, 'course_version')
+    if content_version is None:
+        return None
+
+    user_partitions = collected_block_structure.get_transformer_data(UserPartitionTransformer, 'user_partitions')
+    user_groups = get_user_partition_groups(course_key, user_partitions or [], user, 'id') if user_partitions else {}
+    # Same arguments as the DateOverrideTransformer, so that the dates are
+    # read once per request, from the request cache, on a cache miss.
+    user_dates = get_dates_for_course(course_key, user)
+    # The roles of the user are cached on the user when checking staff access.
+    has_staff_access = usage_info.has_staff_access
+    is_beta_tester = CourseBetaTesterRole(course_key).has_user(user)
+    if has_staff_access or usage_info.allow_start_dates_in_future:
+        next_start_date = None
+    else:
+        next_start_date = _get_next_start_date(start_dates, is_beta_tester)
+
+    view_data = (
+        str(content_version),
+        str(collected_block_structure.get_xblock_field(root_block_usage_key, 'subtree_edited_on')),
+        usage_info.allow_start_dates_in_future,
+        usage_info.include_has_scheduled_content,
+        has_staff_access,
+        is_beta_tester,
+        _is_content_type_gating_enabled(user, course_key),
+        sorted((partition_id, getattr(group, 'id', None)) for partition_id, group in user_groups.items()),
+        sorted((str(location), field, str(date)) for (location, field), date in user_dates.items()),
+        str(next_start_date),
+    )
+    digest = hashlib.sha1(repr(view_data).encode('utf-8')).hexdigest()
+    return starting_block_usage_key, digest
+
+
+def _get_next_start_date(start_dates, is_beta_tester):
+    """
+    Returns the earliest of the given start dates of blocks, as collected by
+    the StartDateTransformer, that hasn't passed yet for the user, or None.
+    The blocks visible to the user don't change until that date passes.
+    """
+    now = datetime.now(UTC)
+    next_start_date = None
+    for start, days_early_for_beta in start_dates:
+        if is_beta_tester and days_early_for_beta is not None:
+            start -= timedelta(days_early_for_beta)
+        # Blocks are visible once now is after their start date.
+        if start >= now and (next_start_date is None or start < next_start_date):
+            next_start_date = start
+    return next_start_date
+
+
+def _is_content_type_gating_enabled(user, course_key):
+    """
+    Returns whether content type gating applies to the user's enrollment
+    in the course, without reading the enrollment if gating is disabled
+    for the course.
+    """
+    if not ContentTypeGatingConfig.current(course_key=course_key).enabled:
+        return False
+    return ContentTypeGatingConfig.enabled_for_enrollment(user=user, course_key=course_key)
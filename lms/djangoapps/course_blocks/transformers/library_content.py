@@ -30,7 +30,7 @@ class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransfo
 
     Staff users are not to be exempted from library content pathways.
     """
-    WRITE_VERSION = 1
+    WRITE_VERSION = 2
     READ_VERSION = 1
 
     @classmethod
@@ -50,6 +50,11 @@ class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransfo
         block_structure.request_xblock_fields('mode')
         block_structure.request_xblock_fields('max_count')
         block_structure.request_xblock_fields('category')
+        block_structure.set_transformer_data(
+            cls,
+            'has_library_content',
+            any(block_key.block_type == 'library_content' for block_key in block_structure),
+        )
         store = modulestore()
 
         # needed for analytics purposes
@@ -32,9 +32,10 @@ class StartDateTransformer(FilteringTransformerMixin, BlockStructureTransformer)
 
     Staff users are exempted from visibility rules.
     """
-    WRITE_VERSION = 1
+    WRITE_VERSION = 2
     READ_VERSION = 1
     MERGED_START_DATE = 'merged_start_date'
+    START_DATES = 'start_dates'
 
     @classmethod
     def name(cls):
@@ -89,6 +90,17 @@ class StartDateTransformer(FilteringTransformerMixin, BlockStructureTransformer)
             func_merge_ancestors=max,
         )
 
+        # The distinct merged start dates of the blocks, with their days_early_for_beta,
+        # from which the times at which the visible blocks change can be found without
+        # traversing the blocks.
+        block_structure.set_transformer_data(cls, cls.START_DATES, list({
+            (
+                cls._get_merged_start_date(block_structure, block_key),
+                getattr(block_structure.get_xblock(block_key), 'days_early_for_beta', None),
+            )
+            for block_key in block_structure
+        }))
+
     def transform_block_filters(self, usage_info, block_structure):
         # Users with staff access bypass the Start Date check.
         if usage_info.has_staff_access or usage_info.allow_start_dates_in_future:
@@ -7,6 +7,7 @@ import json
 import logging
 import textwrap
 from collections import OrderedDict
+from contextlib import nullcontext
 
 from functools import partial
 
@@ -61,9 +62,10 @@ from lms.djangoapps.courseware.masquerade import (
     is_masquerading_as_specific_student,
     setup_masquerade
 )
-from lms.djangoapps.courseware.model_data import DjangoKeyValueStore, FieldDataCache
+from lms.djangoapps.courseware.model_data import DjangoKeyValueStore, FieldDataCache, user_state_write_behind
 from lms.djangoapps.courseware.field_overrides import OverrideFieldData
 from lms.djangoapps.courseware.services import UserStateService
+from lms.djangoapps.courseware.toggles import courseware_user_state_write_behind_is_enabled
 from lms.djangoapps.grades.api import GradesUtilService
 from lms.djangoapps.lms_xblock.field_data import LmsFieldData
 from lms.djangoapps.lms_xblock.runtime import UserTagsService, lms_wrappers_aside, lms_applicable_aside_types
@@ -911,7 +913,13 @@ def _invoke_xblock_handler(request, course_id, usage_id, handler, suffix, course
 
     set_custom_attributes_for_course_key(course_key)
 
-    with modulestore().bulk_operations(course_key):
+    # Coalesce the learner state changes made by the handler, and write them once it returns.
+    if courseware_user_state_write_behind_is_enabled(course_key):
+        write_behind = user_state_write_behind()
+    else:
+        write_behind = nullcontext()
+
+    with modulestore().bulk_operations(course_key), write_behind:
         usage_key = _get_usage_key_for_course(course_key, usage_id)
         if is_xblock_aside(usage_key):
             # Get the usage key for the block being wrapped by the aside (not the aside itself)
@@ -14,7 +14,7 @@ for specific scopes. The individual classes provide the knowledge of what are th
 pieces of information for each scope, and thus how to cache, prefetch, and create new field data
 entries.
 
-UserStateCache: A cache for Scope.user_state
+UserStateCache: A cache for Scope.user_state, which can buffer its writes until flushed
 UserStateSummaryCache: A cache for Scope.user_state_summary
 PreferencesCache: A cache for Scope.preferences
 UserInfoCache: A cache for Scope.user_info
@@ -26,8 +26,11 @@ import json
 import logging
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict, namedtuple
+from contextlib import contextmanager
 
 from django.db import DatabaseError, IntegrityError, transaction
+from edx_django_utils import monitoring as monitoring_utils
+from edx_django_utils.cache import RequestCache
 from opaque_keys.edx.asides import AsideUsageKeyV1, AsideUsageKeyV2
 from opaque_keys.edx.block_types import BlockTypeKeyV1
 from opaque_keys.edx.keys import LearningContextKey
@@ -43,6 +46,9 @@ from .models import StudentModule, XModuleStudentInfoField, XModuleStudentPrefsF
 
 log = logging.getLogger(__name__)
 
+WRITE_BEHIND_REQUEST_CACHE_NAMESPACE = 'courseware.model_data.write_behind'
+WRITE_BEHIND_CACHES_KEY = 'field_data_caches'
+
 
 class InvalidWriteError(Exception):
     """
@@ -82,6 +88,68 @@ def _all_block_types(blocks, aside_types):
     return block_types
 
 
+@contextmanager
+def user_state_write_behind():
+    """
+    Buffer the Scope.user_state writes of the FieldDataCaches created in this
+    context, coalescing them per block, and write them when the context exits.
+
+    The buffered writes of every cache are attempted, even if some of them
+    fail. If the context exits with an exception, the buffered writes are
+    still attempted, and a failure to save them is chained to that exception.
+
+    Raises: KeyValueMultiSaveError if the buffered writes of any cache fail to save
+    """
+    request_cache = RequestCache(WRITE_BEHIND_REQUEST_CACHE_NAMESPACE)
+    if request_cache.get_cached_response(WRITE_BEHIND_CACHES_KEY).is_found:
+        # Already buffering: the outermost context writes the changes.
+        yield
+        return
+
+    field_data_caches = []
+    request_cache.set(WRITE_BEHIND_CACHES_KEY, field_data_caches)
+    try:
+        yield
+    except Exception as exc:
+        request_cache.delete(WRITE_BEHIND_CACHES_KEY)
+        _flush_write_behind_caches(field_data_caches, cause=exc)
+        raise
+    request_cache.delete(WRITE_BEHIND_CACHES_KEY)
+    _flush_write_behind_caches(field_data_caches)
+
+
+def _flush_write_behind_caches(field_data_caches, cause=None):
+    """
+    Flush each of the `field_data_caches`, even if flushing an earlier one fails.
+
+    Arguments:
+        field_data_caches (list): The FieldDataCaches to flush.
+        cause (Exception): The exception to chain a failure to save to, if any.
+
+    Raises: KeyValueMultiSaveError listing the fields saved by the failed flushes,
+        if any of the caches fail to save
+    """
+    failures = []
+    for field_data_cache in field_data_caches:
+        try:
+            field_data_cache.flush()
+        except KeyValueMultiSaveError as exc:
+            failures.append(exc)
+
+    if failures:
+        saved_field_names = [name for exc in failures for name in exc.saved_field_names]
+        raise KeyValueMultiSaveError(saved_field_names) from cause
+
+
+def _write_behind_caches():
+    """
+    Return the list of FieldDataCaches buffering their writes in this request,
+    or None if writes aren't buffered.
+    """
+    cached_response = RequestCache(WRITE_BEHIND_REQUEST_CACHE_NAMESPACE).get_cached_response(WRITE_BEHIND_CACHES_KEY)
+    return cached_response.value if cached_response.is_found else None
+
+
 class DjangoKeyValueStore(KeyValueStore):
     """
     This KeyValueStore will read and write data in the following scopes to django models
@@ -334,11 +402,21 @@ class UserStateCache:
     """
     Cache for Scope.user_state xblock field data.
     """
-    def __init__(self, user, course_id):
+    def __init__(self, user, course_id, write_behind=False):
+        """
+        Arguments:
+            user: The user whose state is cached
+            course_id: The id of the current course
+            write_behind (bool): Whether to buffer the writes until :meth:`flush` is called,
+                rather than writing them right away
+        """
         self._cache = defaultdict(dict)
         self.course_id = course_id
         self.user = user
+        self.write_behind = write_behind
         self._client = DjangoXBlockUserStateClient(self.user)
+        self._buffered_updates = defaultdict(dict)
+        self._buffered_write_count = 0
 
     def cache_fields(self, fields, xblocks, aside_types):  # pylint: disable=unused-argument
         """
@@ -376,6 +454,7 @@ class UserStateCache:
 
         Returns: datetime if there was a modified date, or None otherwise
         """
+        self.flush()
         try:
             return self._client.get(
                 self.user.username,
@@ -399,6 +478,46 @@ class UserStateCache:
 
             pending_updates[cache_key][kvs_key.field_name] = value
 
+        if self.write_behind:
+            for cache_key, field_state in pending_updates.items():
+                self._buffered_updates[cache_key].update(field_state)
+            self._buffered_write_count += len(pending_updates)
+            self._cache.update(pending_updates)
+            return
+
+        try:
+            self._write(pending_updates)
+        finally:
+            self._cache.update(pending_updates)
+
+    def flush(self):
+        """
+        Write the updates buffered since the last flush, if any.
+
+        Raises: KeyValueMultiSaveError if the updates fail to save
+        """
+        if not self._buffered_updates:
+            return
+
+        buffered_updates = self._buffered_updates
+        self._buffered_updates = defaultdict(dict)
+        monitoring_utils.accumulate('xb_user_state.write_behind.writes_buffered', self._buffered_write_count)
+        monitoring_utils.accumulate(
+            'xb_user_state.write_behind.writes_coalesced',
+            self._buffered_write_count - len(buffered_updates),
+        )
+        self._buffered_write_count = 0
+        self._write(buffered_updates)
+
+    def _write(self, pending_updates):
+        """
+        Write the supplied updates to the database.
+
+        Arguments:
+            pending_updates (dict): A dictionary mapping block keys to dicts of field values to set.
+
+        Raises: KeyValueMultiSaveError if the updates fail to save
+        """
         try:
             self._client.set_many(
                 self.user.username,
@@ -407,8 +526,6 @@ class UserStateCache:
         except DatabaseError:
             log.exception("Saving user state failed for %s", self.user.username)
             raise KeyValueMultiSaveError([])  # lint-amnesty, pylint: disable=raise-missing-from
-        finally:
-            self._cache.update(pending_updates)
 
     def get(self, kvs_key):
         """
@@ -444,6 +561,7 @@ class UserStateCache:
         if kvs_key.field_name not in field_state:
             raise KeyError(kvs_key.field_name)
 
+        self.flush()
         self._client.delete(self.user.username, cache_key, fields=[kvs_key.field_name])
         del field_state[kvs_key.field_name]
 
@@ -665,7 +783,7 @@ class FieldDataCache:
     A cache of django model objects needed to supply the data
     for a block and its descendants
     """
-    def __init__(self, blocks, course_id, user, asides=None, read_only=False):
+    def __init__(self, blocks, course_id, user, asides=None, read_only=False, write_behind=False):
         """
         Find any courseware.models objects that are needed by any block
         in blocks. Attempts to minimize the number of queries to the database.
@@ -678,6 +796,8 @@ class FieldDataCache:
         user: The user for which to cache data
         asides: The list of aside types to load, or None to prefetch no asides.
         read_only: We should not perform writes (they become a no-op).
+        write_behind: Buffer the Scope.user_state writes until :meth:`flush` is called. They are
+            also buffered if this cache is created within :func:`user_state_write_behind`.
         """
         if asides is None:
             self.asides = []
@@ -689,10 +809,16 @@ class FieldDataCache:
         self.user = user
         self.read_only = read_only
 
+        write_behind_caches = _write_behind_caches()
+        if write_behind_caches is not None:
+            write_behind_caches.append(self)
+            write_behind = True
+
         self.cache = {
             Scope.user_state: UserStateCache(
                 self.user,
                 self.course_id,
+                write_behind=write_behind,
             ),
             Scope.user_info: UserInfoCache(
                 self.user,
@@ -843,6 +969,18 @@ class FieldDataCache:
                 log.exception('Error saving fields %r', [key.field_name for key in set_many_data])
                 raise KeyValueMultiSaveError(saved_fields + exc.saved_field_names)  # lint-amnesty, pylint: disable=raise-missing-from
 
+    def flush(self):
+        """
+        Write the Scope.user_state changes buffered by this cache, if it buffers its writes.
+
+        Raises: KeyValueMultiSaveError if any fields fail to save
+        """
+        try:
+            self.cache[Scope.user_state].flush()
+        except KeyValueMultiSaveError:
+            log.exception('Error saving buffered user state fields')
+            raise
+
     def delete(self, key):
         """
         Delete the value specified by `key`.
@@ -966,6 +1104,29 @@ class ScoresClient:
         client.fetch_scores(scorable_locations)
         return client
 
+    @classmethod
+    def create_for_users(cls, course_id, user_ids, scorable_locations):
+        """
+        Create ScoresClients with pre-fetched data for the given locations for
+        each of the given users, using a single query.  Returns a dict of user
+        ids to ScoresClients.
+        """
+        clients = {user_id: cls(course_id, user_id) for user_id in user_ids}
+        scores_qset = StudentModule.objects.filter(
+            student_id__in=list(clients),
+            course_id=course_id,
+            module_state_key__in=set(scorable_locations),
+        )
+        for user_id, location, correct, total, created in scores_qset.values_list(
+            'student_id', 'module_state_key', 'grade', 'max_grade', 'created',
+        ):
+            clients[user_id]._locations_to_scores[location.map_into_course(course_id)] = cls.Score(  # pylint: disable=protected-access
+                correct, total, created,
+            )
+        for client in clients.values():
+            client._has_fetched = True  # pylint: disable=protected-access
+        return clients
+
 
 def set_score(user_id, usage_key, score, max_score):
     """
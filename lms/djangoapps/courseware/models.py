@@ -22,18 +22,25 @@ from django.contrib.auth import get_user_model
 from django.conf import settings
 from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models import Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal
 
 from django.utils.translation import gettext_lazy as _
 from edx_django_utils.cache.utils import RequestCache
 from model_utils.models import TimeStampedModel
 from opaque_keys.edx.django.models import BlockTypeKeyField, CourseKeyField, LearningContextKeyField, UsageKeyField
 from lms.djangoapps.courseware.fields import UnsignedBigIntAutoField
+from lms.djangoapps.courseware.user_state_snapshot import invalidate_snapshot
 
 from openedx.core.djangolib.markup import HTML
 
 log = logging.getLogger("edx.courseware")
 
+# Sent with the StudentModules written by bulk inserts or updates, which don't send post_save.
+# Arguments: sender (StudentModule), instances (list of StudentModule)
+student_modules_bulk_saved = Signal()
+
 
 def chunks(items, chunk_size):
     """
@@ -179,6 +186,26 @@ class StudentModule(models.Model):
             )
 
 
+def invalidate_user_state_snapshot(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the cached snapshot of the user state that includes the saved or deleted StudentModule.
+    """
+    invalidate_snapshot(instance.student_id, instance.course_id)
+
+
+def invalidate_user_state_snapshots(sender, instances, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the cached snapshots of the user state that include the bulk saved StudentModules.
+    """
+    for user_id, course_key in {(instance.student_id, instance.course_id) for instance in instances}:
+        invalidate_snapshot(user_id, course_key)
+
+
+post_save.connect(invalidate_user_state_snapshot, sender=StudentModule)
+post_delete.connect(invalidate_user_state_snapshot, sender=StudentModule)
+student_modules_bulk_saved.connect(invalidate_user_state_snapshots, sender=StudentModule)
+
+
 class BaseStudentModuleHistory(models.Model):
     """
     Abstract class containing most fields used by any class storing Student Module History
@@ -275,6 +302,79 @@ class BaseStudentModuleHistory(models.Model):
             request_cache.setdefault(request_cache_key, {})
             request_cache.data[request_cache_key][student_module.id] = history_entry.id
 
+    @staticmethod
+    def save_history_entries(student_modules, history_model_cls, request_cache_key):
+        """
+        When StudentModule instances are bulk inserted or updated, save their changes in the corresponding
+        activity history table, with the same semantics as save_history_entry but in bulk
+        """
+        student_modules = [
+            student_module for student_module in student_modules
+            if student_module.module_type in history_model_cls.HISTORY_SAVING_TYPES
+        ]
+        if not student_modules:
+            return
+
+        request_cache = RequestCache('studentmodulehistory')
+        request_smh_cache = request_cache.get_cached_response(request_cache_key).get_value_or_default({})
+        cached_smh_ids = {
+            student_module.id: request_smh_cache[student_module.id]
+            for student_module in student_modules
+            if student_module.id in request_smh_cache
+        }
+        cached_history_entries = {}
+        if cached_smh_ids:
+            cached_history_entries = history_model_cls.objects.in_bulk(list(cached_smh_ids.values()))
+
+        new_entries = []
+        updated_entries = []
+        for student_module in student_modules:
+            history_entry = None
+            if student_module.id in cached_smh_ids:
+                smh_id = cached_smh_ids[student_module.id]
+                history_entry = cached_history_entries.get(smh_id)
+                if history_entry is None:
+                    log.error(
+                        "Cached {} instance does not exist: {}({}) for StudentModule({})".format(
+                            history_model_cls.__name__, history_model_cls.__name__, smh_id, student_module.id
+                        )
+                    )
+
+            if history_entry is None:
+                history_entry = history_model_cls(student_module=student_module, version=None)
+                new_entries.append(history_entry)
+            else:
+                updated_entries.append(history_entry)
+
+            history_entry.created = student_module.modified
+            history_entry.state = student_module.state
+            history_entry.grade = student_module.grade
+            history_entry.max_grade = student_module.max_grade
+
+        if updated_entries:
+            history_model_cls.objects.bulk_update(updated_entries, ['created', 'state', 'grade', 'max_grade'])
+        if new_entries:
+            history_model_cls.objects.bulk_create(new_entries)
+            if any(history_entry.id is None for history_entry in new_entries):
+                # Some databases (e.g. MySQL) don't return the ids of bulk inserted rows,
+                # so look up the latest history record of each StudentModule instead.
+                latest_ids = dict(
+                    history_model_cls.objects.filter(
+                        student_module_id__in=[history_entry.student_module_id for history_entry in new_entries]
+                    ).values('student_module_id').annotate(latest_id=Max('id')).values_list(
+                        'student_module_id', 'latest_id'
+                    )
+                )
+                for history_entry in new_entries:
+                    history_entry.id = latest_ids.get(history_entry.student_module_id)
+
+        request_cache.setdefault(request_cache_key, {})
+        request_cache.data[request_cache_key].update({
+            history_entry.student_module_id: history_entry.id
+            for history_entry in itertools.chain(new_entries, updated_entries)
+            if history_entry.id is not None
+        })
+
 
 class StudentModuleHistory(BaseStudentModuleHistory):
     """Keeps a complete history of state changes for a given XModule for a given
@@ -302,11 +402,23 @@ class StudentModuleHistory(BaseStudentModuleHistory):
             "lms.djangoapps.courseware.models.student_module_history_map"
         )
 
+    def save_history_bulk(sender, instances, **kwargs):  # pylint: disable=no-self-argument, unused-argument
+        """
+        Creates or updates the StudentModuleHistory entries of bulk saved
+        StudentModules whose module_type is one that we save.
+        """
+        BaseStudentModuleHistory.save_history_entries(
+            instances,
+            StudentModuleHistory,
+            "lms.djangoapps.courseware.models.student_module_history_map"
+        )
+
     # When the extended studentmodulehistory table exists, don't save
     # duplicate history into courseware_studentmodulehistory, just retain
     # data for reading.
     if not settings.FEATURES.get('ENABLE_CSMH_EXTENDED'):
         post_save.connect(save_history, sender=StudentModule)
+        student_modules_bulk_saved.connect(save_history_bulk, sender=StudentModule)
 
 
 class XBlockFieldBase(models.Model):
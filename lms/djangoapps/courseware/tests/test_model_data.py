@@ -13,7 +13,12 @@ from xblock.exceptions import KeyValueMultiSaveError
 from xblock.fields import BlockScope, Scope, ScopeIds
 
 from common.djangoapps.student.tests.factories import UserFactory
-from lms.djangoapps.courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError
+from lms.djangoapps.courseware.model_data import (
+    DjangoKeyValueStore,
+    FieldDataCache,
+    InvalidScopeError,
+    user_state_write_behind
+)
 from lms.djangoapps.courseware.models import (
     StudentModule,
     XModuleStudentInfoField,
@@ -149,7 +154,7 @@ class TestStudentModuleStorage(OtherUserFailureTestMixin, TestCase):
         # to discover if something other than the DjangoXBlockUserStateClient
         # has written to the StudentModule (such as UserStateCache setting the score
         # on the StudentModule).
-        with self.assertNumQueries(4, using='default'):
+        with self.assertNumQueries(2, using='default'):
             with self.assertNumQueries(2, using='student_module_history'):
                 self.kvs.set(user_state_key('a_field'), 'new_value')
         assert 1 == StudentModule.objects.all().count()
@@ -163,7 +168,7 @@ class TestStudentModuleStorage(OtherUserFailureTestMixin, TestCase):
         # to discover if something other than the DjangoXBlockUserStateClient
         # has written to the StudentModule (such as UserStateCache setting the score
         # on the StudentModule).
-        with self.assertNumQueries(4, using='default'):
+        with self.assertNumQueries(2, using='default'):
             with self.assertNumQueries(2, using='student_module_history'):
                 self.kvs.set(user_state_key('not_a_field'), 'new_value')
         assert 1 == StudentModule.objects.all().count()
@@ -218,7 +223,7 @@ class TestStudentModuleStorage(OtherUserFailureTestMixin, TestCase):
         # We also need to read the database to discover if something other than the
         # DjangoXBlockUserStateClient has written to the StudentModule (such as
         # UserStateCache setting the score on the StudentModule).
-        with self.assertNumQueries(4, using="default"):
+        with self.assertNumQueries(2, using="default"):
             with self.assertNumQueries(2, using="student_module_history"):
                 self.kvs.set_many(kv_dict)
 
@@ -233,7 +238,7 @@ class TestStudentModuleStorage(OtherUserFailureTestMixin, TestCase):
         for key in kv_dict:
             self.kvs.set(key, 'test_value')
 
-        with patch('django.db.models.Model.save', side_effect=DatabaseError):
+        with patch('django.db.models.QuerySet.bulk_update', side_effect=DatabaseError):
             with pytest.raises(KeyValueMultiSaveError) as exception_context:
                 self.kvs.set_many(kv_dict)
         assert exception_context.value.saved_field_names == []
@@ -274,8 +279,8 @@ class TestMissingStudentModule(TestCase):  # lint-amnesty, pylint: disable=missi
         # to discover if something other than the DjangoXBlockUserStateClient
         # has written to the StudentModule (such as UserStateCache setting the score
         # on the StudentModule).
-        # Django 1.8 also has a number of other BEGIN and SAVESTATE queries.
-        with self.assertNumQueries(4, using='default'):
+        # The new row is bulk inserted, and then read back to find its id.
+        with self.assertNumQueries(3, using='default'):
             with self.assertNumQueries(2, using='student_module_history'):
                 self.kvs.set(user_state_key('a_field'), 'a_value')
 
@@ -299,6 +304,100 @@ class TestMissingStudentModule(TestCase):  # lint-amnesty, pylint: disable=missi
             assert not self.kvs.has(user_state_key('a_field'))
 
 
+class TestUserStateWriteBehind(TestCase):
+    """Tests for the buffering of user_state writes until they are flushed"""
+    # Tell Django to clean out all databases, not just default
+    databases = set(connections)
+
+    def setUp(self):
+        super().setUp()
+        student_module = StudentModuleFactory(state=json.dumps({'a_field': 'a_value'}))
+        self.user = student_module.student
+        assert self.user.id == 1
+
+    def create_kvs(self, **kwargs):
+        """Create a DjangoKeyValueStore of the user_state of the student module"""
+        self.field_data_cache = FieldDataCache(
+            [mock_block([mock_field(Scope.user_state, 'a_field')])],
+            COURSE_KEY,
+            self.user,
+            **kwargs
+        )
+        return DjangoKeyValueStore(self.field_data_cache)
+
+    def stored_state(self):
+        return json.loads(StudentModule.objects.get().state)
+
+    def test_writes_coalesced_until_flush(self):
+        kvs = self.create_kvs(write_behind=True)
+        with self.assertNumQueries(0):
+            kvs.set(user_state_key('a_field'), 'new_value')
+            kvs.set_many({user_state_key('b_field'): 'b_value', user_state_key('a_field'): 'newer_value'})
+            assert kvs.get(user_state_key('a_field')) == 'newer_value'
+        assert self.stored_state() == {'a_field': 'a_value'}
+
+        # A single read and update of the student module.
+        with self.assertNumQueries(2, using='default'):
+            self.field_data_cache.flush()
+        assert self.stored_state() == {'a_field': 'newer_value', 'b_field': 'b_value'}
+
+        with self.assertNumQueries(0):
+            self.field_data_cache.flush()
+
+    def test_delete_flushes(self):
+        kvs = self.create_kvs(write_behind=True)
+        kvs.set(user_state_key('b_field'), 'b_value')
+        kvs.delete(user_state_key('b_field'))
+        self.field_data_cache.flush()
+        assert self.stored_state() == {'a_field': 'a_value'}
+
+    def test_write_behind_context(self):
+        with user_state_write_behind():
+            kvs = self.create_kvs()
+            kvs.set(user_state_key('a_field'), 'new_value')
+            assert self.stored_state() == {'a_field': 'a_value'}
+        assert self.stored_state() == {'a_field': 'new_value'}
+
+        # Caches created outside of the context write right away.
+        kvs = self.create_kvs()
+        kvs.set(user_state_key('a_field'), 'newer_value')
+        assert self.stored_state() == {'a_field': 'newer_value'}
+
+    def test_flush_failure(self):
+        kvs = self.create_kvs(write_behind=True)
+        kvs.set(user_state_key('a_field'), 'new_value')
+        with patch('django.db.models.QuerySet.bulk_update', side_effect=DatabaseError):
+            with pytest.raises(KeyValueMultiSaveError) as exception_context:
+                self.field_data_cache.flush()
+        assert exception_context.value.saved_field_names == []
+
+    def test_write_behind_context_flush_failure(self):
+        failing_caches = []
+        flush = FieldDataCache.flush
+
+        def fail_first_flush(field_data_cache):
+            if field_data_cache in failing_caches:
+                raise KeyValueMultiSaveError([])
+            flush(field_data_cache)
+
+        with patch.object(FieldDataCache, 'flush', autospec=True, side_effect=fail_first_flush):
+            with pytest.raises(KeyValueMultiSaveError):
+                with user_state_write_behind():
+                    self.create_kvs().set(user_state_key('b_field'), 'b_value')
+                    failing_caches.append(self.field_data_cache)
+                    self.create_kvs().set(user_state_key('a_field'), 'new_value')
+        # The writes of the caches after the one that failed are saved.
+        assert self.stored_state() == {'a_field': 'new_value'}
+
+    def test_write_behind_context_flush_failure_chained(self):
+        with patch('django.db.models.QuerySet.bulk_update', side_effect=DatabaseError):
+            with pytest.raises(KeyValueMultiSaveError) as exception_context:
+                with user_state_write_behind():
+                    self.create_kvs().set(user_state_key('a_field'), 'new_value')
+                    raise ValueError
+        assert isinstance(exception_context.value.__cause__, ValueError)
+
+
 class StorageTestBase:
     """
     A base class for that gets subclassed when testing each of the scopes.
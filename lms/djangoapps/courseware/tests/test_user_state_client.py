@@ -3,15 +3,22 @@ Black-box tests of the DjangoUserStateClient against the semantics
 defined in edx_user_state_client.
 """
 
+import json
+from unittest.mock import patch
+
 import pytz
 from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
 from xblock.fields import Scope
-from datetime import datetime
+from datetime import datetime, timedelta
 from unittest import TestCase
 from collections import defaultdict
+from django.conf import settings
+from django.core.cache import caches
 from django.db import connections
+from django.test import TestCase as DjangoTestCase, override_settings
 
 from common.djangoapps.student.tests.factories import UserFactory
+from lms.djangoapps.courseware.models import StudentModule
 from lms.djangoapps.courseware.user_state_client import (
     DjangoXBlockUserStateClient,
     XBlockUserStateClient,
@@ -169,7 +176,7 @@ class _UserStateClientTestUtils(TestCase):
             scope=self.scope,
         )
 
-    def iter_all_for_block(self, block):
+    def iter_all_for_block(self, block, **kwargs):
         """
         Yield the state for all users for the specified block.
 
@@ -180,9 +187,10 @@ class _UserStateClientTestUtils(TestCase):
         return self.client.iter_all_for_block(
             block_key=self._block(block),
             scope=self.scope,
+            **kwargs
         )
 
-    def iter_all_for_course(self, course, block_type=None):
+    def iter_all_for_course(self, course, block_type=None, **kwargs):
         """
         Yield the state for all users for the specified block.
 
@@ -194,6 +202,7 @@ class _UserStateClientTestUtils(TestCase):
             course_key=self._course(course),
             block_type=block_type,
             scope=self.scope,
+            **kwargs
         )
 
 
@@ -430,6 +439,17 @@ class _UserStateClientTestHistory(_UserStateClientTestUtils):
             [{'a': 1}]
         )
 
+    @override_settings(USER_STATE_BATCH_SIZE=2)
+    def test_iter_course_pages(self):
+        self.set_many(user=0, block_to_state={block: {'block': block} for block in range(5)})
+
+        # Three pages of StudentModules, and a last empty page.
+        with self.assertNumQueries(4):
+            self.assertCountEqual(
+                ((item.username, item.state) for item in self.iter_all_for_course(course=0)),
+                [(self._user(0), {'block': block}) for block in range(5)]
+            )
+
     def test_history_after_delete(self):
         self.set(user=0, block=0, state={str(val): val for val in range(3)})
         for val in range(3):
@@ -551,6 +571,24 @@ class _UserStateClientTestIterAll(_UserStateClientTestUtils):
             ]
         )
 
+    def test_iter_course_modified_range(self):
+        self.set_many(user=0, block_to_state={0: {'a': 'b'}})
+        updated = next(iter(self.iter_all_for_course(course=0))).updated
+
+        self.assertCountEqual(
+            (item.state for item in self.iter_all_for_course(course=0, modified_since=updated)),
+            [{'a': 'b'}]
+        )
+        self.assertCountEqual(self.iter_all_for_course(course=0, modified_before=updated), [])
+        self.assertCountEqual(
+            self.iter_all_for_course(course=0, modified_since=updated + timedelta(seconds=1)),
+            []
+        )
+        self.assertCountEqual(
+            (item.state for item in self.iter_all_for_block(block=0, modified_before=updated + timedelta(seconds=1))),
+            [{'a': 'b'}]
+        )
+
     def test_iter_course_deleted_block(self):
         for user in range(2):
             for course in range(2):
@@ -677,7 +715,7 @@ class DictUserStateClient(XBlockUserStateClient):
 
         yield from self._history[(username, block_key, scope)]
 
-    def iter_all_for_block(self, block_key, scope=Scope.user_state):
+    def iter_all_for_block(self, block_key, scope=Scope.user_state, modified_since=None, modified_before=None):
         """
         You get no ordering guarantees. If you're using this method, you should be running in an
         async task.
@@ -686,10 +724,15 @@ class DictUserStateClient(XBlockUserStateClient):
             if entries[0].state is None:
                 continue
 
-            if key == block_key and one_scope == scope:
+            if (
+                    key == block_key and
+                    one_scope == scope and
+                    self._modified_in_range(entries[0], modified_since, modified_before)
+            ):
                 yield entries[0]
 
-    def iter_all_for_course(self, course_key, block_type=None, scope=Scope.user_state):
+    def iter_all_for_course(self, course_key, block_type=None, scope=Scope.user_state, modified_since=None,
+                            modified_before=None):
         """
         You get no ordering guarantees. If you're using this method, you should be running in an
         async task.
@@ -701,11 +744,22 @@ class DictUserStateClient(XBlockUserStateClient):
             if (
                     key.course_key == course_key and
                     one_scope == scope and
-                    (block_type is None or key.block_type == block_type)
+                    (block_type is None or key.block_type == block_type) and
+                    self._modified_in_range(entries[0], modified_since, modified_before)
             ):
 
                 yield entries[0]
 
+    @staticmethod
+    def _modified_in_range(entry, modified_since, modified_before):
+        """
+        Return whether the entry was modified at or after modified_since and before modified_before.
+        """
+        return (
+            (modified_since is None or entry.updated >= modified_since) and
+            (modified_before is None or entry.updated < modified_before)
+        )
+
 
 class TestDictUserStateClient(UserStateClientTestBase):
     """
@@ -757,3 +811,92 @@ class TestDjangoUserStateClient(UserStateClientTestBase, ModuleStoreTestCase):
             2. Update the test in the other repo to align with the new functionality
             3. Remove this override to re-enable the working test
         """
+
+    def test_set_many_queries(self):
+        blocks = range(20)
+        username = self._user(0)
+
+        # Loading the user, reading the existing rows, inserting the new ones and reading them back.
+        with self.assertNumQueries(4, using='default'):
+            self.client.set_many(username, {self._block(block): {'a': block} for block in blocks})
+
+        # Loading the user, reading the existing rows and updating them.
+        with self.assertNumQueries(3, using='default'):
+            self.client.set_many(username, {self._block(block): {'b': block} for block in blocks})
+
+        self.assertCountEqual(
+            (item.state for item in self.iter_all_for_course(course=0)),
+            [{'a': block, 'b': block} for block in blocks]
+        )
+
+    def test_set_many_keeps_concurrent_score(self):
+        self.set_many(user=0, block_to_state={0: {'a': 'b'}})
+        get_student_modules = self.client._get_student_modules  # pylint: disable=protected-access
+
+        def get_student_modules_then_score(*args, **kwargs):
+            """
+            Reads the student modules, then changes their score as another process would.
+            """
+            student_modules = list(get_student_modules(*args, **kwargs))
+            StudentModule.objects.update(grade=1, max_grade=2)
+            return student_modules
+
+        with patch.object(self.client, '_get_student_modules', side_effect=get_student_modules_then_score):
+            self.set_many(user=0, block_to_state={0: {'c': 'd'}})
+
+        student_module = StudentModule.objects.get()
+        assert (student_module.grade, student_module.max_grade) == (1, 2)
+        assert json.loads(student_module.state) == {'a': 'b', 'c': 'd'}
+
+
+@override_settings(
+    CACHES=dict(settings.CACHES, user_state_snapshot={'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}),
+    USER_STATE_SNAPSHOT_CACHE='user_state_snapshot',
+)
+class TestDjangoUserStateClientSnapshots(DjangoTestCase):
+    """
+    Tests of the cached snapshots of the user state read by the DjangoUserStateClient.
+    """
+    # Tell Django to clean out all databases, not just default
+    databases = set(connections)
+
+    def setUp(self):
+        super().setUp()
+        caches['user_state_snapshot'].clear()
+        self.user = UserFactory.create()
+        self.state_client = DjangoXBlockUserStateClient(self.user)
+        self.course_key = CourseLocator('org', 'course', 'run')
+        self.block_keys = [BlockUsageLocator(self.course_key, 'problem', f'block{block}') for block in range(3)]
+
+    def get_states(self):
+        return {
+            item.block_key: item.state
+            for item in self.state_client.get_many(self.user.username, self.block_keys)
+        }
+
+    def test_snapshot_read(self):
+        self.state_client.set_many(self.user.username, {self.block_keys[0]: {'a': 0}, self.block_keys[1]: {'a': 1}})
+        with self.assertNumQueries(1):
+            assert self.get_states() == {self.block_keys[0]: {'a': 0}, self.block_keys[1]: {'a': 1}}
+        with self.assertNumQueries(0):
+            assert self.get_states() == {self.block_keys[0]: {'a': 0}, self.block_keys[1]: {'a': 1}}
+
+    def test_invalidated_by_set_many(self):
+        self.state_client.set_many(self.user.username, {self.block_keys[0]: {'a': 0}})
+        self.get_states()
+        self.state_client.set_many(self.user.username, {self.block_keys[0]: {'b': 0}, self.block_keys[2]: {'a': 2}})
+        assert self.get_states() == {self.block_keys[0]: {'a': 0, 'b': 0}, self.block_keys[2]: {'a': 2}}
+
+    def test_invalidated_by_delete_many(self):
+        self.state_client.set_many(self.user.username, {self.block_keys[0]: {'a': 0, 'b': 0}})
+        self.get_states()
+        self.state_client.delete_many(self.user.username, [self.block_keys[0]], fields=['a'])
+        assert self.get_states() == {self.block_keys[0]: {'b': 0}}
+
+    def test_invalidated_by_student_module_save(self):
+        self.state_client.set_many(self.user.username, {self.block_keys[0]: {'a': 0}})
+        self.get_states()
+        student_module = StudentModule.objects.get()
+        student_module.state = json.dumps({'a': 'reset'})
+        student_module.save()
+        assert self.get_states() == {self.block_keys[0]: {'a': 'reset'}}
@@ -83,6 +83,20 @@ COURSEWARE_MICROFRONTEND_NAVIGATION_SIDEBAR_BLOCKS_DISABLE_CACHING = CourseWaffl
     f'{WAFFLE_FLAG_NAMESPACE}.disable_navigation_sidebar_blocks_caching', __name__
 )
 
+# .. toggle_name: courseware.user_state_write_behind
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: Buffer the learner state (StudentModule) writes made by an XBlock handler, coalescing them
+#   per block, and write them once when the handler returns, rather than on every save of the block.
+# .. toggle_use_cases: temporary, open_edx
+# .. toggle_creation_date: 2026-10-16
+# .. toggle_target_removal_date: None
+# .. toggle_warning: Code run by the handler that reads StudentModule rows from the database doesn't see the
+#   buffered changes.
+COURSEWARE_USER_STATE_WRITE_BEHIND = CourseWaffleFlag(
+    f'{WAFFLE_FLAG_NAMESPACE}.user_state_write_behind', __name__
+)
+
 # .. toggle_name: courseware.enable_navigation_sidebar
 # .. toggle_implementation: WaffleFlag
 # .. toggle_default: False
@@ -219,3 +233,10 @@ def courseware_disable_navigation_sidebar_blocks_caching(course_key=None):
     Return whether the courseware.disable_navigation_sidebar_blocks_caching flag is on.
     """
     return COURSEWARE_MICROFRONTEND_NAVIGATION_SIDEBAR_BLOCKS_DISABLE_CACHING.is_enabled(course_key)
+
+
+def courseware_user_state_write_behind_is_enabled(course_key=None):
+    """
+    Return whether the courseware.user_state_write_behind flag is on.
+    """
+    return COURSEWARE_USER_STATE_WRITE_BEHIND.is_enabled(course_key)
@@ -6,6 +6,7 @@ data in a Django ORM model.
 
 import itertools
 import logging
+from functools import partial
 from operator import attrgetter
 from time import time
 
@@ -14,13 +15,12 @@ from collections import namedtuple
 
 from django.conf import settings
 from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
-from django.core.paginator import Paginator
-from django.db import transaction
-from django.db.utils import IntegrityError
+from django.utils import timezone
 from edx_django_utils import monitoring as monitoring_utils
 from xblock.fields import Scope
 
-from lms.djangoapps.courseware.models import BaseStudentModuleHistory, StudentModule
+from lms.djangoapps.courseware.models import BaseStudentModuleHistory, StudentModule, student_modules_bulk_saved
+from lms.djangoapps.courseware.user_state_snapshot import get_snapshot
 
 try:
     import simplejson as json
@@ -205,14 +205,15 @@ class XBlockUserStateClient():
         """
         raise NotImplementedError()
 
-    def iter_all_for_block(self, block_key, scope=Scope.user_state):
+    def iter_all_for_block(self, block_key, scope=Scope.user_state, modified_since=None, modified_before=None):
         """
         You get no ordering guarantees. If you're using this method, you should be running in an
         async task.
         """
         raise NotImplementedError()
 
-    def iter_all_for_course(self, course_key, block_type=None, scope=Scope.user_state):
+    def iter_all_for_course(self, course_key, block_type=None, scope=Scope.user_state, modified_since=None,
+                            modified_before=None):
         """
         You get no ordering guarantees. If you're using this method, you should be running in an
         async task.
@@ -267,14 +268,17 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         """
         self.user = user
 
-    def _get_student_modules(self, username, block_keys):
+    def _get_student_modules(self, username, block_keys, user=None):
         """
         Retrieve the :class:`~StudentModule`s for the supplied ``username`` and ``block_keys``.
 
         Arguments:
             username (str): The name of the user to load `StudentModule`s for.
             block_keys (list of :class:`~UsageKey`): The set of XBlocks to load data for.
+            user (:class:`~User`): The already-loaded user named ``username``, if any,
+                which saves a join on the user table.
         """
+        student_filter = {'student': user} if user is not None else {'student__username': username}
         course_key_func = attrgetter('course_key')
         by_course = itertools.groupby(
             sorted(block_keys, key=course_key_func),
@@ -285,14 +289,60 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
             query = StudentModule.objects.chunked_filter(
                 'module_state_key__in',
                 usage_keys,
-                student__username=username,
                 course_id=course_key,
+                **student_filter
             )
 
             for student_module in query:
                 usage_key = student_module.module_state_key.map_into_course(student_module.course_id)
                 yield (student_module, usage_key)
 
+    def _get_serialized_states(self, username, block_keys):
+        """
+        Yield the (usage key, serialized state, modified datetime) of the supplied ``block_keys``
+        that have a :class:`~StudentModule` for the supplied ``username``.
+
+        The states of the user this client was created for are read from the cached snapshots
+        of their state in each course, if snapshots are cached.
+        """
+        if self.user is None or self.user.is_anonymous or self.user.username != username:
+            for student_module, usage_key in self._get_student_modules(username, block_keys):
+                yield usage_key, student_module.state, student_module.modified
+            return
+
+        course_key_func = attrgetter('course_key')
+        by_course = itertools.groupby(
+            sorted(block_keys, key=course_key_func),
+            course_key_func,
+        )
+
+        for course_key, usage_keys in by_course:
+            usage_keys = list(usage_keys)
+            snapshot = get_snapshot(self.user.id, course_key, partial(self._get_course_states, course_key))
+            if snapshot is None:
+                for student_module, usage_key in self._get_student_modules(username, usage_keys, user=self.user):
+                    yield usage_key, student_module.state, student_module.modified
+                continue
+
+            self._nr_stat_increment('get_many', 'snapshot_reads')
+            for usage_key in usage_keys:
+                serialized_state = snapshot.get(usage_key)
+                if serialized_state is not None:
+                    yield (usage_key,) + serialized_state
+
+    def _get_course_states(self, course_key):
+        """
+        Return the (usage key, serialized state, modified datetime) of all the
+        :class:`~StudentModule`s of the user this client was created for in the course.
+        """
+        return [
+            (module_state_key.map_into_course(course_key), state, modified)
+            for module_state_key, state, modified in StudentModule.objects.filter(
+                student=self.user,
+                course_id=course_key,
+            ).values_list('module_state_key', 'state', 'modified')
+        ]
+
     def _nr_attribute_name(self, function_name, stat_name, block_type=None):
         """
         Return an attribute name (string) representing the provided blocks.
@@ -364,13 +414,12 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         # keep track of blocks requested
         self._nr_stat_accumulate('get_many', 'blocks_requested', len(block_keys))
 
-        modules = self._get_student_modules(username, block_keys)
-        for module, usage_key in modules:
-            if module.state is None:
+        for usage_key, serialized_state, modified in self._get_serialized_states(username, block_keys):
+            if serialized_state is None:
                 continue
 
-            state = json.loads(module.state)
-            state_length = len(module.state)
+            state = json.loads(serialized_state)
+            state_length = len(serialized_state)
 
             # If the state is the empty dict, then it has been deleted, and so
             # conformant UserStateClients should treat it as if it doesn't exist.
@@ -389,7 +438,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
                     for field in fields
                     if field in state
                 }
-            yield XBlockUserState(username, usage_key, state, module.modified, scope)
+            yield XBlockUserState(username, usage_key, state, modified, scope)
 
         # The rest of this method exists only to report custom attributes.
         finish_time = time()
@@ -414,10 +463,10 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         # count how many times this function gets called
         self._nr_stat_increment('set_many', 'calls')
 
-        # We do a find_or_create for every block (rather than re-using field objects
-        # that were queried in get_many) so that if the score has
-        # been changed by some other piece of the code, we don't overwrite
-        # that score.
+        # We re-read the rows of all the blocks (rather than re-using field objects
+        # that were queried in get_many) so that we don't overwrite state stored by
+        # some other piece of the code. Only the state is written back, so that if
+        # the score has been changed concurrently, we don't overwrite that score.
         if self.user is not None and self.user.username == username:
             user = self.user
         else:
@@ -430,51 +479,52 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
         evt_time = time()
 
+        student_modules = {
+            usage_key: student_module
+            for student_module, usage_key in self._get_student_modules(username, list(block_keys_to_state), user=user)
+        }
+        new_student_modules = {}
         for usage_key, state in block_keys_to_state.items():
-            try:
-                student_module, created = StudentModule.objects.get_or_create(
+            if usage_key not in student_modules:
+                new_student_modules[usage_key] = StudentModule(
                     student=user,
                     course_id=usage_key.context_key,
                     module_state_key=usage_key,
-                    defaults={
-                        'state': json.dumps(state),
-                        'module_type': usage_key.block_type,
-                    },
+                    module_type=usage_key.block_type,
+                    state=json.dumps(state),
                 )
-            except IntegrityError:
-                # PLAT-1109 - Until we switch to read committed, we cannot rely
-                # on get_or_create to be able to see rows created in another
-                # process. This seems to happen frequently, and ignoring it is the
-                # best course of action for now
-                log.warning("set_many: IntegrityError for student {} - course_id {} - usage key {}".format(
+
+        created = set()
+        if new_student_modules:
+            # Rows created concurrently by another process are skipped by the insert,
+            # and bulk inserts don't return the ids of the new rows on MySQL, so the
+            # inserted rows are read back.
+            StudentModule.objects.bulk_create(new_student_modules.values(), ignore_conflicts=True)
+            for student_module, usage_key in self._get_student_modules(username, list(new_student_modules), user=user):
+                student_modules[usage_key] = student_module
+                if student_module.state == new_student_modules[usage_key].state:
+                    created.add(usage_key)
+
+        saved_student_modules = []
+        updated_student_modules = []
+        modified = timezone.now()
+        for usage_key, state in block_keys_to_state.items():
+            student_module = student_modules.get(usage_key)
+            if student_module is None:
+                # The row was neither found nor created, which can happen if it was
+                # deleted concurrently. Log information - but ignore the error.
+                log.warning("set_many: StudentModule not saved for student {} - course_id {} - usage key {}".format(
                     user, repr(str(usage_key.context_key)), usage_key
                 ))
-                return
+                continue
 
-            num_fields_before = num_fields_after = num_new_fields_set = len(state)
-            num_fields_updated = 0  # lint-amnesty, pylint: disable=unused-variable
-            if not created:
-                if student_module.state is None:
-                    current_state = {}
-                else:
-                    current_state = json.loads(student_module.state)
-                num_fields_before = len(current_state)
+            if usage_key not in created:
+                current_state = {} if student_module.state is None else json.loads(student_module.state)
                 current_state.update(state)
-                num_fields_after = len(current_state)
                 student_module.state = json.dumps(current_state)
-                try:
-                    with transaction.atomic():
-                        # Updating the object - force_update guarantees no INSERT will occur.
-                        student_module.save(force_update=True)
-                except IntegrityError:
-                    # The UPDATE above failed. Log information - but ignore the error.
-                    # See https://openedx.atlassian.net/browse/TNL-5365
-                    log.warning("set_many: IntegrityError for student {} - course_id {} - usage key {}".format(
-                        user, repr(str(usage_key.context_key)), usage_key
-                    ))
-                    log.warning("set_many: All {} block keys: {}".format(
-                        len(block_keys_to_state), list(block_keys_to_state.keys())
-                    ))
+                student_module.modified = modified
+                updated_student_modules.append(student_module)
+            saved_student_modules.append(student_module)
 
             # DataDog and New Relic reporting
 
@@ -482,16 +532,19 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
             self._nr_block_stat_accumulate('set_many', usage_key.block_type, 'size', len(student_module.state))
 
             # Record whether a state row has been created or updated.
-            if created:
+            if usage_key in created:
                 self._nr_block_stat_increment('set_many', usage_key.block_type, 'blocks_created')
             else:
                 self._nr_block_stat_increment('set_many', usage_key.block_type, 'blocks_updated')
 
-            # Event to record number of new fields set in set/set_many.
-            num_new_fields_set = num_fields_after - num_fields_before
+        if updated_student_modules:
+            # Only the state is updated, so that the scores set on these rows since
+            # they were read are kept.
+            StudentModule.objects.bulk_update(updated_student_modules, ['state', 'modified'])
 
-            # Event to record number of existing fields updated in set/set_many.
-            num_fields_updated = max(0, len(state) - num_new_fields_set)
+        # Bulk writes don't send post_save, which saves the history of the rows.
+        student_modules_bulk_saved.send(sender=StudentModule, instances=saved_student_modules)
+        self._nr_stat_accumulate('set_many', 'blocks_saved', len(saved_student_modules))
 
         # Events for the entire set_many call.
         finish_time = time()
@@ -582,7 +635,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
             yield XBlockUserState(username, block_key, state, history_entry.created, scope)
 
-    def iter_all_for_block(self, block_key, scope=Scope.user_state):
+    def iter_all_for_block(self, block_key, scope=Scope.user_state, modified_since=None, modified_before=None):
         """
         Return an iterator over the data stored in the block (e.g. a problem block).
 
@@ -592,6 +645,8 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         Arguments:
             block_key: an XBlock's locator (e.g. :class:`~BlockUsageLocator`)
             scope (Scope): must be `Scope.user_state`
+            modified_since (datetime): if set, only the data modified at or after this time is returned
+            modified_before (datetime): if set, only the data modified before this time is returned
 
         Returns:
             an iterator over all data. Each invocation returns the next :class:`~XBlockUserState`
@@ -600,21 +655,11 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
 
-        results = StudentModule.objects.order_by('id').filter(module_state_key=block_key).select_related('student')
-        p = Paginator(results, settings.USER_STATE_BATCH_SIZE)
-
-        for page_number in p.page_range:
-            page = p.page(page_number)
-
-            for sm in page.object_list:
-                state = json.loads(sm.state)
-
-                if state == {}:
-                    continue
-
-                yield XBlockUserState(sm.student.username, sm.module_state_key, state, sm.modified, scope)
+        results = StudentModule.objects.filter(module_state_key=block_key)
+        return self._iter_user_states(results, scope, modified_since, modified_before)
 
-    def iter_all_for_course(self, course_key, block_type=None, scope=Scope.user_state):
+    def iter_all_for_course(self, course_key, block_type=None, scope=Scope.user_state, modified_since=None,
+                            modified_before=None):
         """
         Return an iterator over all data stored in a course's blocks.
 
@@ -623,7 +668,10 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
         Arguments:
             course_key: a course locator
+            block_type (str): if set, only the data of the blocks of this type is returned
             scope (Scope): must be `Scope.user_state`
+            modified_since (datetime): if set, only the data modified at or after this time is returned
+            modified_before (datetime): if set, only the data modified before this time is returned
 
         Returns:
             an iterator over all data. Each invocation returns the next :class:`~XBlockUserState`
@@ -632,19 +680,43 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
 
-        results = StudentModule.objects.order_by('id').filter(course_id=course_key)
+        results = StudentModule.objects.filter(course_id=course_key)
         if block_type:
             results = results.filter(module_type=block_type)
+        return self._iter_user_states(results, scope, modified_since, modified_before)
 
-        p = Paginator(results, settings.USER_STATE_BATCH_SIZE)
+    def _iter_user_states(self, student_modules, scope, modified_since=None, modified_before=None):
+        """
+        Yield an :class:`~XBlockUserState` for each of the supplied ``student_modules`` that has state.
 
-        for page_number in p.page_range:
-            page = p.page(page_number)
+        The StudentModules are read in batches of ``settings.USER_STATE_BATCH_SIZE``, paginated on
+        their ids rather than with offsets, and only the columns needed are read. The state of each
+        StudentModule is only decoded when it is yielded, so that the memory used doesn't grow with
+        the number of StudentModules.
+        """
+        if modified_since is not None:
+            student_modules = student_modules.filter(modified__gte=modified_since)
+        if modified_before is not None:
+            student_modules = student_modules.filter(modified__lt=modified_before)
+        student_modules = student_modules.order_by('id').values_list(
+            'id', 'student__username', 'module_state_key', 'state', 'modified',
+        )
+
+        last_id = None
+        while True:
+            page = student_modules if last_id is None else student_modules.filter(id__gt=last_id)
+            rows = list(page[:settings.USER_STATE_BATCH_SIZE])
+            if not rows:
+                return
+            last_id = rows[-1][0]
+
+            for _, username, module_state_key, serialized_state, modified in rows:
+                if serialized_state is None:
+                    continue
 
-            for sm in page.object_list:
-                state = json.loads(sm.state)
+                state = json.loads(serialized_state)
 
                 if state == {}:
                     continue
 
-                yield XBlockUserState(sm.student.username, sm.module_state_key, state, sm.modified, scope)
+                yield XBlockUserState(username, module_state_key, state, modified, scope)
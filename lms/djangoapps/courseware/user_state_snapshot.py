@@ -0,0 +1,136 @@
+"""
+A cache of snapshots of the Scope.user_state data (StudentModule state) of a
+user in a course, used by :class:`~DjangoXBlockUserStateClient` to read that
+state without querying the database.
+
+A snapshot holds the state of all the StudentModules of the user in the
+course, so that it can also answer that a block has no state.  Snapshots are
+invalidated whenever one of those StudentModules is saved or deleted, by
+changing the generation of the (user, course) pair: a snapshot is only used if
+it was built in the current generation.  This way, a snapshot built from rows
+read before a concurrent write is never used after that write.
+
+The cache is only used if the USER_STATE_SNAPSHOT_CACHE setting names one of
+the CACHES.
+"""
+
+
+import json
+import logging
+import uuid
+import zlib
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+log = logging.getLogger(__name__)
+
+# Snapshots bigger than this, once compressed, aren't cached (memcached rejects values over 1MB).
+MAX_SNAPSHOT_SIZE = 900 * 1024
+
+
+def _get_cache():
+    """
+    Return the cache holding the snapshots, or None if snapshots aren't cached.
+    """
+    cache_name = getattr(settings, 'USER_STATE_SNAPSHOT_CACHE', None)
+    return caches[cache_name] if cache_name else None
+
+
+def _cache_keys(user_id, course_key):
+    """
+    Return the keys of the generation and of the snapshot of the user's state in the course.
+    """
+    prefix = f'courseware.user_state_snapshot.{user_id}.{course_key}'
+    return f'{prefix}.generation', f'{prefix}.snapshot'
+
+
+class UserStateSnapshot:
+    """
+    The state of the StudentModules of a user in a course, as a dict mapping the
+    string of each block's usage key to a (serialized state, modified) pair.
+    StudentModules without state aren't included.
+    """
+    def __init__(self, states):
+        self.states = states
+
+    def get(self, block_key):
+        """
+        Return the (serialized state, modified datetime) of the given block, or None.
+        """
+        entry = self.states.get(str(block_key))
+        if entry is None:
+            return None
+        state, modified = entry
+        return state, datetime.fromisoformat(modified)
+
+    def serialize(self):
+        return zlib.compress(json.dumps(self.states, separators=(',', ':')).encode('utf-8'))
+
+    @classmethod
+    def deserialize(cls, serialized):
+        return cls(json.loads(zlib.decompress(serialized).decode('utf-8')))
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Create a snapshot from (usage key, serialized state, modified datetime) rows.
+        """
+        return cls({
+            str(usage_key): (state, modified.isoformat())
+            for usage_key, state, modified in rows
+            if state is not None
+        })
+
+
+def get_snapshot(user_id, course_key, load_rows):
+    """
+    Return the UserStateSnapshot of the user in the course, or None if snapshots
+    aren't cached.
+
+    On a cache miss, the snapshot is built from the rows returned by
+    ``load_rows()``, and cached unless it was invalidated meanwhile.
+    """
+    cache = _get_cache()
+    if cache is None:
+        return None
+
+    generation_key, snapshot_key = _cache_keys(user_id, course_key)
+    cached = cache.get_many([generation_key, snapshot_key])
+    generation = cached.get(generation_key)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        if not cache.add(generation_key, generation, settings.USER_STATE_SNAPSHOT_TIMEOUT):
+            # Another process has just started a generation.
+            generation = cache.get(generation_key)
+    elif snapshot_key in cached:
+        snapshot_generation, serialized = cached[snapshot_key]
+        if snapshot_generation == generation:
+            return UserStateSnapshot.deserialize(serialized)
+
+    snapshot = UserStateSnapshot.from_rows(load_rows())
+    serialized = snapshot.serialize()
+    if generation is not None and len(serialized) <= MAX_SNAPSHOT_SIZE:
+        cache.set(snapshot_key, (generation, serialized), settings.USER_STATE_SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def invalidate_snapshot(user_id, course_key):
+    """
+    Invalidate the snapshot of the state of the user in the course, now and
+    again once the current transaction is committed, so that it isn't rebuilt
+    from uncommitted rows.
+    """
+    cache = _get_cache()
+    if cache is None:
+        return
+
+    generation_key, _ = _cache_keys(user_id, course_key)
+
+    def start_generation():
+        cache.set(generation_key, uuid.uuid4().hex, settings.USER_STATE_SNAPSHOT_TIMEOUT)
+
+    start_generation()
+    transaction.on_commit(start_generation)
@@ -72,6 +72,18 @@ WRITABLE_GRADEBOOK = CourseWaffleFlag(f'{WAFFLE_NAMESPACE}.writable_gradebook',
 # .. toggle_tickets: https://github.com/openedx/edx-platform/pull/21389
 BULK_MANAGEMENT = CourseWaffleFlag(f'{WAFFLE_NAMESPACE}.bulk_management', __name__, LOG_PREFIX)
 
+# .. toggle_name: grades.incremental_course_grade_update
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: When enabled, the course grade of a learner is updated incrementally when one of their
+#   subsection grades changes, using the graded totals of their other subsections stored along with their last
+#   course grade, instead of being recomputed from all of their subsection grades.
+# .. toggle_use_cases: opt_in
+# .. toggle_creation_date: 2026-10-16
+INCREMENTAL_COURSE_GRADE_UPDATE = CourseWaffleFlag(
+    f'{WAFFLE_NAMESPACE}.incremental_course_grade_update', __name__, LOG_PREFIX
+)
+
 
 def is_writable_gradebook_enabled(course_key):
     """
@@ -85,3 +97,10 @@ def gradebook_bulk_management_enabled(course_key):
     Returns whether bulk management features should be specially enabled for a given course.
     """
     return BULK_MANAGEMENT.is_enabled(course_key)
+
+
+def incremental_course_grade_update_enabled(course_key):
+    """
+    Returns whether course grades are updated incrementally for the given course.
+    """
+    return INCREMENTAL_COURSE_GRADE_UPDATE.is_enabled(course_key)
@@ -4,7 +4,7 @@ CourseGrade Class
 
 
 from abc import abstractmethod
-from collections import OrderedDict, defaultdict
+from collections import OrderedDict, defaultdict, namedtuple
 
 from ccx_keys.locator import CCXLocator
 from django.conf import settings
@@ -13,10 +13,15 @@ from lazy import lazy
 from openedx.core.lib.grade_utils import round_away_from_zero
 from xmodule import block_metadata_utils  # lint-amnesty, pylint: disable=wrong-import-order
 
+from .models import SubsectionTotal
 from .scores import compute_percent
-from .subsection_grade import ZeroSubsectionGrade
+from .subsection_grade import ReadSubsectionGrade, ZeroSubsectionGrade
 from .subsection_grade_factory import SubsectionGradeFactory
 
+# Stands in for a subsection grade in the grade sheet passed to the course grader.
+_GradedTotal = namedtuple('_GradedTotal', ['earned', 'possible'])
+_GradeSheetEntry = namedtuple('_GradeSheetEntry', ['display_name', 'graded_total', 'percent_graded'])
+
 
 class CourseGradeBase:
     """
@@ -306,6 +311,51 @@ class CourseGrade(CourseGradeBase):
         """
         return True
 
+    @classmethod
+    def from_subsection_totals(cls, user, course_data, subsection_totals):
+        """
+        Returns the CourseGrade computed by the course's grader from the
+        given SubsectionTotals, without reading any subsection grades.  The
+        subsections must be in the course_data's structure.
+        """
+        grade_sheet = defaultdict(OrderedDict)
+        for total in subsection_totals:
+            if total.graded and total.possible > 0:
+                grade_sheet[total.format][total.location] = _GradeSheetEntry(
+                    block_metadata_utils.display_name_with_default(course_data.structure[total.location]),
+                    _GradedTotal(total.earned, total.possible),
+                    compute_percent(total.earned, total.possible),
+                )
+        course = cls._prep_course_for_grading(course_data.course)
+        grader_result = course.grader.grade(grade_sheet, generate_random_scores=settings.GENERATE_PROFILE_SCORES)
+
+        grade_cutoffs = course_data.course.grade_cutoffs
+        percent = cls._compute_percent(grader_result)
+        return cls(
+            user,
+            course_data,
+            percent,
+            cls._compute_letter_grade(grade_cutoffs, percent),
+            cls._compute_passed(grade_cutoffs, percent),
+        )
+
+    def subsection_totals(self):
+        """
+        Returns the SubsectionTotals of the subsection grades used to
+        compute this course grade, in course order.
+        """
+        return [
+            SubsectionTotal(
+                subsection_grade.location,
+                subsection_grade.format,
+                subsection_grade.graded,
+                subsection_grade.graded_total.earned,
+                subsection_grade.graded_total.possible,
+                isinstance(subsection_grade, ReadSubsectionGrade),
+            )
+            for subsection_grade in self.subsection_grades.values()
+        ]
+
     def _get_subsection_grade(self, subsection, force_update_subsections=False):
         if self.force_update_subsections:
             return self._subsection_grade_factory.update(subsection, force_update_subsections=force_update_subsections)
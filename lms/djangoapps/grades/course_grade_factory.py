@@ -2,17 +2,24 @@
 Course Grade Factory Class
 """
 from collections import namedtuple
+from hashlib import sha1
+from itertools import islice
 from logging import getLogger
 
+from lms.djangoapps.course_blocks.api import get_course_blocks_for_users
 from openedx.core.djangoapps.signals.signals import (
     COURSE_GRADE_CHANGED,
     COURSE_GRADE_NOW_FAILED,
     COURSE_GRADE_NOW_PASSED
 )
+from .config.waffle import incremental_course_grade_update_enabled
 from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
-from .models import PersistentCourseGrade
+from .models import PersistentCourseGrade, PersistentCourseGradeTotals, SubsectionTotal
 from .models_api import prefetch_grade_overrides_and_visible_blocks
+from .prefetch import is_prefetched, prefetched_grades_data
+from .subsection_grade import ReadSubsectionGrade
+from .subsection_grade_factory import SubsectionGradeFactory
 
 log = getLogger(__name__)
 
@@ -23,6 +30,10 @@ class CourseGradeFactory:
     """
     GradeResult = namedtuple('GradeResult', ['student', 'course_grade', 'error'])
 
+    # Number of users whose grades data is prefetched, and whose course
+    # structures are transformed, at a time by iter.
+    PREFETCH_BATCH_SIZE = 100
+
     def read(
             self,
             user,
@@ -68,6 +79,33 @@ class CourseGradeFactory:
             force_update_subsections=force_update_subsections
         )
 
+    def update_for_subsection(
+            self,
+            user,
+            subsection_key,
+            course=None,
+            course_structure=None,
+            course_key=None,
+    ):
+        """
+        Updates and returns the CourseGrade for the given user in the
+        course after the grade of the given subsection changed.
+
+        If enabled for the course, the course grade is updated
+        incrementally from the subsection totals stored along with the
+        user's last course grade, as long as they are still valid.
+        Otherwise, it is recomputed from all of the user's subsection
+        grades.
+        """
+        course_data = CourseData(user, course, structure=course_structure, course_key=course_key)
+        if not incremental_course_grade_update_enabled(course_data.course_key):
+            return self._update(user, course_data)
+
+        course_grade = self._update_incrementally(user, course_data, subsection_key)
+        if course_grade is None:
+            course_grade = self._update(user, course_data, save_subsection_totals=True)
+        return course_grade
+
     def iter(
             self,
             users,
@@ -93,15 +131,42 @@ class CourseGradeFactory:
         course_data = CourseData(
             user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
         )
-        for user in users:
-            yield self._iter_grade_result(user, course_data, force_update)
+        # The grades data of the users is prefetched in batches, so
+        # that the number of queries doesn't grow with each user, and
+        # the course structures of each batch are transformed together.
+        users_iterator = iter(users)
+        users_batch = list(islice(users_iterator, self.PREFETCH_BATCH_SIZE))
+        while users_batch:
+            with prefetched_grades_data(course_data, users_batch):
+                course_structures = self._get_course_structures(course_data, users_batch)
+                for user, course_structure in zip(users_batch, course_structures):
+                    yield self._iter_grade_result(user, course_data, force_update, course_structure)
+            users_batch = list(islice(users_iterator, self.PREFETCH_BATCH_SIZE))
+
+    @staticmethod
+    def _get_course_structures(course_data, users):
+        """
+        Returns the course structures transformed for each of the given
+        users, or Nones if they couldn't be transformed together, in which
+        case the structure of each user is transformed when grading them.
+        """
+        try:
+            return get_course_blocks_for_users(users, course_data.location, course_data.collected_structure)
+        except Exception:  # pylint: disable=broad-except
+            log.exception('Cannot transform the course structures of a batch of users in %s', course_data.course_key)
+            return [None] * len(users)
 
-    def _iter_grade_result(self, user, course_data, force_update):  # lint-amnesty, pylint: disable=missing-function-docstring
+    def _iter_grade_result(self, user, course_data, force_update, course_structure=None):
+        """
+        Returns the GradeResult of the given user, whose course structure
+        is transformed from the collected one if not given.
+        """
         try:
             kwargs = {
                 'user': user,
                 'course': course_data.course,
                 'collected_block_structure': course_data.collected_structure,
+                'course_structure': course_structure,
                 'course_key': course_data.course_key,
             }
             if force_update:
@@ -148,15 +213,17 @@ class CourseGradeFactory:
         )
 
     @staticmethod
-    def _update(user, course_data, force_update_subsections=False):
+    def _update(user, course_data, force_update_subsections=False, save_subsection_totals=False):
         """
         Computes, saves, and returns a CourseGrade object for the
         given user and course.
+        Also saves the subsection totals used to compute the grade, if
+        save_subsection_totals is true.
         Sends a COURSE_GRADE_CHANGED signal to listeners and
         COURSE_GRADE_NOW_PASSED if learner has passed course or
         COURSE_GRADE_NOW_FAILED if learner is now failing course
         """
-        if force_update_subsections:
+        if force_update_subsections and not is_prefetched(user, course_data.course_key):
             prefetch_grade_overrides_and_visible_blocks(user, course_data.course_key)
 
         course_grade = CourseGrade(
@@ -169,17 +236,136 @@ class CourseGradeFactory:
         should_persist = course_grade.attempted
         if should_persist:
             course_grade._subsection_grade_factory.bulk_create_unsaved()  # lint-amnesty, pylint: disable=protected-access
-            PersistentCourseGrade.update_or_create(
-                user_id=user.id,
-                course_id=course_data.course_key,
-                course_version=course_data.version,
-                course_edited_timestamp=course_data.edited_on,
-                grading_policy_hash=course_data.grading_policy_hash,
-                percent_grade=course_grade.percent,
-                letter_grade=course_grade.letter_grade or "",
-                passed=course_grade.passed,
-            )
+            CourseGradeFactory._persist(user, course_data, course_grade)
+            if save_subsection_totals and not force_update_subsections:
+                persisted_grades = list(
+                    course_grade._subsection_grade_factory._get_bulk_cached_subsection_grades().values()  # lint-amnesty, pylint: disable=protected-access
+                )
+                CourseGradeFactory._save_subsection_totals(
+                    user,
+                    course_data,
+                    course_grade.subsection_totals(),
+                    len(persisted_grades),
+                    max((grade.modified for grade in persisted_grades), default=None),
+                )
+
+        CourseGradeFactory._send_signals(user, course_data, course_grade)
+        log.info(
+            'Grades: Update, %s, User: %s, %s, persisted: %s',
+            course_data.full_string(), user.id, course_grade, should_persist,
+        )
+
+        return course_grade
+
+    @staticmethod
+    def _update_incrementally(user, course_data, subsection_key):
+        """
+        Updates, saves, and returns a CourseGrade object for the given
+        user and course, computed from the stored subsection totals of
+        the user with the current grade of the given subsection.
+        Returns None if the stored subsection totals can't be used.
+        """
+        try:
+            stored_totals = PersistentCourseGradeTotals.read(user.id, course_data.course_key)
+        except PersistentCourseGradeTotals.DoesNotExist:
+            return None
+
+        if (
+            stored_totals.course_version != (course_data.version or '') or
+            stored_totals.grading_policy_hash != course_data.grading_policy_hash or
+            stored_totals.structure_hash != _structure_hash(course_data.structure)
+        ):
+            return None
+
+        subsection_totals = stored_totals.subsection_totals
+        index = next(
+            (index for index, total in enumerate(subsection_totals) if total.location == subsection_key),
+            None,
+        )
+        if index is None:
+            return None
+        was_persisted = subsection_totals[index].persisted
+        if stored_totals.other_subsection_grades_changed(subsection_key, was_persisted):
+            return None
+
+        subsection_grade = SubsectionGradeFactory(user, course_data=course_data).read(
+            course_data.structure[subsection_key]
+        )
+        is_persisted = isinstance(subsection_grade, ReadSubsectionGrade)
+        subsection_totals[index] = SubsectionTotal(
+            subsection_key,
+            subsection_grade.format,
+            subsection_grade.graded,
+            subsection_grade.graded_total.earned,
+            subsection_grade.graded_total.possible,
+            is_persisted,
+        )
+        subsection_grades_modified = stored_totals.subsection_grades_modified
+        if is_persisted and (
+            subsection_grades_modified is None or subsection_grade.model.modified > subsection_grades_modified
+        ):
+            subsection_grades_modified = subsection_grade.model.modified
+
+        course_grade = CourseGrade.from_subsection_totals(user, course_data, subsection_totals)
+        CourseGradeFactory._persist(user, course_data, course_grade)
+        CourseGradeFactory._save_subsection_totals(
+            user,
+            course_data,
+            subsection_totals,
+            stored_totals.subsection_grades_count - int(was_persisted) + int(is_persisted),
+            subsection_grades_modified,
+        )
+
+        CourseGradeFactory._send_signals(user, course_data, course_grade)
+        log.info(
+            'Grades: Incremental update, %s, User: %s, Subsection: %s, %s',
+            course_data.full_string(), user.id, subsection_key, course_grade,
+        )
+        return course_grade
+
+    @staticmethod
+    def _persist(user, course_data, course_grade):
+        """
+        Saves the given CourseGrade object for the given user and course.
+        """
+        PersistentCourseGrade.update_or_create(
+            user_id=user.id,
+            course_id=course_data.course_key,
+            course_version=course_data.version,
+            course_edited_timestamp=course_data.edited_on,
+            grading_policy_hash=course_data.grading_policy_hash,
+            percent_grade=course_grade.percent,
+            letter_grade=course_grade.letter_grade or "",
+            passed=course_grade.passed,
+        )
+
+    @staticmethod
+    def _save_subsection_totals(
+        user, course_data, subsection_totals, subsection_grades_count, subsection_grades_modified,
+    ):
+        """
+        Saves the given subsection totals used to compute the course grade
+        of the given user, along with the state of the content and of the
+        user's subsection grades they were computed from.
+        """
+        PersistentCourseGradeTotals.update_or_create(
+            user_id=user.id,
+            course_id=course_data.course_key,
+            subsection_totals=subsection_totals,
+            course_version=course_data.version or '',
+            grading_policy_hash=course_data.grading_policy_hash,
+            structure_hash=_structure_hash(course_data.structure),
+            subsection_grades_count=subsection_grades_count,
+            subsection_grades_modified=subsection_grades_modified,
+        )
 
+    @staticmethod
+    def _send_signals(user, course_data, course_grade):
+        """
+        Sends a COURSE_GRADE_CHANGED signal to listeners and
+        COURSE_GRADE_NOW_PASSED if learner has passed course or
+        COURSE_GRADE_NOW_FAILED if learner is now failing course
+        """
         COURSE_GRADE_CHANGED.send_robust(
             sender=None,
             user=user,
@@ -201,9 +387,9 @@ class CourseGradeFactory:
                 grade=course_grade,
             )
 
-        log.info(
-            'Grades: Update, %s, User: %s, %s, persisted: %s',
-            course_data.full_string(), user.id, course_grade, should_persist,
-        )
 
-        return course_grade
+def _structure_hash(course_structure):
+    """
+    Returns a hash of the blocks in the given course structure.
+    """
+    return sha1('\n'.join(sorted(str(block_key) for block_key in course_structure)).encode('utf-8')).hexdigest()
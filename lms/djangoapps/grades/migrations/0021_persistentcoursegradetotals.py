@@ -0,0 +1,35 @@
+import django.utils.timezone
+import model_utils.fields
+from django.db import migrations, models
+from opaque_keys.edx.django.models import CourseKeyField
+
+from lms.djangoapps.courseware.fields import UnsignedBigIntAutoField
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grades', '0020_alter_historicalpersistentsubsectiongradeoverride_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersistentCourseGradeTotals',
+            fields=[
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, verbose_name='created', editable=False)),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, verbose_name='modified', editable=False)),
+                ('id', UnsignedBigIntAutoField(serialize=False, primary_key=True)),
+                ('user_id', models.IntegerField()),
+                ('course_id', CourseKeyField(max_length=255)),
+                ('course_version', models.CharField(max_length=255, verbose_name='Course content version identifier', blank=True)),
+                ('grading_policy_hash', models.CharField(max_length=255, verbose_name='Hash of grading policy')),
+                ('structure_hash', models.CharField(max_length=100, verbose_name='Hash of the blocks visible to the learner')),
+                ('subsection_grades_count', models.IntegerField()),
+                ('subsection_grades_modified', models.DateTimeField(null=True, blank=True)),
+                ('totals_json', models.TextField()),
+            ],
+            options={
+                'unique_together': {('course_id', 'user_id')},
+            },
+        ),
+    ]
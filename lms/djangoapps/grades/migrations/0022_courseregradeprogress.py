@@ -0,0 +1,30 @@
+import django.utils.timezone
+import model_utils.fields
+from django.db import migrations, models
+from opaque_keys.edx.django.models import CourseKeyField
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grades', '0021_persistentcoursegradetotals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseRegradeProgress',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, verbose_name='created', editable=False)),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, verbose_name='modified', editable=False)),
+                ('course_id', CourseKeyField(max_length=255, db_index=True)),
+                ('status', models.CharField(default='running', max_length=16, choices=[('running', 'Running'), ('completed', 'Completed'), ('superseded', 'Superseded by a later regrade')])),
+                ('total_learners', models.IntegerField()),
+                ('graded_learners', models.IntegerField(default=0)),
+                ('failed_learners', models.IntegerField(default=0)),
+                ('last_enrollment_id', models.IntegerField(default=0)),
+                ('active_tasks', models.IntegerField(default=0)),
+                ('seconds_per_learner', models.FloatField(null=True, blank=True)),
+            ],
+        ),
+    ]
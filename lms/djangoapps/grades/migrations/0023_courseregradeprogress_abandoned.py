@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grades', '0022_courseregradeprogress'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='courseregradeprogress',
+            name='status',
+            field=models.CharField(default='running', max_length=16, choices=[('running', 'Running'), ('completed', 'Completed'), ('superseded', 'Superseded by a later regrade'), ('abandoned', 'Abandoned by its tasks')]),
+        ),
+    ]
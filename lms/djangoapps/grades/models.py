@@ -12,10 +12,13 @@ import json
 import logging
 from base64 import b64encode
 from collections import defaultdict, namedtuple
+from datetime import timedelta
 from hashlib import sha1
 
 from django.apps import apps
+from django.conf import settings
 from django.db import models, IntegrityError, transaction
+from django.db.models import Count, Max
 from openedx_events.learning.data import CourseData, PersistentCourseGradeData
 from openedx_events.learning.signals import PERSISTENT_GRADE_SUMMARY_CHANGED
 
@@ -42,6 +45,10 @@ BLOCK_RECORD_LIST_VERSION = 1
 # grade calculation.
 BlockRecord = namedtuple('BlockRecord', ['locator', 'weight', 'raw_possible', 'graded'])
 
+# Used to serialize the graded total of a subsection at the time it was used
+# in course grade calculation, and whether it was read from a persisted grade.
+SubsectionTotal = namedtuple('SubsectionTotal', ['location', 'format', 'graded', 'earned', 'possible', 'persisted'])
+
 
 class BlockRecordList:
     """
@@ -278,6 +285,26 @@ class VisibleBlocks(models.Model):
         get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(user_id, course_key)] = prefetched
         return prefetched
 
+    @classmethod
+    def prefetch_from_grades(cls, course_key, grades_by_user):
+        """
+        Initializes the cache of each user in the given dict of user ids to
+        the user's subsection grades in the course, using the visible blocks
+        already read along with the grades.
+        """
+        cache = get_cache(cls._CACHE_NAMESPACE)
+        for user_id, grades in grades_by_user.items():
+            cache[cls._cache_key(user_id, course_key)] = {
+                grade.visible_blocks.hashed: grade.visible_blocks for grade in grades
+            }
+
+    @classmethod
+    def clear_prefetched_data(cls, user_id, course_key):
+        """
+        Clears the prefetched visible blocks for the given user and course.
+        """
+        get_cache(cls._CACHE_NAMESPACE).pop(cls._cache_key(user_id, course_key), None)
+
     @classmethod
     def _update_cache(cls, user_id, course_key, visible_blocks):
         """
@@ -738,6 +765,255 @@ class PersistentCourseGrade(TimeStampedModel):
         )
 
 
+class PersistentCourseGradeTotals(TimeStampedModel):
+    """
+    A django model tracking the graded totals of the subsections used to
+    compute a learner's persisted course grade, so that the course grade
+    can be updated incrementally when a single subsection grade changes.
+
+    .. no_pii:
+    """
+    class Meta:
+        app_label = "grades"
+        unique_together = [
+            ('course_id', 'user_id'),
+        ]
+
+    id = UnsignedBigIntAutoField(primary_key=True)  # pylint: disable=invalid-name
+    user_id = models.IntegerField(blank=False)
+    course_id = CourseKeyField(blank=False, max_length=255)
+
+    # Information relating to the state of content when the totals were computed
+    course_version = models.CharField('Course content version identifier', blank=True, max_length=255)
+    grading_policy_hash = models.CharField('Hash of grading policy', blank=False, max_length=255)
+    structure_hash = models.CharField('Hash of the blocks visible to the learner', blank=False, max_length=100)
+
+    # Information relating to the learner's subsection grades when the totals were computed
+    subsection_grades_count = models.IntegerField(blank=False)
+    subsection_grades_modified = models.DateTimeField(blank=True, null=True)
+
+    # JSON list of the learner's SubsectionTotals, in course order
+    totals_json = models.TextField()
+
+    def __str__(self):
+        """
+        Returns a string representation of this model.
+        """
+        return ', '.join([
+            f"{type(self).__name__} user: {self.user_id}",
+            f"course version: {self.course_version}",
+            f"grading policy: {self.grading_policy_hash}",
+            f"subsection grades: {self.subsection_grades_count}",
+        ])
+
+    @property
+    def subsection_totals(self):
+        """
+        Returns the list of SubsectionTotals stored in this model.
+        """
+        return [
+            SubsectionTotal(UsageKey.from_string(location), *values)
+            for location, *values in json.loads(self.totals_json)
+        ]
+
+    @classmethod
+    def read(cls, user_id, course_id):
+        """
+        Reads the subsection totals of the given user's course grade.
+
+        Raises PersistentCourseGradeTotals.DoesNotExist if applicable
+        """
+        return cls.objects.get(user_id=user_id, course_id=course_id)
+
+    @classmethod
+    def update_or_create(cls, user_id, course_id, subsection_totals, **kwargs):
+        """
+        Creates or updates the subsection totals of the given user's course grade.
+        """
+        kwargs['totals_json'] = json.dumps([
+            [str(total.location)] + list(total[1:]) for total in subsection_totals
+        ])
+        totals, _ = cls.objects.update_or_create(user_id=user_id, course_id=course_id, defaults=kwargs)
+        return totals
+
+    @classmethod
+    def delete_totals_for_learner(cls, user_id, course_id):
+        """
+        Deletes the subsection totals of the given user's course grade.
+        """
+        cls.objects.filter(user_id=user_id, course_id=course_id).delete()
+
+    def other_subsection_grades_changed(self, usage_key, was_persisted):
+        """
+        Returns whether any of the learner's subsection grades other than the
+        one for the given usage key were created, updated or deleted since
+        these totals were computed.  was_persisted is whether the grade for
+        the given usage key existed when these totals were computed.
+        """
+        others = PersistentSubsectionGrade.objects.filter(
+            user_id=self.user_id,
+            course_id=self.course_id,
+        ).exclude(
+            usage_key=usage_key,
+        ).aggregate(count=Count('id'), modified=Max('modified'))
+        expected_count = self.subsection_grades_count - (1 if was_persisted else 0)
+        if others['count'] != expected_count:
+            return True
+        return others['modified'] is not None and (
+            self.subsection_grades_modified is None or others['modified'] > self.subsection_grades_modified
+        )
+
+
+class CourseRegradeProgress(TimeStampedModel):
+    """
+    A django model tracking the progress of regrading all learners enrolled
+    in a course after a change to the course's grading policy.
+
+    Learners are regraded in batches of enrollments, claimed in order of
+    enrollment id by a bounded number of concurrent tasks.  A running regrade
+    whose progress wasn't updated for POLICY_CHANGE_GRADES_STALE_SECONDS,
+    such as when its tasks were killed, is marked as abandoned.
+
+    .. no_pii:
+    """
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    SUPERSEDED = 'superseded'
+    ABANDONED = 'abandoned'
+    STATUS_CHOICES = (
+        (RUNNING, 'Running'),
+        (COMPLETED, 'Completed'),
+        (SUPERSEDED, 'Superseded by a later regrade'),
+        (ABANDONED, 'Abandoned by its tasks'),
+    )
+
+    # Weight of the most recent batch in the moving average of the cost of regrading a learner
+    COST_SMOOTHING = 0.5
+
+    class Meta:
+        app_label = "grades"
+
+    course_id = CourseKeyField(blank=False, max_length=255, db_index=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=RUNNING)
+
+    total_learners = models.IntegerField()
+    graded_learners = models.IntegerField(default=0)
+    failed_learners = models.IntegerField(default=0)
+
+    # Id of the last enrollment claimed for regrading
+    last_enrollment_id = models.IntegerField(default=0)
+    # Number of tasks that are queued or running for this regrade
+    active_tasks = models.IntegerField(default=0)
+    # Moving average of the measured time, in seconds, to regrade a learner
+    seconds_per_learner = models.FloatField(blank=True, null=True)
+
+    def __str__(self):
+        """
+        Returns a string representation of this model.
+        """
+        return ', '.join([
+            f"{type(self).__name__} course: {self.course_id}",
+            f"status: {self.status}",
+            f"graded: {self.graded_learners}/{self.total_learners}",
+            f"failed: {self.failed_learners}",
+        ])
+
+    @classmethod
+    def start(cls, course_id, total_learners, active_tasks):
+        """
+        Creates the progress record of a new regrade of the given course,
+        superseding any regrade of the course that is still running.
+        """
+        with transaction.atomic():
+            cls._abandon_stale(course_id)
+            cls.objects.filter(course_id=course_id, status=cls.RUNNING).update(status=cls.SUPERSEDED)
+            return cls.objects.create(
+                course_id=course_id,
+                total_learners=total_learners,
+                active_tasks=active_tasks,
+            )
+
+    @classmethod
+    def read_latest(cls, course_id):
+        """
+        Returns the progress record of the most recent regrade of the given
+        course, or None if the course was never regraded.
+        """
+        cls._abandon_stale(course_id)
+        return cls.objects.filter(course_id=course_id).order_by('-created', '-id').first()
+
+    @classmethod
+    def _abandon_stale(cls, course_id):
+        """
+        Marks the running regrades of the given course whose progress wasn't
+        updated for POLICY_CHANGE_GRADES_STALE_SECONDS as abandoned, so that
+        any of their tasks still queued stop.
+        """
+        stale_before = now() - timedelta(seconds=settings.POLICY_CHANGE_GRADES_STALE_SECONDS)
+        cls.objects.filter(
+            course_id=course_id, status=cls.RUNNING, modified__lt=stale_before,
+        ).update(status=cls.ABANDONED)
+
+    @classmethod
+    def claim_enrollments(cls, progress_id, enrollments, batch_size_for):
+        """
+        Claims the next batch of the given enrollments for regrading, in
+        order of enrollment id.  batch_size_for is called with the locked
+        progress record and returns the number of enrollments to claim.
+
+        Returns the (exclusive) first and (inclusive) last enrollment ids of
+        the claimed batch, or None if the regrade has no enrollments left or
+        is no longer running.
+        """
+        with transaction.atomic():
+            progress = cls.objects.select_for_update().get(id=progress_id)
+            if progress.status != cls.RUNNING:
+                return None
+            enrollment_ids = list(
+                enrollments.filter(
+                    id__gt=progress.last_enrollment_id,
+                ).order_by('id').values_list('id', flat=True)[:batch_size_for(progress)]
+            )
+            if not enrollment_ids:
+                return None
+            first_enrollment_id = progress.last_enrollment_id
+            progress.last_enrollment_id = enrollment_ids[-1]
+            progress.save(update_fields=['last_enrollment_id', 'modified'])
+            return first_enrollment_id, progress.last_enrollment_id
+
+    @classmethod
+    def record_batch(cls, progress_id, graded, failed, seconds=None):
+        """
+        Records the number of learners graded and failed in a batch of the
+        given regrade, along with the time it took to regrade them.
+        """
+        with transaction.atomic():
+            progress = cls.objects.select_for_update().get(id=progress_id)
+            progress.graded_learners += graded
+            progress.failed_learners += failed
+            if seconds is not None and graded + failed:
+                batch_cost = seconds / (graded + failed)
+                if progress.seconds_per_learner is None:
+                    progress.seconds_per_learner = batch_cost
+                else:
+                    progress.seconds_per_learner += cls.COST_SMOOTHING * (batch_cost - progress.seconds_per_learner)
+            progress.save()
+
+    @classmethod
+    def finish_task(cls, progress_id):
+        """
+        Records that one of the tasks of the given regrade has finished,
+        completing the regrade once all of its tasks have finished.
+        """
+        with transaction.atomic():
+            progress = cls.objects.select_for_update().get(id=progress_id)
+            progress.active_tasks = max(progress.active_tasks - 1, 0)
+            if progress.active_tasks == 0 and progress.status == cls.RUNNING:
+                progress.status = cls.COMPLETED
+            progress.save()
+            return progress
+
+
 class PersistentSubsectionGradeOverride(models.Model):
     """
     A django model tracking persistent grades overrides at the subsection level.
@@ -793,6 +1069,19 @@ class PersistentSubsectionGradeOverride(models.Model):
             cls.objects.filter(grade__user_id=user_id, grade__course_id=course_key)
         }
 
+    @classmethod
+    def prefetch_from_grades(cls, course_key, grades_by_user):
+        """
+        Prefetches the overrides of each user in the given dict of user ids
+        to the user's subsection grades in the course, using the overrides
+        already read along with the grades.
+        """
+        cache = get_cache(cls._CACHE_NAMESPACE)
+        for user_id, grades in grades_by_user.items():
+            cache[(user_id, str(course_key))] = {
+                grade.usage_key: grade.override for grade in grades if hasattr(grade, 'override')
+            }
+
     @classmethod
     def get_override(cls, user_id, usage_key):  # lint-amnesty, pylint: disable=missing-function-docstring
         prefetch_values = get_cache(cls._CACHE_NAMESPACE).get((user_id, str(usage_key.course_key)), None)
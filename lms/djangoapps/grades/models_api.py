@@ -6,7 +6,9 @@ from django.db import transaction
 
 from opaque_keys.edx.keys import CourseKey, UsageKey
 
+from lms.djangoapps.grades.models import CourseRegradeProgress as _CourseRegradeProgress
 from lms.djangoapps.grades.models import PersistentCourseGrade as _PersistentCourseGrade
+from lms.djangoapps.grades.models import PersistentCourseGradeTotals as _PersistentCourseGradeTotals
 from lms.djangoapps.grades.models import PersistentSubsectionGrade as _PersistentSubsectionGrade
 from lms.djangoapps.grades.models import PersistentSubsectionGradeOverride as _PersistentSubsectionGradeOverride
 from lms.djangoapps.grades.models import VisibleBlocks as _VisibleBlocks
@@ -27,6 +29,34 @@ def prefetch_course_and_subsection_grades(course_key, users):
     _PersistentSubsectionGrade.prefetch(course_key, users)
 
 
+def prefetch_grades_for_users(course_key, users):
+    """
+    Prefetches the course and subsection grades of the given users in the
+    given course, along with the overrides and visible blocks of their
+    subsection grades, in a constant number of queries.
+    """
+    _PersistentCourseGrade.prefetch(course_key, users)
+    _PersistentSubsectionGrade.prefetch(course_key, users)
+    grades_by_user = {
+        user.id: _PersistentSubsectionGrade.bulk_read_grades(user.id, course_key)
+        for user in users
+    }
+    _PersistentSubsectionGradeOverride.prefetch_from_grades(course_key, grades_by_user)
+    _VisibleBlocks.prefetch_from_grades(course_key, grades_by_user)
+
+
+def clear_prefetched_grades_for_users(course_key, users):
+    """
+    Clears the course and subsection grades, overrides and visible blocks
+    prefetched for the given users in the given course.
+    """
+    _PersistentCourseGrade.clear_prefetched_data(course_key)
+    _PersistentSubsectionGrade.clear_prefetched_data(course_key)
+    for user in users:
+        _PersistentSubsectionGradeOverride.clear_prefetched_overrides_for_learner(user.id, course_key)
+        _VisibleBlocks.clear_prefetched_data(user.id, course_key)
+
+
 def clear_prefetched_course_grades(course_key):
     _PersistentCourseGrade.clear_prefetched_data(course_key)
     _PersistentSubsectionGrade.clear_prefetched_data(course_key)
@@ -109,3 +139,13 @@ def clear_user_course_grades(user_id, course_key):
     with transaction.atomic():
         _PersistentSubsectionGrade.delete_subsection_grades_for_learner(user_id, course_key)
         _PersistentCourseGrade.delete_course_grade_for_learner(course_key, user_id)
+        _PersistentCourseGradeTotals.delete_totals_for_learner(user_id, course_key)
+
+
+def get_course_regrade_progress(course_key_or_id):
+    """
+    Returns the CourseRegradeProgress of the most recent regrade of all
+    learners in the given course, or None if the course was never regraded.
+    """
+    course_key = _get_key(course_key_or_id, CourseKey)
+    return _CourseRegradeProgress.read_latest(course_key)
@@ -0,0 +1,128 @@
+"""
+Batch prefetching of the grades data of many users in a course.
+
+Computing or reading the grade of a single user reads the user's
+persisted course and subsection grades, the visible blocks and overrides
+of those subsection grades, and the user's scores stored in CSM and by
+the Submissions API.  Within a prefetched_grades_data context, all of
+these are read for a batch of users and served to the grade factories
+from the RequestCache.  All but the Submissions API scores are read in a
+constant number of queries; those are read per user with a stored
+anonymous id, since edx-submissions has no public bulk API for them.
+"""
+
+
+from contextlib import contextmanager
+
+from submissions import api as submissions_api
+
+from common.djangoapps.student.models import AnonymousUserId
+from lms.djangoapps.courseware.model_data import ScoresClient
+from openedx.core.lib.cache_utils import get_cache
+
+from .models_api import clear_prefetched_grades_for_users, prefetch_grades_for_users
+from .scores import possibly_scored
+
+_CACHE_NAMESPACE = 'grades.prefetch'
+
+
+@contextmanager
+def prefetched_grades_data(course_data, users):
+    """
+    Prefetches the grades data of the given users in the course of the
+    given CourseData, deleting the prefetched data on context exit.
+    """
+    users = list(users)
+    prefetch_grades_data(course_data, users)
+    try:
+        yield
+    finally:
+        clear_prefetched_grades_data(course_data.course_key, users)
+
+
+def prefetch_grades_data(course_data, users):
+    """
+    Prefetches the persisted grades and the CSM and Submissions API scores
+    of the given users in the course of the given CourseData.
+    """
+    course_key = course_data.course_key
+    prefetch_grades_for_users(course_key, users)
+
+    scorable_locations = [
+        block_key for block_key in course_data.collected_structure if possibly_scored(block_key)
+    ]
+    cache = get_cache(_CACHE_NAMESPACE)
+    cache[_csm_cache_key(course_key)] = ScoresClient.create_for_users(
+        course_key, [user.id for user in users], scorable_locations,
+    )
+    cache[_submissions_cache_key(course_key)] = _get_submissions_scores(course_key, users)
+
+
+def clear_prefetched_grades_data(course_key, users):
+    """
+    Clears the grades data prefetched for the given users in the given course.
+    """
+    clear_prefetched_grades_for_users(course_key, users)
+    cache = get_cache(_CACHE_NAMESPACE)
+    cache.pop(_csm_cache_key(course_key), None)
+    cache.pop(_submissions_cache_key(course_key), None)
+
+
+def is_prefetched(user, course_key):
+    """
+    Returns whether the grades data of the given user in the given course
+    has been prefetched.
+    """
+    return user.id in get_cache(_CACHE_NAMESPACE).get(_csm_cache_key(course_key), {})
+
+
+def get_prefetched_csm_scores(user, course_key):
+    """
+    Returns the prefetched ScoresClient of the given user in the given
+    course, or None if it wasn't prefetched.
+    """
+    return get_cache(_CACHE_NAMESPACE).get(_csm_cache_key(course_key), {}).get(user.id)
+
+
+def get_prefetched_submissions_scores(user, course_key):
+    """
+    Returns the prefetched Submissions API scores of the given user in the
+    given course, or None if they weren't prefetched.
+    """
+    return get_cache(_CACHE_NAMESPACE).get(_submissions_cache_key(course_key), {}).get(user.id)
+
+
+def _get_submissions_scores(course_key, users):
+    """
+    Returns a dict of user ids to the user's scores in the given course,
+    as returned by submissions.api.get_scores.
+    """
+    scores = {user.id: {} for user in users}
+    # Read with the public per-user API, until edx-submissions provides a bulk one.
+    for anonymous_user_id, user_id in _get_user_ids_by_anonymous_id(course_key, users).items():
+        scores[user_id] = submissions_api.get_scores(str(course_key), anonymous_user_id)
+    return scores
+
+
+def _get_user_ids_by_anonymous_id(course_key, users):
+    """
+    Returns a dict of the stored anonymous ids of the given users in the
+    given course to their user ids.  As in anonymous_id_for_user, the
+    most recently created anonymous id of each user is used.  Users
+    without a stored anonymous id can't have any submissions.
+    """
+    anonymous_ids = {}
+    for user_id, anonymous_user_id in AnonymousUserId.objects.filter(
+        user_id__in=[user.id for user in users],
+        course_id=course_key,
+    ).order_by('id').values_list('user_id', 'anonymous_user_id'):
+        anonymous_ids[user_id] = anonymous_user_id
+    return {anonymous_user_id: user_id for user_id, anonymous_user_id in anonymous_ids.items()}
+
+
+def _csm_cache_key(course_key):
+    return f'csm_scores.{course_key}'
+
+
+def _submissions_cache_key(course_key):
+    return f'submissions_scores.{course_key}'
@@ -33,6 +33,7 @@ from common.djangoapps.util.date_utils import to_timestamp
 from lms.djangoapps.course_blocks.api import get_course_blocks
 from lms.djangoapps.grades.api import CourseGradeFactory, clear_prefetched_course_and_subsection_grades
 from lms.djangoapps.grades.api import constants as grades_constants
+from lms.djangoapps.grades.api import get_course_regrade_progress
 from lms.djangoapps.grades.api import context as grades_context
 from lms.djangoapps.grades.api import events as grades_events
 from lms.djangoapps.grades.api import gradebook_bulk_management_enabled
@@ -340,6 +341,45 @@ class CourseGradingView(BaseCourseView):
         return subsections
 
 
+class CourseRegradeProgressView(BaseCourseView):
+    """
+    Returns the progress of the most recent regrade of all learners in a course,
+    as kicked off by a change to the course's grading policy.
+    **Example Requests**
+
+        GET /api/grades/v1/gradebook/{course_id}/regrade-progress
+
+    **GET Response Values**
+
+        The HTTP 200 response has the following values, or is empty if the course was never regraded.
+
+        * status - One of 'running', 'completed', 'superseded' (by a later regrade of the course) or
+          'abandoned' (when its progress was not updated for too long, such as when its tasks were killed).
+        * total_learners - The number of learners enrolled in the course when the regrade started.
+        * graded_learners - The number of learners regraded so far.
+        * failed_learners - The number of learners that failed to be regraded.
+        * started - The time the regrade started.
+        * modified - The time the progress of the regrade was last updated.
+
+    """
+    @course_author_access_required
+    def get(self, request, course_key):
+        """
+        Returns the progress of the most recent regrade of the requested course.
+        """
+        progress = get_course_regrade_progress(course_key)
+        if progress is None:
+            return Response({})
+        return Response({
+            'status': progress.status,
+            'total_learners': progress.total_learners,
+            'graded_learners': progress.graded_learners,
+            'failed_learners': progress.failed_learners,
+            'started': progress.created,
+            'modified': progress.modified,
+        })
+
+
 @view_auth_classes()
 class GradebookView(GradeViewMixin, PaginatedAPIView):
     """
@@ -42,6 +42,7 @@ from lms.djangoapps.grades.course_grade import CourseGrade
 from lms.djangoapps.grades.models import (
     BlockRecord,
     BlockRecordList,
+    CourseRegradeProgress,
     PersistentCourseGrade,
     PersistentSubsectionGrade,
     PersistentSubsectionGradeOverride
@@ -283,6 +284,52 @@ class CourseGradingViewTest(SharedModuleStoreTestCase, APITestCase):
         assert resp.data['can_see_bulk_management'] is True
 
 
+class CourseRegradeProgressViewTest(SharedModuleStoreTestCase, APITestCase):
+    """
+    Test the course regrade progress view via a RESTful API
+    """
+    view_name = 'grades_api:v1:course_gradebook_regrade_progress'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.course = CourseFactory.create(display_name='test course', run="Testing_course")
+        cls.password = 'test'
+        cls.student = UserFactory(username='dummy', password=cls.password)
+        cls.staff = StaffFactory(course_key=cls.course.id, password=cls.password)
+
+    def get_url(self, course_id):
+        return reverse(self.view_name, kwargs={'course_id': course_id})
+
+    def test_student_fails(self):
+        self.client.login(username=self.student.username, password=self.password)
+        resp = self.client.get(self.get_url(self.course.id))
+        assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_never_regraded(self):
+        self.client.login(username=self.staff.username, password=self.password)
+        resp = self.client.get(self.get_url(self.course.id))
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.data == {}
+
+    def test_staff_succeeds(self):
+        progress = CourseRegradeProgress.start(self.course.id, total_learners=10, active_tasks=2)
+        CourseRegradeProgress.record_batch(progress.id, graded=4, failed=1, seconds=5.0)
+        progress.refresh_from_db()
+
+        self.client.login(username=self.staff.username, password=self.password)
+        resp = self.client.get(self.get_url(self.course.id))
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.data == {
+            'status': CourseRegradeProgress.RUNNING,
+            'total_learners': 10,
+            'graded_learners': 4,
+            'failed_learners': 1,
+            'started': progress.created,
+            'modified': progress.modified,
+        }
+
+
 class GradebookViewTestBase(GradeViewTestMixin, APITestCase):
     """
     Base class for the gradebook GET and POST view tests.
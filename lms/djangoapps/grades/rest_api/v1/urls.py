@@ -39,6 +39,11 @@ urlpatterns = [
         gradebook_views.CourseGradingView.as_view(),
         name='course_gradebook_grading_info'
     ),
+    re_path(
+        fr'^gradebook/{settings.COURSE_ID_PATTERN}/regrade-progress$',
+        gradebook_views.CourseRegradeProgressView.as_view(),
+        name='course_gradebook_regrade_progress'
+    ),
     re_path(
         r'^subsection/(?P<subsection_id>.*)/$',
         gradebook_views.SubsectionGradeView.as_view(),
@@ -252,12 +252,14 @@ def enqueue_subsection_update(sender, **kwargs):  # pylint: disable=unused-argum
 
 
 @receiver(SUBSECTION_SCORE_CHANGED)
-def recalculate_course_grade_only(sender, course, course_structure, user, **kwargs):  # pylint: disable=unused-argument
+def recalculate_course_grade_only(sender, course, course_structure, user, subsection_grade, **kwargs):  # pylint: disable=unused-argument
     """
     Updates a saved course grade, but does not update the subsection
     grades the user has in this course.
     """
-    CourseGradeFactory().update(user, course=course, course_structure=course_structure)
+    CourseGradeFactory().update_for_subsection(
+        user, subsection_grade.location, course=course, course_structure=course_structure,
+    )
 
 
 @receiver(ENROLLMENT_TRACK_UPDATED)
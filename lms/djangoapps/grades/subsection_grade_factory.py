@@ -13,6 +13,7 @@ from submissions import api as submissions_api
 from common.djangoapps.student.models import anonymous_id_for_user
 from lms.djangoapps.courseware.model_data import ScoresClient
 from lms.djangoapps.grades.models import PersistentSubsectionGrade
+from lms.djangoapps.grades.prefetch import get_prefetched_csm_scores, get_prefetched_submissions_scores
 from lms.djangoapps.grades.scores import possibly_scored
 from openedx.core.djangoapps.signals.signals import COURSE_ASSESSMENT_GRADE_CHANGED
 from openedx.core.lib.grade_utils import is_score_higher_or_equal
@@ -61,6 +62,17 @@ class SubsectionGradeFactory:
                     self._update_saved_subsection_grade(subsection.location, grade_model)
         return subsection_grade
 
+    def read(self, subsection):
+        """
+        Returns the student's persisted SubsectionGrade for the subsection,
+        read on its own, or a ZeroSubsectionGrade if there is none.
+        """
+        try:
+            grade_model = PersistentSubsectionGrade.read_grade(self.student.id, subsection.location)
+        except PersistentSubsectionGrade.DoesNotExist:
+            return ZeroSubsectionGrade(subsection, self.course_data)
+        return ReadSubsectionGrade(subsection, grade_model, self)
+
     def bulk_create_unsaved(self):
         """
         Bulk creates all the unsaved subsection_grades to this point.
@@ -121,6 +133,9 @@ class SubsectionGradeFactory:
         Lazily queries and returns all the scores stored in the user
         state (in CSM) for the course, while caching the result.
         """
+        prefetched_scores = get_prefetched_csm_scores(self.student, self.course_data.course_key)
+        if prefetched_scores is not None:
+            return prefetched_scores
         scorable_locations = [block_key for block_key in self.course_data.structure if possibly_scored(block_key)]
         return ScoresClient.create_for_locations(self.course_data.course_key, self.student.id, scorable_locations)
 
@@ -130,6 +145,9 @@ class SubsectionGradeFactory:
         Lazily queries and returns the scores stored by the
         Submissions API for the course, while caching the result.
         """
+        prefetched_scores = get_prefetched_submissions_scores(self.student, self.course_data.course_key)
+        if prefetched_scores is not None:
+            return prefetched_scores
         anonymous_user_id = anonymous_id_for_user(self.student, self.course_data.course_key)
         return submissions_api.get_scores(str(self.course_data.course_key), anonymous_user_id)
 
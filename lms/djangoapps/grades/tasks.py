@@ -1,6 +1,8 @@
 """
 This module contains tasks for asynchronous execution of grade updates.
 """
+import math
+import time
 from logging import getLogger
 
 from celery import shared_task
@@ -35,6 +37,7 @@ from .constants import ScoreDatabaseTableEnum
 from .course_grade_factory import CourseGradeFactory
 from .exceptions import DatabaseNotReadyError
 from .grade_utils import are_grades_frozen
+from .models import CourseRegradeProgress
 from .signals.signals import SUBSECTION_SCORE_CHANGED
 from .subsection_grade_factory import SubsectionGradeFactory
 from .transformer import GradesTransformer
@@ -58,8 +61,10 @@ SUBSECTION_GRADE_TIMEOUT_SECONDS = 300
 def compute_all_grades_for_course(**kwargs):
     """
     Compute grades for all students in the specified course.
-    Kicks off a series of compute_grades_for_course_v2 tasks
-    to cover all of the students in the course.
+    Kicks off a bounded number of regrade_course_enrollments tasks,
+    which claim batches of the course's enrollments until all of the
+    students in the course are covered.  The progress of the regrade
+    is tracked in a CourseRegradeProgress record.
     """
     if DISABLE_REGRADE_ON_POLICY_CHANGE.is_enabled():
         log.debug('Grades: ignoring policy change regrade due to waffle switch')
@@ -68,17 +73,119 @@ def compute_all_grades_for_course(**kwargs):
         if are_grades_frozen(course_key):
             log.info("Attempted compute_all_grades_for_course for course '%s', but grades are frozen.", course_key)
             return
-        for course_key_string, offset, batch_size in _course_task_args(course_key=course_key, **kwargs):
-            kwargs.update({
-                'course_key': course_key_string,
-                'offset': offset,
-                'batch_size': batch_size,
-            })
-            compute_grades_for_course_v2.apply_async(
+        enrollment_count = CourseEnrollment.objects.filter(course_id=course_key).count()
+        if enrollment_count == 0:
+            log.warning(f"No enrollments found for {course_key}")
+            return
+
+        batch_size = ComputeGradesSetting.current().batch_size
+        task_count = min(
+            math.ceil(enrollment_count / batch_size),
+            settings.POLICY_CHANGE_GRADES_MAX_CONCURRENT_TASKS,
+        )
+        progress = CourseRegradeProgress.start(course_key, enrollment_count, active_tasks=task_count)
+        kwargs.update({
+            'course_key': str(course_key),
+            'progress_id': progress.id,
+        })
+        for _ in range(task_count):
+            regrade_course_enrollments.apply_async(
                 kwargs=kwargs, queue=settings.POLICY_CHANGE_GRADES_ROUTING_KEY
             )
 
 
+@shared_task(
+    bind=True,
+    base=LoggedPersistOnFailureTask,
+    default_retry_delay=RETRY_DELAY_SECONDS,
+    max_retries=1,
+    time_limit=COURSE_GRADE_TIMEOUT_SECONDS,
+    rate_limit=settings.POLICY_CHANGE_TASK_RATE_LIMIT,
+)
+@set_code_owner_attribute
+def regrade_course_enrollments(self, **kwargs):
+    """
+    Compute grades for the next batch of students in a course-wide regrade.
+
+    Claims the next batch of the course's enrollments, in order of
+    enrollment id, from the regrade's CourseRegradeProgress record,
+    computes and saves the grades of their students, records the results
+    and re-enqueues itself to claim the next batch.  The size of each
+    batch is adapted to the measured time it takes to grade a student,
+    aiming for tasks that take POLICY_CHANGE_GRADES_TARGET_TASK_SECONDS.
+    """
+    if 'event_transaction_id' in kwargs:
+        set_event_transaction_id(kwargs['event_transaction_id'])
+
+    if 'event_transaction_type' in kwargs:
+        set_event_transaction_type(kwargs['event_transaction_type'])
+
+    course_key = CourseKey.from_string(kwargs['course_key'])
+    progress_id = kwargs['progress_id']
+    if are_grades_frozen(course_key):
+        log.info("Attempted regrade_course_enrollments for course '%s', but grades are frozen.", course_key)
+        CourseRegradeProgress.finish_task(progress_id)
+        return
+
+    enrollments = CourseEnrollment.objects.filter(course_id=course_key)
+    if 'last_enrollment_id' not in kwargs:
+        claimed = CourseRegradeProgress.claim_enrollments(progress_id, enrollments, _regrade_batch_size)
+        if claimed is None:
+            CourseRegradeProgress.finish_task(progress_id)
+            return
+        kwargs['first_enrollment_id'], kwargs['last_enrollment_id'] = claimed
+
+    enrollments = enrollments.filter(
+        id__gt=kwargs['first_enrollment_id'],
+        id__lte=kwargs['last_enrollment_id'],
+    ).select_related('user').order_by('id')
+    try:
+        graded, failed, seconds = _regrade_enrollments(course_key, enrollments)
+    except Exception as exc:  # pylint: disable=broad-except
+        if self.request.retries < self.max_retries:
+            raise self.retry(kwargs=kwargs, exc=exc)
+        log.exception(
+            "Grades: failed to regrade enrollments %s to %s of course %s",
+            kwargs['first_enrollment_id'], kwargs['last_enrollment_id'], course_key,
+        )
+        graded, failed, seconds = 0, enrollments.count(), None
+    CourseRegradeProgress.record_batch(progress_id, graded, failed, seconds)
+
+    del kwargs['first_enrollment_id'], kwargs['last_enrollment_id']
+    regrade_course_enrollments.apply_async(kwargs=kwargs, queue=settings.POLICY_CHANGE_GRADES_ROUTING_KEY)
+
+
+def _regrade_enrollments(course_key, enrollments):
+    """
+    Computes and saves the grades of the students of the given enrollments.
+    Returns the number of students graded, the number of students that
+    failed to be graded, and the time, in seconds, it took to grade them.
+    """
+    graded = failed = 0
+    start_time = time.monotonic()
+    students = (enrollment.user for enrollment in enrollments)
+    for result in CourseGradeFactory().iter(users=students, course_key=course_key, force_update=True):
+        if result.error is None:
+            graded += 1
+        else:
+            failed += 1
+    return graded, failed, time.monotonic() - start_time
+
+
+def _regrade_batch_size(progress):
+    """
+    Returns the number of enrollments to claim in the next batch of the
+    given regrade, sized so that regrading them takes about
+    POLICY_CHANGE_GRADES_TARGET_TASK_SECONDS.  The configured
+    ComputeGradesSetting batch size is used until the cost of regrading
+    a student has been measured.
+    """
+    if not progress.seconds_per_learner:
+        return ComputeGradesSetting.current().batch_size
+    batch_size = int(settings.POLICY_CHANGE_GRADES_TARGET_TASK_SECONDS / progress.seconds_per_learner)
+    return max(1, min(batch_size, settings.POLICY_CHANGE_GRADES_MAX_BATCH_SIZE))
+
+
 @shared_task(
     bind=True,
     base=LoggedPersistOnFailureTask,
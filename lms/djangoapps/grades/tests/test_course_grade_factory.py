@@ -4,15 +4,21 @@ Tests for the CourseGradeFactory class.
 from unittest.mock import patch
 
 import ddt
+from edx_toggles.toggles.testutils import override_waffle_flag
 
 from common.djangoapps.student.tests.factories import UserFactory
 from lms.djangoapps.courseware.access import has_access
+from lms.djangoapps.courseware.model_data import ScoresClient
 from openedx.core.djangoapps.content.block_structure.factory import BlockStructureFactory
+from xmodule.graders import WeightedSubsectionsGrader  # lint-amnesty, pylint: disable=wrong-import-order
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase  # lint-amnesty, pylint: disable=wrong-import-order
 from xmodule.modulestore.tests.factories import CourseFactory  # lint-amnesty, pylint: disable=wrong-import-order
 
+from ..config.waffle import INCREMENTAL_COURSE_GRADE_UPDATE
 from ..course_grade import CourseGrade, ZeroCourseGrade
 from ..course_grade_factory import CourseGradeFactory
+from ..models import PersistentSubsectionGrade
+from ..prefetch import prefetch_grades_data
 from ..subsection_grade import ReadSubsectionGrade, ZeroSubsectionGrade
 from .base import GradeTestBase
 from .utils import mock_get_score
@@ -158,6 +164,66 @@ class TestCourseGradeFactory(GradeTestBase):
             ))
         assert mock_update.called == force_update
 
+    def test_iter_uses_prefetched_scores(self):
+        # The submissions scores of a user are only read after looking up the user's anonymous id.
+        with patch('lms.djangoapps.grades.subsection_grade_factory.anonymous_id_for_user') as mock_anonymous_id:
+            with patch.object(ScoresClient, 'create_for_locations') as mock_create_for_locations:
+                grade_results = list(CourseGradeFactory().iter(
+                    users=[self.request.user], course=self.course, force_update=True,
+                ))
+        assert grade_results[0].error is None
+        assert not mock_anonymous_id.called
+        assert not mock_create_for_locations.called
+
+    def test_iter_transforms_course_structures_together(self):
+        with patch('lms.djangoapps.grades.course_data.get_course_blocks') as mock_get_course_blocks:
+            grade_results = list(CourseGradeFactory().iter(
+                users=[self.request.user], course=self.course, force_update=True,
+            ))
+        assert grade_results[0].error is None
+        assert not mock_get_course_blocks.called
+
+    def _update_for_subsection(self, subsection):
+        """
+        Updates the grade of the given subsection and then the course grade.
+        """
+        self.subsection_grade_factory.update(self.course_structure[subsection.location])
+        return CourseGradeFactory().update_for_subsection(
+            self.request.user, subsection.location, course=self.course, course_structure=self.course_structure,
+        )
+
+    @override_waffle_flag(INCREMENTAL_COURSE_GRADE_UPDATE, active=True)
+    def test_update_for_subsection_incrementally(self):
+        with mock_get_score(1, 2):
+            self._update_for_subsection(self.sequence)
+
+        with mock_get_score(2, 2):
+            with patch.object(PersistentSubsectionGrade, 'bulk_read_grades') as mock_bulk_read_grades:
+                with patch.object(
+                    WeightedSubsectionsGrader, 'grade', autospec=True, side_effect=WeightedSubsectionsGrader.grade,
+                ) as mock_grade:
+                    course_grade = self._update_for_subsection(self.sequence2)
+            assert not mock_bulk_read_grades.called
+            _, grade_sheet = mock_grade.call_args_list[0][0][:2]
+            assert {entry.display_name for entry in grade_sheet['Homework'].values()} == {
+                self.sequence.display_name, self.sequence2.display_name,
+            }
+            assert course_grade.percent == CourseGradeFactory().update(self.request.user, self.course).percent
+            assert course_grade.percent == CourseGradeFactory().read(self.request.user, self.course).percent
+
+    @override_waffle_flag(INCREMENTAL_COURSE_GRADE_UPDATE, active=True)
+    def test_update_for_subsection_with_outdated_totals(self):
+        with mock_get_score(1, 2):
+            self._update_for_subsection(self.sequence)
+
+        with mock_get_score(2, 2):
+            # the other subsection's grade changes without updating the course grade
+            self.subsection_grade_factory.update(self.course_structure[self.sequence.location])
+            with patch.object(CourseGradeFactory, '_update', wraps=CourseGradeFactory._update) as mock_update:
+                course_grade = self._update_for_subsection(self.sequence2)
+            assert mock_update.called
+            assert course_grade.percent == CourseGradeFactory().update(self.request.user, self.course).percent
+
     def test_course_grade_summary(self):
         with mock_get_score(1, 2):
             self.subsection_grade_factory.update(self.course_structure[self.sequence.location])
@@ -268,6 +334,17 @@ class TestGradeIteration(SharedModuleStoreTestCase):
             assert course_grade.letter_grade is None
             assert course_grade.percent == 0.0
 
+    @patch.object(CourseGradeFactory, 'PREFETCH_BATCH_SIZE', 2)
+    def test_prefetch_batches(self):
+        with patch(
+            'lms.djangoapps.grades.prefetch.prefetch_grades_data',
+            wraps=prefetch_grades_data,
+        ) as mock_prefetch:
+            all_course_grades, all_errors = self._course_grades_and_errors_for(self.course, self.students)
+        assert mock_prefetch.call_count == 3
+        assert len(all_course_grades) == 5
+        assert len(all_errors) == 0
+
     @patch('lms.djangoapps.grades.course_grade_factory.CourseGradeFactory.read')
     def test_grading_exception(self, mock_course_grade):
         """Test that we correctly capture exception messages that bubble up from
@@ -286,7 +363,7 @@ class TestGradeIteration(SharedModuleStoreTestCase):
             else mock_course_grade.return_value
             for student in self.students
         ]
-        with self.assertNumQueries(11):
+        with self.assertNumQueries(15):
             all_course_grades, all_errors = self._course_grades_and_errors_for(self.course, self.students)
         assert {student: str(all_errors[student]) for student in all_errors} == {
             student3: 'Error for student3.',
@@ -14,7 +14,7 @@ import ddt
 import pytest
 import pytz
 from django.db.utils import IntegrityError
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils.timezone import now
 from freezegun import freeze_time
 from opaque_keys import InvalidKeyError
@@ -27,9 +27,12 @@ from lms.djangoapps.grades.models import (
     BLOCK_RECORD_LIST_VERSION,
     BlockRecord,
     BlockRecordList,
+    CourseRegradeProgress,
     PersistentCourseGrade,
+    PersistentCourseGradeTotals,
     PersistentSubsectionGrade,
     PersistentSubsectionGradeOverride,
+    SubsectionTotal,
     VisibleBlocks
 )
 
@@ -550,3 +553,129 @@ class PersistentCourseGradesTest(GradesModelTestCase):
         self.assertTrue(PersistentCourseGrade.objects.filter(
             user_id=self.params['user_id'], course_id=other_course_key).exists()
         )
+
+
+class PersistentCourseGradeTotalsTest(GradesModelTestCase):
+    """
+    Tests the PersistentCourseGradeTotals model.
+    """
+    def setUp(self):
+        super().setUp()
+        self.user_id = UserFactory().id
+        self.subsection_key = BlockUsageLocator(
+            course_key=self.course_key,
+            block_type='sequential',
+            block_id='subsection_12345',
+        )
+        self.other_subsection_key = BlockUsageLocator(
+            course_key=self.course_key,
+            block_type='sequential',
+            block_id='subsection_67890',
+        )
+        self.subsection_totals = [
+            SubsectionTotal(self.subsection_key, 'Homework', True, 1.0, 2.0, True),
+            SubsectionTotal(self.other_subsection_key, 'Exam', True, 0.0, 4.0, False),
+        ]
+
+    def _create_subsection_grade(self, usage_key):
+        return PersistentSubsectionGrade.update_or_create_grade(
+            user_id=self.user_id,
+            usage_key=usage_key,
+            course_version="deadbeef",
+            subtree_edited_timestamp=None,
+            earned_all=1.0,
+            possible_all=2.0,
+            earned_graded=1.0,
+            possible_graded=2.0,
+            visible_blocks=BlockRecordList([self.record_a], self.course_key),
+            first_attempted=None,
+        )
+
+    def _create_totals(self, subsection_grade):
+        return PersistentCourseGradeTotals.update_or_create(
+            user_id=self.user_id,
+            course_id=self.course_key,
+            subsection_totals=self.subsection_totals,
+            course_version="deadbeef",
+            grading_policy_hash="grading_policy_hash",
+            structure_hash="structure_hash",
+            subsection_grades_count=1,
+            subsection_grades_modified=subsection_grade.modified,
+        )
+
+    def test_create_and_read(self):
+        self._create_totals(self._create_subsection_grade(self.subsection_key))
+        totals = PersistentCourseGradeTotals.read(self.user_id, self.course_key)
+        assert totals.subsection_totals == self.subsection_totals
+        assert totals.subsection_grades_count == 1
+
+    def test_read_does_not_exist(self):
+        with pytest.raises(PersistentCourseGradeTotals.DoesNotExist):
+            PersistentCourseGradeTotals.read(self.user_id, self.course_key)
+
+    def test_other_subsection_grades_changed(self):
+        totals = self._create_totals(self._create_subsection_grade(self.subsection_key))
+        assert not totals.other_subsection_grades_changed(self.subsection_key, was_persisted=True)
+        assert not totals.other_subsection_grades_changed(self.other_subsection_key, was_persisted=False)
+
+        self._create_subsection_grade(self.subsection_key)
+        assert not totals.other_subsection_grades_changed(self.subsection_key, was_persisted=True)
+        assert totals.other_subsection_grades_changed(self.other_subsection_key, was_persisted=False)
+
+    def test_other_subsection_grade_created(self):
+        totals = self._create_totals(self._create_subsection_grade(self.subsection_key))
+        self._create_subsection_grade(self.other_subsection_key)
+        assert not totals.other_subsection_grades_changed(self.other_subsection_key, was_persisted=False)
+        assert totals.other_subsection_grades_changed(self.subsection_key, was_persisted=True)
+
+
+class CourseRegradeProgressTest(GradesModelTestCase):
+    """
+    Tests the CourseRegradeProgress model.
+    """
+    def test_start_supersedes_running_regrade(self):
+        first = CourseRegradeProgress.start(self.course_key, total_learners=10, active_tasks=2)
+        second = CourseRegradeProgress.start(self.course_key, total_learners=12, active_tasks=3)
+        first.refresh_from_db()
+        assert first.status == CourseRegradeProgress.SUPERSEDED
+        assert second.status == CourseRegradeProgress.RUNNING
+        assert CourseRegradeProgress.read_latest(self.course_key) == second
+
+    def test_read_latest_never_regraded(self):
+        assert CourseRegradeProgress.read_latest(self.course_key) is None
+
+    def test_record_batch(self):
+        progress = CourseRegradeProgress.start(self.course_key, total_learners=10, active_tasks=1)
+        CourseRegradeProgress.record_batch(progress.id, graded=3, failed=1, seconds=4.0)
+        progress.refresh_from_db()
+        assert (progress.graded_learners, progress.failed_learners) == (3, 1)
+        assert progress.seconds_per_learner == 1.0
+
+        CourseRegradeProgress.record_batch(progress.id, graded=2, failed=0, seconds=6.0)
+        progress.refresh_from_db()
+        assert (progress.graded_learners, progress.failed_learners) == (5, 1)
+        assert progress.seconds_per_learner == 2.0
+
+        CourseRegradeProgress.record_batch(progress.id, graded=0, failed=4)
+        progress.refresh_from_db()
+        assert (progress.graded_learners, progress.failed_learners) == (5, 5)
+        assert progress.seconds_per_learner == 2.0
+
+    def test_finish_task(self):
+        progress = CourseRegradeProgress.start(self.course_key, total_learners=10, active_tasks=2)
+        assert CourseRegradeProgress.finish_task(progress.id).status == CourseRegradeProgress.RUNNING
+        progress = CourseRegradeProgress.finish_task(progress.id)
+        assert progress.status == CourseRegradeProgress.COMPLETED
+        assert progress.active_tasks == 0
+
+    @override_settings(POLICY_CHANGE_GRADES_STALE_SECONDS=3600)
+    def test_stale_regrade_abandoned(self):
+        with freeze_time('2024-01-01 10:00:00'):
+            progress = CourseRegradeProgress.start(self.course_key, total_learners=10, active_tasks=2)
+        with freeze_time('2024-01-01 10:59:00'):
+            assert CourseRegradeProgress.read_latest(self.course_key).status == CourseRegradeProgress.RUNNING
+        with freeze_time('2024-01-01 11:01:00'):
+            assert CourseRegradeProgress.read_latest(self.course_key).status == CourseRegradeProgress.ABANDONED
+            # the remaining tasks of the abandoned regrade don't claim enrollments or complete it
+            assert CourseRegradeProgress.claim_enrollments(progress.id, None, None) is None
+            assert CourseRegradeProgress.finish_task(progress.id).status == CourseRegradeProgress.ABANDONED
@@ -12,6 +12,7 @@ from unittest.mock import MagicMock, patch
 import ddt
 import pytz
 from django.db.utils import IntegrityError
+from django.test import override_settings
 from django.utils import timezone
 from edx_toggles.toggles.testutils import override_waffle_flag
 from stevedore.extension import Extension, ExtensionManager
@@ -22,17 +23,20 @@ from common.djangoapps.track.event_transaction_utils import create_new_event_tra
 from common.djangoapps.util.date_utils import to_timestamp
 from lms.djangoapps.courseware.tests.test_group_access import MemoryUserPartitionScheme
 from lms.djangoapps.grades import tasks
+from lms.djangoapps.grades.config.models import ComputeGradesSetting
 from lms.djangoapps.grades.config.waffle import ENFORCE_FREEZE_GRADE_AFTER_COURSE_END
 from lms.djangoapps.grades.constants import ScoreDatabaseTableEnum
-from lms.djangoapps.grades.models import PersistentCourseGrade, PersistentSubsectionGrade
+from lms.djangoapps.grades.models import CourseRegradeProgress, PersistentCourseGrade, PersistentSubsectionGrade
 from lms.djangoapps.grades.signals.signals import PROBLEM_WEIGHTED_SCORE_CHANGED
 from lms.djangoapps.grades.tasks import (
     RECALCULATE_GRADE_DELAY_SECONDS,
     _course_task_args,
+    _regrade_batch_size,
     compute_all_grades_for_course,
     compute_grades_for_course,
     compute_grades_for_course_v2,
-    recalculate_subsection_grade_v3
+    recalculate_subsection_grade_v3,
+    regrade_course_enrollments
 )
 from openedx.core.djangoapps.content.block_structure.exceptions import BlockStructureNotFound
 from xmodule.modulestore import ModuleStoreEnum
@@ -156,8 +160,8 @@ class RecalculateSubsectionGradeTest(HasCourseWithProblemsMixin, ModuleStoreTest
             assert mock_block_structure_create.call_count == 1
 
     @ddt.data(
-        (ModuleStoreEnum.Type.split, 2, 41, True),
-        (ModuleStoreEnum.Type.split, 2, 41, False),
+        (ModuleStoreEnum.Type.split, 2, 44, True),
+        (ModuleStoreEnum.Type.split, 2, 44, False),
     )
     @ddt.unpack
     def test_query_counts(self, default_store, num_mongo_calls, num_sql_calls, create_multiple_subsections):
@@ -168,7 +172,7 @@ class RecalculateSubsectionGradeTest(HasCourseWithProblemsMixin, ModuleStoreTest
                     self._apply_recalculate_subsection_grade()
 
     @ddt.data(
-        (ModuleStoreEnum.Type.split, 2, 41),
+        (ModuleStoreEnum.Type.split, 2, 44),
     )
     @ddt.unpack
     def test_query_counts_dont_change_with_more_content(self, default_store, num_mongo_calls, num_sql_calls):
@@ -255,7 +259,7 @@ class RecalculateSubsectionGradeTest(HasCourseWithProblemsMixin, ModuleStoreTest
         UserPartition.scheme_extensions = None
 
     @ddt.data(
-        (ModuleStoreEnum.Type.split, 2, 41),
+        (ModuleStoreEnum.Type.split, 2, 44),
     )
     @ddt.unpack
     def test_persistent_grades_on_course(self, default_store, num_mongo_queries, num_sql_queries):
@@ -450,6 +454,81 @@ class ComputeGradesForCourseTest(HasCourseWithProblemsMixin, ModuleStoreTestCase
             offset_expected += test_batch_size
 
 
+@ddt.ddt
+class RegradeCourseEnrollmentsTest(HasCourseWithProblemsMixin, ModuleStoreTestCase):
+    """
+    Test the course-wide regrade kicked off by compute_all_grades_for_course.
+    """
+
+    ENABLED_SIGNALS = ['course_published', 'pre_publish']
+
+    def setUp(self):
+        super().setUp()
+        self.users = [UserFactory.create() for _ in range(12)]
+        self.set_up_course()
+        for user in self.users:
+            CourseEnrollment.enroll(user, self.course.id)
+        ComputeGradesSetting.objects.create(batch_size=5)
+
+    @ddt.data((4, 3), (2, 2), (1, 1))
+    @ddt.unpack
+    def test_regrades_all_learners(self, max_concurrent_tasks, expected_task_count):
+        with override_settings(POLICY_CHANGE_GRADES_MAX_CONCURRENT_TASKS=max_concurrent_tasks):
+            with patch.object(CourseRegradeProgress, 'start', wraps=CourseRegradeProgress.start) as mock_start:
+                with mock_get_score(1, 2):
+                    result = compute_all_grades_for_course.delay(course_key=str(self.course.id))
+        assert result.successful
+        mock_start.assert_called_once_with(self.course.id, 12, active_tasks=expected_task_count)
+
+        progress = CourseRegradeProgress.read_latest(self.course.id)
+        assert progress.status == CourseRegradeProgress.COMPLETED
+        assert (progress.total_learners, progress.graded_learners, progress.failed_learners) == (12, 12, 0)
+        assert progress.active_tasks == 0
+        assert progress.seconds_per_learner is not None
+        assert PersistentCourseGrade.objects.filter(course_id=self.course.id).count() == 12
+
+    def test_superseded_regrade_stops(self):
+        progress = CourseRegradeProgress.start(self.course.id, 12, active_tasks=1)
+        CourseRegradeProgress.start(self.course.id, 12, active_tasks=1)
+        result = regrade_course_enrollments.delay(course_key=str(self.course.id), progress_id=progress.id)
+        assert result.successful
+
+        progress.refresh_from_db()
+        assert progress.status == CourseRegradeProgress.SUPERSEDED
+        assert (progress.graded_learners, progress.active_tasks) == (0, 0)
+        assert not PersistentCourseGrade.objects.filter(course_id=self.course.id).exists()
+
+    @override_settings(POLICY_CHANGE_GRADES_STALE_SECONDS=3600)
+    def test_regrade_after_abandoned_regrade(self):
+        # the tasks of this regrade were killed without finishing
+        abandoned = CourseRegradeProgress.start(self.course.id, 12, active_tasks=2)
+        CourseRegradeProgress.objects.filter(id=abandoned.id).update(
+            modified=timezone.now() - timedelta(seconds=3601),
+        )
+        with mock_get_score(1, 2):
+            result = compute_all_grades_for_course.delay(course_key=str(self.course.id))
+        assert result.successful
+
+        abandoned.refresh_from_db()
+        assert abandoned.status == CourseRegradeProgress.ABANDONED
+        progress = CourseRegradeProgress.read_latest(self.course.id)
+        assert progress.status == CourseRegradeProgress.COMPLETED
+        assert progress.graded_learners == 12
+        assert PersistentCourseGrade.objects.filter(course_id=self.course.id).count() == 12
+
+    @ddt.data(
+        (None, 5),
+        (0.01, 1000),
+        (1.0, 120),
+        (600.0, 1),
+    )
+    @ddt.unpack
+    @override_settings(POLICY_CHANGE_GRADES_TARGET_TASK_SECONDS=120, POLICY_CHANGE_GRADES_MAX_BATCH_SIZE=1000)
+    def test_regrade_batch_size(self, seconds_per_learner, expected_batch_size):
+        progress = CourseRegradeProgress(seconds_per_learner=seconds_per_learner)
+        assert _regrade_batch_size(progress) == expected_batch_size
+
+
 class RecalculateGradesForUserTest(HasCourseWithProblemsMixin, ModuleStoreTestCase):
     """
     Test recalculate_course_and_subsection_grades_for_user task.
@@ -544,7 +623,7 @@ class FreezeGradingAfterCourseEndTest(HasCourseWithProblemsMixin, ModuleStoreTes
 
         with override_waffle_flag(self.freeze_grade_flag, active=freeze_flag_value):
             with patch(
-                'lms.djangoapps.grades.tasks.compute_grades_for_course_v2.apply_async',
+                'lms.djangoapps.grades.tasks.regrade_course_enrollments.apply_async',
                 return_value=None
             ) as mock_compute_grades:
                 result = compute_all_grades_for_course.apply_async(
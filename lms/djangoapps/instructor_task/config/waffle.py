@@ -36,6 +36,19 @@ USE_ON_DISK_GRADE_REPORTING = CourseWaffleFlag(
     f'{WAFFLE_NAMESPACE}.use_on_disk_grade_reporting', __name__
 )
 
+# .. toggle_name: instructor_task.use_parallel_grade_reporting
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: When generating course grade reports, grade ranges of learners in parallel subtasks
+#   that write CSV shards to the report store, and merge the shards into the final report. Subtasks that are
+#   retried resume after their last completed batch of learners.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-16
+# .. toggle_target_removal_date: 2027-04-16
+USE_PARALLEL_GRADE_REPORTING = CourseWaffleFlag(
+    f'{WAFFLE_NAMESPACE}.use_parallel_grade_reporting', __name__
+)
+
 
 def optimize_get_learners_switch_enabled():
     """
@@ -69,3 +82,11 @@ def use_on_disk_grade_reporting(course_id):
     False otherwise.
     """
     return USE_ON_DISK_GRADE_REPORTING.is_enabled(course_id)
+
+
+def use_parallel_grade_reporting(course_id):
+    """
+    Returns True if course grade reports should be generated
+    by parallel subtasks, False otherwise.
+    """
+    return USE_PARALLEL_GRADE_REPORTING.is_enabled(course_id)
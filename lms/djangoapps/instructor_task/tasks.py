@@ -24,14 +24,23 @@ import logging
 from functools import partial
 
 from celery import shared_task
+from celery.exceptions import SoftTimeLimitExceeded
+from celery.states import FAILURE, RETRY, SUCCESS
+from django.db import DatabaseError
 from django.utils.translation import gettext_noop
 from edx_django_utils.monitoring import set_code_owner_attribute
 
 from lms.djangoapps.bulk_email.tasks import perform_delegate_email_batches
+from lms.djangoapps.instructor_task.subtasks import SubtaskStatus, check_subtask_is_valid, update_subtask_status
 from lms.djangoapps.instructor_task.tasks_base import BaseInstructorTask
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import upload_may_enroll_csv, upload_students_csv
-from lms.djangoapps.instructor_task.tasks_helper.grades import CourseGradeReport, ProblemGradeReport, ProblemResponses
+from lms.djangoapps.instructor_task.tasks_helper.grades import (
+    CourseGradeReport,
+    ParallelCourseGradeReport,
+    ProblemGradeReport,
+    ProblemResponses
+)
 from lms.djangoapps.instructor_task.tasks_helper.misc import (
     cohort_students_and_upload,
     upload_course_survey_report,
@@ -197,6 +206,59 @@ def calculate_grades_csv(entry_id, xblock_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@shared_task(bind=True, default_retry_delay=30, max_retries=5)
+@set_code_owner_attribute
+def calculate_grades_csv_shard(self, entry_id, xblock_instance_args, first_user_id, last_user_id, subtask_status_dict):
+    """
+    Grade the learners with user ids in the given range for a parallel course
+    grade report, writing their rows to CSV shards.
+
+    The subtask is retried after soft time limits and database errors, and
+    resumes after the last batch of learners it completed.  The last subtask
+    of the report to complete merges all shards into the final report.
+    """
+    # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
+    action_name = gettext_noop('graded')
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    TASK_LOG.info(
+        "Task: %s, InstructorTask ID: %s, Task type: %s, Preparing to grade users %s-%s",
+        current_task_id, entry_id, action_name, first_user_id, last_user_id
+    )
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    report = ParallelCourseGradeReport.for_entry(xblock_instance_args, entry_id, action_name)
+    try:
+        succeeded, failed = report.generate_shards(first_user_id, last_user_id)
+    except (SoftTimeLimitExceeded, DatabaseError) as exc:
+        if self.request.retries >= self.max_retries:
+            TASK_LOG.exception(
+                "Task: %s, InstructorTask ID: %s, Grading failed after retries", current_task_id, entry_id
+            )
+            subtask_status.increment(state=FAILURE)
+            update_subtask_status(entry_id, current_task_id, subtask_status)
+            report.merge_shards_if_complete()
+            raise
+        TASK_LOG.warning("Task: %s, InstructorTask ID: %s, Retrying after: %r", current_task_id, entry_id, exc)
+        subtask_status.increment(retried_withmax=1, state=RETRY)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        raise self.retry(
+            args=[entry_id, xblock_instance_args, first_user_id, last_user_id, subtask_status.to_dict()],
+            exc=exc,
+        )
+    except Exception:
+        TASK_LOG.exception("Task: %s, InstructorTask ID: %s, Grading failed unexpectedly", current_task_id, entry_id)
+        subtask_status.increment(state=FAILURE)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        report.merge_shards_if_complete()
+        raise
+
+    subtask_status.increment(succeeded=succeeded, failed=failed, state=SUCCESS)
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+    report.merge_shards_if_complete()
+    return subtask_status.to_dict()
+
+
 @shared_task(base=BaseInstructorTask)
 @set_code_owner_attribute
 def calculate_problem_grade_report(entry_id, xblock_instance_args):
@@ -2,18 +2,24 @@
 Functionality for generating grade reports.
 """
 
+import codecs
 import csv
+import json
 import logging
 import re
+import shutil
 from collections import OrderedDict, defaultdict
 from datetime import datetime
+from io import StringIO
 from itertools import chain
 from tempfile import TemporaryFile
 
 from time import time
 
+from celery.states import FAILURE
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from lazy import lazy
 from opaque_keys.edx.keys import UsageKey
 from pytz import UTC
@@ -28,14 +34,16 @@ from lms.djangoapps.course_blocks.api import get_course_blocks
 from lms.djangoapps.courseware.user_state_client import DjangoXBlockUserStateClient
 from lms.djangoapps.grades.api import CourseGradeFactory
 from lms.djangoapps.grades.api import context as grades_context
-from lms.djangoapps.grades.api import prefetch_course_and_subsection_grades
 from lms.djangoapps.instructor_analytics.basic import list_problem_responses
 from lms.djangoapps.instructor_analytics.csvs import format_dictlist
 from lms.djangoapps.instructor_task.config.waffle import (
     course_grade_report_verified_only,
     problem_grade_report_verified_only,
     use_on_disk_grade_reporting,
+    use_parallel_grade_reporting,
 )
+from lms.djangoapps.instructor_task.models import InstructorTask, ReportStore
+from lms.djangoapps.instructor_task.subtasks import SUBTASK_LOCK_EXPIRE, queue_subtasks_for_query
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.services import IDVerificationService
 from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
@@ -92,6 +100,7 @@ class _CourseGradeReportContext:
             course_id=course_id,
             task_input=_task_input,
         )
+        self.entry_id = _entry_id
         self.action_name = action_name
         self.course_id = course_id
         self.task_progress = TaskProgress(self.action_name, total=None, start_time=time())
@@ -272,7 +281,6 @@ class _CourseGradeBulkContext:  # lint-amnesty, pylint: disable=missing-class-do
         self.enrollments = _EnrollmentBulkContext(context, users)
         bulk_cache_cohorts(context.course_id, users)
         BulkRoleCache.prefetch(users)
-        prefetch_course_and_subsection_grades(context.course_id, users)
         BulkCourseTags.prefetch(context.course_id, users)
 
 
@@ -443,6 +451,17 @@ class GradeReportBase:
         TASK_LOG.info('%s, Task type: %s, %s, %s', task_info_string, self.context.action_name,
                       message, self.context.task_progress.state)
 
+    def _enrolled_learners_filter_kwargs(self):
+        """
+        Returns the user queryset filter for the learners enrolled in the course.
+        """
+        filter_kwargs = {
+            'courseenrollment__course_id': self.context.course_id,
+        }
+        if self.context.report_for_verified_only:
+            filter_kwargs['courseenrollment__mode'] = CourseMode.VERIFIED
+        return filter_kwargs
+
     def _batch_users(self):
         """
         Returns a generator of batches of users.
@@ -451,18 +470,12 @@ class GradeReportBase:
             args = [iter(iterable)] * chunk_size
             return zip_longest(*args, fillvalue=fillvalue)
 
-        def get_enrolled_learners_for_course(course_id, verified_only=False):
+        def get_enrolled_learners_for_course(filter_kwargs):
             """
             Get all the enrolled users in a course chunk by chunk.
             This generator method fetches & loads the enrolled user objects on demand which in chunk
             size defined. This method is a workaround to avoid out-of-memory errors.
             """
-            filter_kwargs = {
-                'courseenrollment__course_id': course_id,
-            }
-            if verified_only:
-                filter_kwargs['courseenrollment__mode'] = CourseMode.VERIFIED
-
             user_ids_list = get_user_model().objects.filter(**filter_kwargs).values_list('id', flat=True).order_by('id')
             user_chunks = grouper(user_ids_list)
             for user_ids in user_chunks:
@@ -477,10 +490,7 @@ class GradeReportBase:
 
                 yield users
 
-        return get_enrolled_learners_for_course(
-            course_id=self.context.course_id,
-            verified_only=self.context.report_for_verified_only
-        )
+        return get_enrolled_learners_for_course(self._enrolled_learners_filter_kwargs())
 
     def log_additional_info_for_testing(self, message):
         """
@@ -519,6 +529,8 @@ class CourseGradeReport(GradeReportBase):
         """
         with modulestore().bulk_operations(course_id):
             context = _CourseGradeReportContext(_xblock_instance_args, _entry_id, course_id, _task_input, action_name)
+            if use_parallel_grade_reporting(course_id):
+                return ParallelCourseGradeReport(context).queue_subtasks(_xblock_instance_args, _entry_id)
             if use_on_disk_grade_reporting(course_id):  # AU-926
                 return TempFileCourseGradeReport(context)._generate()  # pylint: disable=protected-access
             else:
@@ -706,6 +718,325 @@ class TempFileCourseGradeReport(CourseGradeReport, TemporaryFileReportMixin):
     """ Course Grade Report that writes file iteratively to a TempFile to then be uploaded """
 
 
+class _GradeReportShards:
+    """
+    The CSV shards of a parallel grade report, kept in the report store until
+    they are merged into the final report.
+
+    Each shard holds the rows of a batch of learners, and is named after the
+    first user id of its subtask's range and the last user id of its batch.
+    Shard names therefore sort in user id order, and the shards of a range
+    double as the checkpoints from which a retried subtask resumes.  A batch's
+    error shard, if any, is stored before its success shard, which is always
+    stored and marks the batch as completed.
+    """
+    PARENT_DIR = 'grade_report_shards'
+    ERROR_SUFFIX = '_err'
+
+    def __init__(self, course_id, entry_id):
+        self.course_id = course_id
+        self.parent_dir = f'{self.PARENT_DIR}/{entry_id}'
+        self.report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+
+    @staticmethod
+    def _range_prefix(first_user_id):
+        return f'{first_user_id:012d}_'
+
+    def _filename(self, first_user_id, last_user_id, is_error=False):
+        suffix = self.ERROR_SUFFIX if is_error else ''
+        return f'{self._range_prefix(first_user_id)}{last_user_id:012d}{suffix}.csv'
+
+    def _path(self, filename=''):
+        return self.report_store.path_to(self.course_id, filename, self.parent_dir)
+
+    def _filenames(self):
+        """
+        Returns the sorted names of all stored shards.
+        """
+        try:
+            _, filenames = self.report_store.storage.listdir(self._path())
+        except OSError:
+            # Django's FileSystemStorage fails with an OSError if the
+            # directory does not exist; other storage types return an empty list.
+            return []
+        return sorted(filenames)
+
+    def completed_batches(self, first_user_id):
+        """
+        Returns a list of (last_user_id, success_filename, error_filename) for
+        each completed batch of the range starting at first_user_id.
+        """
+        prefix = self._range_prefix(first_user_id)
+        filenames = self._filenames()
+        completed_batches = []
+        for filename in filenames:
+            if filename.startswith(prefix) and not filename.endswith(self.ERROR_SUFFIX + '.csv'):
+                last_user_id = int(filename[len(prefix):-len('.csv')])
+                error_filename = self._filename(first_user_id, last_user_id, is_error=True)
+                completed_batches.append(
+                    (last_user_id, filename, error_filename if error_filename in filenames else None)
+                )
+        return completed_batches
+
+    def count_rows(self, filename):
+        """
+        Returns the number of rows in the given shard.
+        """
+        if filename is None:
+            return 0
+        with self.report_store.storage.open(self._path(filename), 'rb') as shard_file:
+            return sum(1 for _ in csv.reader(codecs.iterdecode(shard_file, 'utf-8')))
+
+    def store_batch(self, first_user_id, last_user_id, success_rows, error_rows):
+        """
+        Stores the shards of the given batch of learners.
+        """
+        error_filename = self._filename(first_user_id, last_user_id, is_error=True)
+        # Remove any error shard left by an earlier, interrupted attempt at the batch.
+        self.report_store.storage.delete(self._path(error_filename))
+        if error_rows:
+            self._store_rows(error_filename, error_rows)
+        self._store_rows(self._filename(first_user_id, last_user_id), success_rows)
+
+    def _store_rows(self, filename, rows):
+        output_buffer = StringIO()
+        csv.writer(output_buffer).writerows(rows)
+        output_buffer.seek(0)
+        self.report_store.store(self.course_id, filename, output_buffer, self.parent_dir)
+
+    def merge_into(self, headers, output_file, is_error=False):
+        """
+        Writes the given headers and then the rows of all success (or error)
+        shards, in user id order, to the given binary output_file.  Returns
+        the number of merged shards.
+        """
+        header_buffer = StringIO()
+        csv.writer(header_buffer).writerow(headers)
+        output_file.write(header_buffer.getvalue().encode('utf-8'))
+
+        num_merged = 0
+        for filename in self._filenames():
+            if filename.endswith(self.ERROR_SUFFIX + '.csv') == is_error:
+                with self.report_store.storage.open(self._path(filename), 'rb') as shard_file:
+                    shutil.copyfileobj(shard_file, output_file)
+                num_merged += 1
+        return num_merged
+
+    def delete(self):
+        """
+        Deletes all stored shards.
+        """
+        for filename in self._filenames():
+            self.report_store.storage.delete(self._path(filename))
+
+
+class ParallelCourseGradeReport(CourseGradeReport):
+    """
+    Course Grade Report whose rows are generated by subtasks, each for a
+    range of user ids.  Subtasks stream the rows of each batch of learners to
+    CSV shards in the report store, so that a retried subtask resumes after
+    its last completed batch.  The last subtask to complete merges the shards
+    into the final report.
+    """
+    # Key of the task output of the InstructorTask that records that the shards were merged.
+    MERGED_OUTPUT_KEY = 'report_merged'
+
+    @classmethod
+    def for_entry(cls, xblock_instance_args, entry_id, action_name):
+        """
+        Returns the report for the given InstructorTask entry, as used within
+        its subtasks.
+        """
+        entry = InstructorTask.objects.get(pk=entry_id)
+        context = _CourseGradeReportContext(
+            xblock_instance_args, entry_id, entry.course_id, json.loads(entry.task_input), action_name,
+        )
+        return cls(context)
+
+    def queue_subtasks(self, xblock_instance_args, entry_id):
+        """
+        Queues a subtask for each range of settings.GRADE_REPORT_USERS_PER_SUBTASK
+        enrolled learners, and returns the task progress.
+        """
+        # Avoid a circular import, since tasks import the grade reports.
+        from lms.djangoapps.instructor_task.tasks import calculate_grades_csv_shard
+
+        entry = InstructorTask.objects.get(pk=entry_id)
+        # As with bulk emails, a requeued task must not queue its subtasks again.
+        if entry.subtasks and entry.task_output:
+            TASK_LOG.warning('%s, Subtasks have already been queued', self.context.task_info_string)
+            return json.loads(entry.task_output)
+
+        learners = get_user_model().objects.filter(**self._enrolled_learners_filter_kwargs()).order_by('id')
+        total_num_learners = learners.count()
+        if total_num_learners == 0:
+            return TempFileCourseGradeReport(self.context)._generate()  # pylint: disable=protected-access
+
+        def _create_shard_subtask(learner_list, initial_subtask_status):
+            """
+            Creates a subtask to grade the range of user ids of the given learners.
+            """
+            return calculate_grades_csv_shard.subtask(
+                (
+                    entry_id,
+                    xblock_instance_args,
+                    learner_list[0]['pk'],
+                    learner_list[-1]['pk'],
+                    initial_subtask_status.to_dict(),
+                ),
+                task_id=initial_subtask_status.task_id,
+            )
+
+        self.context.update_status('ParallelCourseGradeReport - 1: Queueing subtasks')
+        return queue_subtasks_for_query(
+            entry,
+            self.context.action_name,
+            _create_shard_subtask,
+            [learners],
+            [],
+            settings.GRADE_REPORT_USERS_PER_SUBTASK,
+            total_num_learners,
+        )
+
+    def generate_shards(self, first_user_id, last_user_id):
+        """
+        Grades the enrolled learners with user ids in the given range, batch by
+        batch, storing the rows of each batch as shards.  Resumes after the
+        last batch completed by an earlier attempt.
+
+        Returns the numbers of (succeeded, failed) learners in the range.
+        """
+        shards = _GradeReportShards(self.context.course_id, self.context.entry_id)
+        succeeded, failed = 0, 0
+        cursor = first_user_id - 1
+        for last_user_id_in_batch, success_filename, error_filename in shards.completed_batches(first_user_id):
+            succeeded += shards.count_rows(success_filename)
+            failed += shards.count_rows(error_filename)
+            cursor = last_user_id_in_batch
+        if cursor >= first_user_id:
+            TASK_LOG.info(
+                '%s, Resuming user range %d-%d after user %d',
+                self.context.task_info_string, first_user_id, last_user_id, cursor,
+            )
+
+        filter_kwargs = self._enrolled_learners_filter_kwargs()
+        with modulestore().bulk_operations(self.context.course_id):
+            while True:
+                users = list(
+                    get_user_model().objects.filter(
+                        id__gt=cursor,
+                        id__lte=last_user_id,
+                        **filter_kwargs
+                    ).select_related('profile').order_by('id')[:self.USER_BATCH_SIZE]
+                )
+                if not users:
+                    break
+                cursor = users[-1].id
+                success_rows, error_rows = self._rows_for_users(users)
+                shards.store_batch(first_user_id, cursor, success_rows, error_rows)
+                succeeded += len(success_rows)
+                failed += len(error_rows)
+                self._clear_caches()
+
+        return succeeded, failed
+
+    def merge_shards_if_complete(self):
+        """
+        Merges the shards into the final report, and deletes them, once all
+        subtasks have completed.  Only one of the subtasks that observe the
+        completion performs the merge, and the InstructorTask records that the
+        report was merged.  If no learner was graded, the report has no rows.
+
+        If any subtask failed, or the shards fail to merge, no report is
+        uploaded and the InstructorTask is marked as failed.
+        """
+        entry = InstructorTask.objects.get(pk=self.context.entry_id)
+        subtask_dict = json.loads(entry.subtasks)
+        if subtask_dict['succeeded'] + subtask_dict['failed'] < subtask_dict['total']:
+            return
+        lock_key = f'grade-report-merge-{self.context.entry_id}'
+        if not cache.add(lock_key, 'true', SUBTASK_LOCK_EXPIRE):
+            return
+
+        try:
+            # Another subtask may have merged the shards since the entry was read.
+            entry.refresh_from_db()
+            if self._is_merged(entry):
+                return
+
+            shards = _GradeReportShards(self.context.course_id, self.context.entry_id)
+            if subtask_dict['failed']:
+                TASK_LOG.error(
+                    '%s, %d of %d subtasks failed; not uploading the grade report',
+                    self.context.task_info_string, subtask_dict['failed'], subtask_dict['total'],
+                )
+                self._mark_failed(
+                    entry,
+                    f"{subtask_dict['failed']} of {subtask_dict['total']} subtasks failed; "
+                    "the grade report was not generated",
+                )
+            else:
+                try:
+                    self._upload_merged_shards(shards)
+                except Exception:  # pylint: disable=broad-except
+                    TASK_LOG.exception('%s, Failed to merge the grade report', self.context.task_info_string)
+                    self._mark_failed(entry, 'The grade report could not be merged and was not generated')
+                else:
+                    task_progress = json.loads(entry.task_output)
+                    task_progress[self.MERGED_OUTPUT_KEY] = True
+                    entry.task_output = InstructorTask.create_output_for_success(task_progress)
+                    entry.save_now()
+            shards.delete()
+        finally:
+            cache.delete(lock_key)
+
+    @classmethod
+    def _is_merged(cls, entry):
+        """
+        Returns whether the given InstructorTask entry records that its shards
+        were merged, or that the report failed.
+        """
+        return entry.task_state == FAILURE or json.loads(entry.task_output).get(cls.MERGED_OUTPUT_KEY, False)
+
+    @staticmethod
+    def _mark_failed(entry, message):
+        """
+        Marks the given InstructorTask entry as failed with the given message.
+        """
+        entry.task_state = FAILURE
+        entry.task_output = json.dumps({'message': message})
+        entry.save_now()
+
+    def _upload_merged_shards(self, shards):
+        """
+        Merges the given shards into the final success and error reports, and
+        uploads them to the report store.
+        """
+        date = datetime.now(UTC)
+        with TemporaryFile('w+b') as success_file, TemporaryFile('w+b') as error_file:
+            shards.merge_into(self._success_headers(), success_file)
+            has_errors = shards.merge_into(self._error_headers(), error_file, is_error=True) > 0
+
+            success_file.seek(0)
+            upload_csv_file_to_report_store(
+                success_file,
+                self.context.upload_filename,
+                self.context.course_id,
+                date,
+                parent_dir=self.context.upload_parent_dir
+            )
+            if has_errors:
+                error_file.seek(0)
+                upload_csv_file_to_report_store(
+                    error_file,
+                    self.context.upload_filename + '_err',
+                    self.context.course_id,
+                    date,
+                    parent_dir=self.context.upload_parent_dir
+                )
+        TASK_LOG.info('%s, Uploaded the merged grade report', self.context.task_info_string)
+
+
 class ProblemGradeReport(GradeReportBase):
     """
     Class to encapsulate functionality related to generating user/row had header data for Problem Grade Reports.
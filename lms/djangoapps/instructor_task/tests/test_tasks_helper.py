@@ -7,6 +7,7 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 """
 
 
+import json
 import os
 import shutil
 import tempfile
@@ -18,7 +19,9 @@ from unittest.mock import ANY, MagicMock, Mock, patch
 import ddt
 import pytest
 import unicodecsv
+from celery.states import FAILURE, SUCCESS
 from django.conf import settings
+from django.db import DatabaseError
 from django.test.utils import override_settings
 from edx_django_utils.cache import RequestCache
 from freezegun import freeze_time
@@ -44,8 +47,10 @@ from lms.djangoapps.instructor_task.tasks_helper.grades import (
     ENROLLED_IN_COURSE,
     NOT_ENROLLED_IN_COURSE,
     CourseGradeReport,
+    ParallelCourseGradeReport,
     ProblemGradeReport,
     ProblemResponses,
+    _GradeReportShards,
 )
 from lms.djangoapps.instructor_task.tasks_helper.misc import (
     cohort_students_and_upload,
@@ -54,6 +59,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_ora2_submission_files,
     upload_ora2_summary
 )
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -82,6 +88,7 @@ _TEAMS_CONFIG = TeamsConfig({
     'topics': [{'id': 'topic', 'name': 'Topic', 'description': 'A Topic'}],
 })
 USE_ON_DISK_GRADE_REPORT = 'lms.djangoapps.instructor_task.tasks_helper.grades.use_on_disk_grade_reporting'
+USE_PARALLEL_GRADE_REPORT = 'lms.djangoapps.instructor_task.tasks_helper.grades.use_parallel_grade_reporting'
 
 
 class InstructorGradeReportTestCase(TestReportMixin, InstructorTaskCourseTestCase):
@@ -406,7 +413,7 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
 
         with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
             with check_mongo_calls(2):
-                with self.assertNumQueries(53):
+                with self.assertNumQueries(55):
                     CourseGradeReport.generate(None, None, course.id, {}, 'graded')
 
     def test_inactive_enrollments(self):
@@ -471,6 +478,111 @@ class TestTeamGradeReport(InstructorGradeReportTestCase):
         self._verify_cell_data_for_user(self.student2.username, self.course.id, 'Team Name', team2.name)
 
 
+@override_settings(GRADE_REPORT_USERS_PER_SUBTASK=2)
+class TestParallelCourseGradeReport(InstructorGradeReportTestCase):
+    """
+    Tests for generating course grade reports in parallel subtasks.
+    """
+    def setUp(self):
+        super().setUp()
+        self.course = CourseFactory.create()
+        self.students = [self.create_student(f'student{i}', f'student{i}@example.com') for i in range(5)]
+        self.entry = InstructorTaskFactory.create(course_id=self.course.id, task_id='parallel-grade-report')
+
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_generate(self, _mock_current_task):
+        with patch(USE_PARALLEL_GRADE_REPORT, return_value=True):
+            result = CourseGradeReport.generate(None, self.entry.id, self.course.id, {}, 'graded')
+        assert result['total'] == len(self.students)
+
+        self.entry.refresh_from_db()
+        assert self.entry.task_state == SUCCESS
+        task_output = json.loads(self.entry.task_output)
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 5, 'failed': 0}, task_output)
+        assert json.loads(self.entry.subtasks)['total'] == 3
+
+        self.verify_rows_in_csv(
+            [{'Username': student.username} for student in self.students],
+            ignore_other_columns=True,
+        )
+        assert not _GradeReportShards(self.course.id, self.entry.id)._filenames()
+
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_resume_after_completed_batches(self, _mock_current_task):
+        report = ParallelCourseGradeReport.for_entry(None, self.entry.id, 'graded')
+        first_user_id, last_user_id = self.students[0].id, self.students[-1].id
+        shards = _GradeReportShards(self.course.id, self.entry.id)
+
+        with patch.object(ParallelCourseGradeReport, 'USER_BATCH_SIZE', 2):
+            assert report.generate_shards(first_user_id, last_user_id) == (5, 0)
+            assert len(shards.completed_batches(first_user_id)) == 3
+
+            # Simulate an attempt that was interrupted before its last batch.
+            _, last_shard, _ = shards.completed_batches(first_user_id)[-1]
+            shards.report_store.storage.delete(shards._path(last_shard))
+
+            with patch.object(
+                ParallelCourseGradeReport, '_rows_for_users', return_value=([['row']], []),
+            ) as mock_rows_for_users:
+                assert report.generate_shards(first_user_id, last_user_id) == (5, 0)
+        mock_rows_for_users.assert_called_once_with([self.students[-1]])
+
+    def _complete_subtasks(self, succeeded, failed, num_shards=1):
+        """
+        Records the given numbers of completed subtasks on the entry, and
+        stores the given number of shards.
+        """
+        self.entry.subtasks = json.dumps({'total': succeeded + failed, 'succeeded': succeeded, 'failed': failed})
+        self.entry.task_output = json.dumps({'attempted': 0, 'succeeded': 0, 'failed': 0})
+        self.entry.save()
+        shards = _GradeReportShards(self.course.id, self.entry.id)
+        for student in self.students[:num_shards]:
+            shards.store_batch(student.id, student.id, [['row']], [])
+        return shards
+
+    def test_merge_with_failed_subtask(self):
+        shards = self._complete_subtasks(succeeded=1, failed=1)
+        report = ParallelCourseGradeReport.for_entry(None, self.entry.id, 'graded')
+        with patch.object(ParallelCourseGradeReport, '_upload_merged_shards') as mock_upload:
+            report.merge_shards_if_complete()
+        mock_upload.assert_not_called()
+
+        self.entry.refresh_from_db()
+        assert self.entry.task_state == FAILURE
+        assert json.loads(self.entry.task_output)['message'].startswith('1 of 2 subtasks failed')
+        assert not shards._filenames()
+
+    def test_merge_error(self):
+        shards = self._complete_subtasks(succeeded=2, failed=0)
+        report = ParallelCourseGradeReport.for_entry(None, self.entry.id, 'graded')
+        with patch.object(ParallelCourseGradeReport, '_upload_merged_shards', side_effect=DatabaseError):
+            report.merge_shards_if_complete()
+
+        self.entry.refresh_from_db()
+        assert self.entry.task_state == FAILURE
+        assert 'could not be merged' in json.loads(self.entry.task_output)['message']
+        assert not shards._filenames()
+
+    def test_merge_once(self):
+        shards = self._complete_subtasks(succeeded=2, failed=0)
+        report = ParallelCourseGradeReport.for_entry(None, self.entry.id, 'graded')
+        with patch.object(ParallelCourseGradeReport, '_upload_merged_shards') as mock_upload:
+            report.merge_shards_if_complete()
+            # Shards stored after the merge, e.g. by a duplicate subtask, aren't merged again.
+            shards.store_batch(self.students[0].id, self.students[0].id, [['row']], [])
+            report.merge_shards_if_complete()
+        mock_upload.assert_called_once_with(ANY)
+
+        self.entry.refresh_from_db()
+        assert json.loads(self.entry.task_output)[ParallelCourseGradeReport.MERGED_OUTPUT_KEY]
+
+    def test_merge_without_shards(self):
+        self._complete_subtasks(succeeded=2, failed=0, num_shards=0)
+        report = ParallelCourseGradeReport.for_entry(None, self.entry.id, 'graded')
+        report.merge_shards_if_complete()
+        self.verify_rows_in_csv([])
+
+
 # pylint: disable=protected-access
 @ddt.ddt
 class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
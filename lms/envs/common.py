@@ -3791,10 +3791,43 @@ FINANCIAL_REPORTS = {
     'ROOT_PATH': 'sandbox',
 }
 
+# .. setting_name: GRADE_REPORT_USERS_PER_SUBTASK
+# .. setting_default: 5000
+# .. setting_description: Number of learners graded by each subtask of a course grade report generated in
+#   parallel subtasks, for courses with the instructor_task.use_parallel_grade_reporting flag enabled.
+GRADE_REPORT_USERS_PER_SUBTASK = 5000
+
 #### Grading policy change-related settings #####
 # Rate limit for regrading tasks that a grading policy change can kick off
 POLICY_CHANGE_TASK_RATE_LIMIT = '900/h'
 
+# .. setting_name: POLICY_CHANGE_GRADES_MAX_CONCURRENT_TASKS
+# .. setting_default: 4
+# .. setting_description: Maximum number of regrading tasks that a grading policy change of a single
+#   course keeps queued or running at a time, so that regrading a large course does not saturate the
+#   grades queue.
+POLICY_CHANGE_GRADES_MAX_CONCURRENT_TASKS = 4
+
+# .. setting_name: POLICY_CHANGE_GRADES_TARGET_TASK_SECONDS
+# .. setting_default: 120
+# .. setting_description: Target duration, in seconds, of each regrading task kicked off by a grading
+#   policy change. The number of learners regraded by each task is adapted to the measured time it
+#   takes to regrade a learner in the course.
+POLICY_CHANGE_GRADES_TARGET_TASK_SECONDS = 120
+
+# .. setting_name: POLICY_CHANGE_GRADES_MAX_BATCH_SIZE
+# .. setting_default: 1000
+# .. setting_description: Maximum number of learners regraded by a single regrading task kicked off by
+#   a grading policy change.
+POLICY_CHANGE_GRADES_MAX_BATCH_SIZE = 1000
+
+# .. setting_name: POLICY_CHANGE_GRADES_STALE_SECONDS
+# .. setting_default: 3600
+# .. setting_description: Number of seconds after which a regrade kicked off by a grading policy change
+#   whose progress was not updated, such as when its tasks were killed, is considered abandoned. Must be
+#   longer than the time limit of a regrading task.
+POLICY_CHANGE_GRADES_STALE_SECONDS = 3600
+
 #### PASSWORD POLICY SETTINGS #####
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -5158,6 +5191,19 @@ FERNET_KEYS = [
 # Maximum number of rows to fetch in XBlockUserStateClient calls. Adjust for performance
 USER_STATE_BATCH_SIZE = 5000
 
+# .. setting_name: USER_STATE_SNAPSHOT_CACHE
+# .. setting_default: None
+# .. setting_description: The name of the cache (in CACHES) holding snapshots of the learner state (StudentModule
+#     state) of each user in each course, which the LMS reads instead of querying StudentModule. Snapshots aren't
+#     cached if None. The snapshots are invalidated when StudentModules are saved, so all the LMS and worker
+#     processes writing StudentModules must use the same setting.
+USER_STATE_SNAPSHOT_CACHE = None
+
+# .. setting_name: USER_STATE_SNAPSHOT_TIMEOUT
+# .. setting_default: 3600
+# .. setting_description: The number of seconds for which the snapshots of USER_STATE_SNAPSHOT_CACHE are cached.
+USER_STATE_SNAPSHOT_TIMEOUT = 60 * 60
+
 ############### Settings for edx-rbac  ###############
 SYSTEM_WIDE_ROLE_CLASSES = []
 
@@ -7,11 +7,12 @@ Module with family of classes for block structures.
 The following internal data structures are implemented:
     _BlockRelations - Data structure for a single block's relations.
     _BlockData - Data structure for a single block's data.
+    BlockTable - Array-indexed snapshot of a block structure's topology,
+        used to apply removal filters as boolean masks.
 """
 
 
 from copy import deepcopy
-from functools import partial
 from logging import getLogger
 
 from xmodule.block_metadata_utils import get_datetime_field
@@ -65,6 +66,12 @@ class BlockStructure:
         # dict {UsageKey: _BlockRelations}
         self._block_relations = {}
 
+        # Set of usage keys whose _BlockRelations may be shared with
+        # copies of this structure, and so must be cloned before they
+        # are mutated.
+        # set(UsageKey)
+        self._shared_relation_keys = set()
+
         # Add the root block.
         self._add_block(self._block_relations, root_block_usage_key)
 
@@ -123,7 +130,7 @@ class BlockStructure:
                 new root of the block structure.
         """
         self.root_block_usage_key = usage_key
-        self._block_relations[usage_key].parents = []
+        self._get_relations_for_update(usage_key).parents = []
 
     def __contains__(self, usage_key):
         """
@@ -231,6 +238,7 @@ class BlockStructure:
 
         # Replace this structure's relations with the newly pruned one.
         self._block_relations = pruned_block_relations
+        self._shared_relation_keys = set()
 
     def _add_relation(self, parent_key, child_key):
         """
@@ -240,8 +248,26 @@ class BlockStructure:
             parent_key (UsageKey) - Usage key of the parent block.
             child_key (UsageKey) - Usage key of the child block.
         """
+        for usage_key in (parent_key, child_key):
+            if usage_key in self._block_relations:
+                self._get_relations_for_update(usage_key)
         self._add_to_relations(self._block_relations, parent_key, child_key)
 
+    def _get_relations_for_update(self, usage_key):
+        """
+        Returns the _BlockRelations for the given usage_key, first
+        replacing it with a private clone if it is shared with a copy of
+        this structure.
+        """
+        block_relations = self._block_relations[usage_key]
+        if usage_key in self._shared_relation_keys:
+            cloned_block_relations = _BlockRelations()
+            cloned_block_relations.parents = list(block_relations.parents)
+            cloned_block_relations.children = list(block_relations.children)
+            self._block_relations[usage_key] = block_relations = cloned_block_relations
+            self._shared_relation_keys.discard(usage_key)
+        return block_relations
+
     @staticmethod
     def _add_to_relations(block_relations, parent_key, child_key):
         """
@@ -413,21 +439,37 @@ class BlockStructureBlockData(BlockStructure):
         # dict {UsageKey: BlockData}
         self._block_data_map = {}
 
+        # Set of usage keys whose BlockData may be shared with copies of
+        # this structure, and so must be cloned before they are mutated.
+        # set(UsageKey)
+        self._shared_block_data_keys = set()
+
         # Map of a transformer's name to its non-block-specific data.
         self.transformer_data = TransformerDataMap()
 
     def copy(self):
         """
         Returns a new instance of BlockStructureBlockData with a
-        deep-copy of this instance's contents.
+        copy of this instance's contents.
+
+        The copy is copy-on-write: the block relations and block data
+        of both structures are shared until either structure mutates
+        them, at which point only the mutated entries are cloned.
+        Values returned by the getters of either structure must
+        therefore not be mutated in place.
         """
         from .factory import BlockStructureFactory
-        return BlockStructureFactory.create_new(
+        block_structure = BlockStructureFactory.create_new(
             self.root_block_usage_key,
-            deepcopy(self._block_relations),
+            self._block_relations.copy(),
             deepcopy(self.transformer_data),
-            deepcopy(self._block_data_map),
+            self._block_data_map.copy(),
         )
+        self._shared_relation_keys = set(self._block_relations)
+        self._shared_block_data_keys = set(self._block_data_map)
+        block_structure._shared_relation_keys = set(self._shared_relation_keys)
+        block_structure._shared_block_data_keys = set(self._shared_block_data_keys)
+        return block_structure
 
     def iteritems(self):
         """
@@ -595,7 +637,7 @@ class BlockStructureBlockData(BlockStructure):
                 whose data entry is to be deleted.
         """
         try:
-            transformer_block_data = self.get_transformer_block_data(usage_key, transformer)
+            transformer_block_data = self._get_block_for_update(usage_key).transformer_data[transformer]
             delattr(transformer_block_data, key)
         except (AttributeError, KeyError):
             pass
@@ -625,15 +667,17 @@ class BlockStructureBlockData(BlockStructure):
 
         # Remove block from its children.
         for child in children:
-            self._block_relations[child].parents.remove(usage_key)
+            self._get_relations_for_update(child).parents.remove(usage_key)
 
         # Remove block from its parents.
         for parent in parents:
-            self._block_relations[parent].children.remove(usage_key)
+            self._get_relations_for_update(parent).children.remove(usage_key)
 
         # Remove block.
         self._block_relations.pop(usage_key, None)
         self._block_data_map.pop(usage_key, None)
+        self._shared_relation_keys.discard(usage_key)
+        self._shared_block_data_keys.discard(usage_key)
 
         # Recreate the graph connections if descendants are to be kept.
         if keep_descendants:
@@ -645,7 +689,7 @@ class BlockStructureBlockData(BlockStructure):
         """
         Returns a filter function that always returns True for all blocks.
         """
-        return lambda block_key: True
+        return _universal_filter
 
     def create_removal_filter(self, removal_condition, keep_descendants=False):
         """
@@ -660,11 +704,7 @@ class BlockStructureBlockData(BlockStructure):
             keep_descendants (bool) - See the description in
                 remove_block.
         """
-        return partial(
-            self.retain_or_remove,
-            removal_condition=removal_condition,
-            keep_descendants=keep_descendants,
-        )
+        return _RemovalFilter(self, removal_condition, keep_descendants)
 
     def retain_or_remove(self, block_key, removal_condition, keep_descendants=False):
         """
@@ -754,17 +794,149 @@ class BlockStructureBlockData(BlockStructure):
 
     def _get_or_create_block(self, usage_key):
         """
-        Returns the BlockData associated with the given usage_key.
-        If not found, creates and returns a new BlockData and
-        maps it to the given key.
+        Returns the BlockData associated with the given usage_key,
+        for update.  If not found, creates and returns a new BlockData
+        and maps it to the given key.
         """
         try:
-            return self._block_data_map[usage_key]
+            return self._get_block_for_update(usage_key)
         except KeyError:
             block_data = BlockData(usage_key)
             self._block_data_map[usage_key] = block_data
             return block_data
 
+    def _get_block_for_update(self, usage_key):
+        """
+        Returns the BlockData associated with the given usage_key, first
+        replacing it with a private clone if it is shared with a copy of
+        this structure.
+
+        Raises KeyError if not found.
+        """
+        block_data = self._block_data_map[usage_key]
+        if usage_key in self._shared_block_data_keys:
+            block_data = deepcopy(block_data)
+            self._block_data_map[usage_key] = block_data
+            self._shared_block_data_keys.discard(usage_key)
+        return block_data
+
+
+def _universal_filter(block_key):  # pylint: disable=unused-argument
+    """
+    Filter function that retains all blocks.
+    """
+    return True
+
+
+class _RemovalFilter:
+    """
+    Filter function, as returned by create_removal_filter, that removes
+    blocks satisfying removal_condition from its block structure.
+    """
+    def __init__(self, block_structure, removal_condition, keep_descendants):
+        self.block_structure = block_structure
+        self.removal_condition = removal_condition
+        self.keep_descendants = keep_descendants
+
+    def __call__(self, block_key):
+        return self.block_structure.retain_or_remove(block_key, self.removal_condition, self.keep_descendants)
+
+
+class BlockTable:
+    """
+    Read-only, array-indexed snapshot of the topology of a block
+    structure, starting at a given block.  The table is computed once and
+    can then be used to apply the removal filters of many usages (for
+    example, users) as boolean masks over its blocks, without a separate
+    topological traversal for each usage.
+    """
+    # States of blocks in get_removed_blocks.
+    _UNVISITED = 'unvisited'
+    _RETAINED = 'retained'
+    _REMOVED = 'removed'
+    _REMOVED_KEEPING_DESCENDANTS = 'removed_keeping_descendants'
+
+    def __init__(self, block_structure, start_node=None):
+        start_node = start_node or block_structure.root_block_usage_key
+
+        # Usage keys of the blocks reachable from start_node, in
+        # topological order.
+        # list [UsageKey]
+        self.block_keys = list(block_structure.topological_traversal(
+            start_node=start_node,
+            yield_descendants_of_unyielded=True,
+        ))
+
+        # Map of a block's usage key to its index in block_keys.
+        # dict {UsageKey: int}
+        self.index_of = {block_key: index for index, block_key in enumerate(self.block_keys)}
+
+        # Indices of the parents of each block within the table, with
+        # None for parents outside of the table, which are never visited
+        # by a traversal from start_node.
+        # list [list [int or None]]
+        self.parent_indices = [
+            [] if block_key == start_node else [
+                self.index_of.get(parent_key)
+                for parent_key in block_structure.get_parents(block_key)
+            ]
+            for block_key in self.block_keys
+        ]
+
+    def get_removed_blocks(self, filters):
+        """
+        Applies the given filters to the blocks of the table, with the
+        same semantics as filter_topological_traversal, which removes
+        blocks as it goes, and returns a list of (usage_key,
+        keep_descendants) for each block the filters remove, in
+        topological order.
+
+        Raises ValueError if any of the filters was not created by
+        create_universal_filter or create_removal_filter.
+        """
+        removal_filters = []
+        for filter_func in filters:
+            if isinstance(filter_func, _RemovalFilter):
+                removal_filters.append(filter_func)
+            elif filter_func is not _universal_filter:
+                raise ValueError(f'Filter {filter_func} can not be applied as a mask.')
+
+        # The state of each block after the traversal reaches it.
+        states = [None] * len(self.block_keys)
+        # The parents of each block in the structure as it is modified by
+        # the traversal, where a block removed with its descendants kept
+        # is replaced by its own parents.
+        live_parent_indices = [None] * len(self.block_keys)
+        removed_blocks = []
+        for index, block_key in enumerate(self.block_keys):
+            live_parents = []
+            for parent_index in self.parent_indices[index]:
+                parent_state = None if parent_index is None else states[parent_index]
+                if parent_state == self._REMOVED_KEEPING_DESCENDANTS:
+                    live_parents.extend(live_parent_indices[parent_index])
+                elif parent_state != self._REMOVED:
+                    live_parents.append(parent_index)
+            live_parent_indices[index] = live_parents
+
+            # As in traverse_topologically, a block is visited only once
+            # all of its parents have been visited.  Since removed blocks
+            # are no longer parents, all of them must have been retained.
+            if index and not (live_parents and all(
+                parent_index is not None and states[parent_index] == self._RETAINED
+                for parent_index in live_parents
+            )):
+                states[index] = self._UNVISITED
+                continue
+
+            states[index] = self._RETAINED
+            for removal_filter in removal_filters:
+                if removal_filter.removal_condition(block_key):
+                    keep_descendants = removal_filter.keep_descendants
+                    states[index] = self._REMOVED_KEEPING_DESCENDANTS if keep_descendants else self._REMOVED
+                    removed_blocks.append((block_key, keep_descendants))
+                    break
+        return removed_blocks
+
 
 class BlockStructureModulestoreData(BlockStructureBlockData):
     """
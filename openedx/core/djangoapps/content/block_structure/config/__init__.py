@@ -7,6 +7,7 @@ from edx_toggles.toggles import WaffleSwitch
 
 from openedx.core.lib.cache_utils import request_cached
 
+from ..serialization import COLUMNAR_FORMAT, PICKLE_FORMAT
 from .models import BlockStructureConfiguration
 
 # Switches
@@ -31,6 +32,21 @@ STORAGE_BACKING_FOR_CACHE = WaffleSwitch(
     "block_structure.storage_backing_for_cache", __name__
 )
 
+# .. toggle_name: block_structure.columnar_serialization
+# .. toggle_implementation: WaffleSwitch
+# .. toggle_default: False
+# .. toggle_description: When enabled, newly collected block structures are serialized in the compact
+#   columnar format (see block_structure/serialization.py) instead of as a pickle of the whole
+#   structure. Data in either format can always be read back, and the format is part of the
+#   stored schema version, so toggling this switch causes structures to be recollected in the
+#   selected format.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-16
+# .. toggle_target_removal_date: 2027-04-16
+COLUMNAR_SERIALIZATION = WaffleSwitch(
+    "block_structure.columnar_serialization", __name__
+)
+
 
 def enable_storage_backing_for_cache_in_request():
     """
@@ -41,6 +57,13 @@ def enable_storage_backing_for_cache_in_request():
     STORAGE_BACKING_FOR_CACHE._cached_switches[STORAGE_BACKING_FOR_CACHE.name] = True
 
 
+def serialization_format():
+    """
+    Returns the serialization format to use when writing block structures.
+    """
+    return COLUMNAR_FORMAT if COLUMNAR_SERIALIZATION.is_enabled() else PICKLE_FORMAT
+
+
 @request_cached()
 def num_versions_to_keep():
     """
@@ -6,8 +6,12 @@ BlockStructures.
 
 from contextlib import contextmanager
 
+from xmodule.modulestore.exceptions import ItemNotFoundError
+
+from .block_structure import BlockTable
 from .exceptions import BlockStructureNotFound, TransformerDataIncompatible, UsageKeyNotInBlockStructure
 from .factory import BlockStructureFactory
+from .process_cache import process_cache
 from .store import BlockStructureStore
 from .transformers import BlockStructureTransformers
 
@@ -62,7 +66,67 @@ class BlockStructureManager:
                 starting at starting_block_usage_key.
         """
         block_structure = collected_block_structure.copy() if collected_block_structure else self.get_collected()
+        self._set_starting_block(block_structure, starting_block_usage_key)
+        transformers.transform(block_structure)
+        return block_structure
+
+    def get_transformed_for_usages(
+            self,
+            transformers_list,
+            starting_block_usage_key=None,
+            collected_block_structure=None,
+    ):
+        """
+        Returns a list of transformed Block Structures for the
+        root_block_usage_key, one for each of the given collections of
+        transformers, which typically differ only in their usage_info
+        (for example, one per user).
+
+        Details: Similar to calling get_transformed for each collection of
+        transformers, except the collected block structure is only
+        retrieved once, and the filters of all transformations are applied
+        as masks over a single BlockTable of the structure, instead of in
+        a separate traversal of the structure for each transformation.
+
+        Arguments:
+            transformers_list ([BlockStructureTransformers]) - List of
+                collections of transformers to apply.
+
+            starting_block_usage_key (UsageKey) - Specifies the starting block
+                in the block structure that is to be transformed.
+                If None, root_block_usage_key is used.
+
+            collected_block_structure (BlockStructureBlockData) - A
+                block structure retrieved from a prior call to
+                get_collected.  Can be optionally provided if already available,
+                for optimization.
+
+        Returns:
+            [BlockStructureBlockData] - The transformed block structures,
+                starting at starting_block_usage_key, in the order of
+                transformers_list.
+        """
+        collected_block_structure = collected_block_structure or self.get_collected()
+        self._set_starting_block(collected_block_structure, starting_block_usage_key, check_only=True)
+        block_table = BlockTable(collected_block_structure, starting_block_usage_key)
+
+        block_structures = []
+        for transformers in transformers_list:
+            block_structure = collected_block_structure.copy()
+            self._set_starting_block(block_structure, starting_block_usage_key)
+            transformers.transform(block_structure, block_table=block_table)
+            block_structures.append(block_structure)
+        return block_structures
+
+    def _set_starting_block(self, block_structure, starting_block_usage_key, check_only=False):
+        """
+        Sets the given starting_block_usage_key, if any, as the root of the
+        given block structure, unless check_only is set.
 
+        Raises:
+            UsageKeyNotInBlockStructure if the starting block is not found in
+            the block structure.
+        """
         if starting_block_usage_key:
             # Override the root_block_usage_key so traversals start at the
             # requested location.  The rest of the structure will be pruned
@@ -73,9 +137,8 @@ class BlockStructureManager:
                     str(starting_block_usage_key),
                     str(self.root_block_usage_key),
                 )
-            block_structure.set_root_block(starting_block_usage_key)
-        transformers.transform(block_structure)
-        return block_structure
+            if not check_only:
+                block_structure.set_root_block(starting_block_usage_key)
 
     def get_collected(self):
         """
@@ -86,11 +149,21 @@ class BlockStructureManager:
         the modulestore is accessed if needed (at cache miss), and the
         transformers data is collected if needed.
 
+        When the process-local cache is enabled, the returned structure
+        is a copy of the structure cached in this process, so callers
+        are free to mutate it.
+
         Returns:
             BlockStructureBlockData - A collected block structure,
                 starting at root_block_usage_key, with collected data
                 from each registered transformer.
         """
+        process_cache_key = self._get_process_cache_key()
+        if process_cache_key is not None:
+            block_structure = process_cache.get(process_cache_key)
+            if block_structure is not None:
+                return block_structure.copy()
+
         try:
             block_structure = BlockStructureFactory.create_from_store(
                 self.root_block_usage_key,
@@ -101,6 +174,12 @@ class BlockStructureManager:
         except (BlockStructureNotFound, TransformerDataIncompatible):
             block_structure = self._update_collected()
 
+        if process_cache_key is not None:
+            # Key the structure by the version of its own collected data, which
+            # may lag behind the modulestore until it is recollected.
+            process_cache.set(self._get_process_cache_key(block_structure), block_structure)
+            return block_structure.copy()
+
         return block_structure
 
     def update_collected_if_needed(self):
@@ -132,6 +211,28 @@ class BlockStructureManager:
         root block key.
         """
         self.store.delete(self.root_block_usage_key)
+        process_cache.invalidate(root_block_usage_key=self.root_block_usage_key)
+
+    def _get_process_cache_key(self, block_structure=None):
+        """
+        Returns the process-local cache key for the current version of the
+        block structure in the modulestore, or for the version of the
+        given collected block_structure.  Returns None if the process-local
+        cache is disabled or the root block is not in the modulestore.
+        """
+        if not process_cache.is_enabled():
+            return None
+        if block_structure is not None:
+            root_block = block_structure[self.root_block_usage_key]
+        else:
+            try:
+                root_block = self.modulestore.get_item(self.root_block_usage_key)
+            except ItemNotFoundError:
+                return None
+        return process_cache.make_key(
+            self.root_block_usage_key,
+            self.store._version_data_of_block(root_block),  # pylint: disable=protected-access
+        )
 
     @contextmanager
     def _bulk_operations(self):
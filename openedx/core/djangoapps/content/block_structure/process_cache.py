@@ -0,0 +1,166 @@
+"""
+Process-local cache of deserialized, collected block structures.
+
+Collected block structures are immutable for a given version of their
+course content, so a worker process can reuse a deserialized structure
+across requests instead of fetching and deserializing it from the
+BlockStructureStore each time.  Entries are keyed by the structure's
+root usage key and the version data of its root block, so a new version
+of the content is never served from an entry of an older version.
+
+Callers must never mutate a structure returned by this cache; the
+BlockStructureManager only hands out copies of cached structures.
+"""
+
+
+from collections import OrderedDict
+from logging import getLogger
+from threading import Lock
+
+from django.conf import settings
+from edx_django_utils.monitoring import set_custom_attribute
+
+logger = getLogger(__name__)  # pylint: disable=invalid-name
+
+
+class BlockStructureProcessCache:
+    """
+    Thread-safe, size-bounded LRU map of version keys to block
+    structures.
+
+    Arguments:
+        max_size_setting (str) - Name of the BLOCK_STRUCTURES_SETTINGS
+            entry holding the maximum number of entries.
+
+        metric_name (str) - Name of the custom monitoring attribute
+            recording whether a lookup was a hit.
+
+        replace_outdated (bool) - Whether setting an entry replaces all
+            other entries for the same root block, which are then
+            known to be outdated.
+    """
+    def __init__(
+            self,
+            max_size_setting='PROCESS_CACHE_MAX_SIZE',
+            metric_name='block_structure.process_cache_hit',
+            replace_outdated=True,
+    ):
+        self.max_size_setting = max_size_setting
+        self.metric_name = metric_name
+        self.replace_outdated = replace_outdated
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def max_size(self):
+        """
+        Returns the maximum number of block structures to keep.
+        A value of 0 disables the cache.
+        """
+        # .. setting_name: BLOCK_STRUCTURES_SETTINGS['PROCESS_CACHE_MAX_SIZE']
+        # .. setting_default: 0
+        # .. setting_description: Maximum number of collected block structures to keep
+        #   deserialized in each process, in front of the block structure cache and storage.
+        #   Set to 0 to disable the process-local cache.
+        return settings.BLOCK_STRUCTURES_SETTINGS.get(self.max_size_setting, 0)
+
+    def is_enabled(self):
+        """
+        Returns whether the process-local cache is enabled.
+        """
+        return self.max_size() > 0
+
+    @staticmethod
+    def make_key(root_block_usage_key, version_data):
+        """
+        Returns the cache key for the given root usage key and version
+        data, as returned by BlockStructureStore._version_data_of_block.
+        """
+        return root_block_usage_key, tuple(sorted(version_data.items()))
+
+    def get(self, key):
+        """
+        Returns the block structure cached for the given key, or None.
+        """
+        with self._lock:
+            block_structure = self._entries.get(key)
+            if block_structure is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        set_custom_attribute(self.metric_name, block_structure is not None)
+        return block_structure
+
+    def set(self, key, block_structure):
+        """
+        Caches the given block structure for the given key, evicting the
+        least recently used entries if needed.  If replace_outdated is
+        set, any other entries for the same root block are replaced.
+        """
+        max_size = self.max_size()
+        with self._lock:
+            if self.replace_outdated:
+                self._remove_matching(lambda cached_key: cached_key[0] == key[0])
+            self._entries[key] = block_structure
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, root_block_usage_key=None, course_key=None):
+        """
+        Removes the entries for the given root usage key, or for all
+        root blocks in the given course.
+        """
+        def matches(cached_key):
+            cached_root_block_usage_key = cached_key[0]
+            if root_block_usage_key is not None:
+                return cached_root_block_usage_key == root_block_usage_key
+            return getattr(cached_root_block_usage_key, 'course_key', None) == course_key
+
+        with self._lock:
+            num_removed = self._remove_matching(matches)
+        if num_removed:
+            logger.info(
+                "BlockStructure: Invalidated %d process cache entries; %s.",
+                num_removed,
+                root_block_usage_key or course_key,
+            )
+
+    def clear(self):
+        """
+        Removes all entries and resets the metrics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Returns a dict of the cache's current metrics.
+        """
+        with self._lock:
+            return dict(
+                size=len(self._entries),
+                max_size=self.max_size(),
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+            )
+
+    def _remove_matching(self, key_filter):
+        """
+        Removes all entries whose keys satisfy the given filter and
+        returns the number of removed entries.  Must be called with the
+        lock held.
+        """
+        matching_keys = [cached_key for cached_key in self._entries if key_filter(cached_key)]
+        for cached_key in matching_keys:
+            del self._entries[cached_key]
+        return len(matching_keys)
+
+
+# The single, process-wide instance.
+process_cache = BlockStructureProcessCache()
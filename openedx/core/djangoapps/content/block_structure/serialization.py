@@ -0,0 +1,419 @@
+"""
+Serialization formats for collected block structures.
+
+Two formats are supported:
+
+    pickle - The original format: a zlib-compressed pickle of the
+        structure's (_block_relations, transformer_data, _block_data_map)
+        triple.  Every _BlockRelations, BlockData and TransformerData
+        instance is pickled with its own instance dict.
+
+    columnar - A compact format that stores the structure as a table.
+        Each block is assigned an integer index, relations are stored
+        as lists of indices, and the collected fields are stored as
+        per-field columns of (block indices, values).  Columns whose
+        values are all strings are stored as indices into a single
+        interned string table.
+
+Serialized columnar data is prefixed with a header identifying the
+format and its version, so data in either format can always be read
+back regardless of which format is currently selected for writing.
+
+Columnar data is loaded lazily: a block's BlockData is only created when
+the block is first accessed, and each of its xBlock and transformer
+fields is only decoded when it is first read.  Blocks and fields that
+a request never touches are never decoded.
+"""
+
+
+import pickle
+import zlib
+from collections.abc import MutableMapping
+from copy import deepcopy
+
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+
+from .block_structure import BlockData, TransformerData, TransformerDataMap, _BlockRelations
+
+PICKLE_FORMAT = 'pickle'
+COLUMNAR_FORMAT = 'columnar'
+
+# Incrementally update this value whenever the layout of the columnar
+# payload changes.
+COLUMNAR_FORMAT_VERSION = 1
+
+# Header prepended to columnar payloads.  zlib streams never start with
+# a null byte, so the header can't be confused with pickle format data.
+_COLUMNAR_HEADER = b'\x00bsc'
+
+# Column encodings.
+_RAW_VALUES = 0
+_INTERNED_STRINGS = 1
+
+
+def serialize(block_relations, transformer_data, block_data_map, serialization_format=PICKLE_FORMAT):
+    """
+    Serializes the given block structure data using the requested
+    serialization_format.
+    """
+    if serialization_format == COLUMNAR_FORMAT:
+        return _serialize_columnar(block_relations, transformer_data, block_data_map)
+    return zpickle((block_relations, transformer_data, block_data_map))
+
+
+def deserialize(serialized_data):
+    """
+    Deserializes data previously returned by serialize, in any format.
+
+    Returns:
+        tuple - (block_relations, transformer_data, block_data_map)
+    """
+    if serialized_data.startswith(_COLUMNAR_HEADER):
+        return _deserialize_columnar(serialized_data)
+    return zunpickle(serialized_data)
+
+
+def get_format_version(serialization_format):
+    """
+    Returns a string identifying the given serialization_format and its
+    version, for use in storage keys and schema versions.
+    """
+    if serialization_format == COLUMNAR_FORMAT:
+        return f'{COLUMNAR_FORMAT}{COLUMNAR_FORMAT_VERSION}'
+    return PICKLE_FORMAT
+
+
+class _StringTable:
+    """
+    Interned table of strings referenced by index.
+    """
+    def __init__(self):
+        self.strings = []
+        self._indices = {}
+
+    def intern(self, value):
+        """
+        Returns the index of the given string, adding it if needed.
+        """
+        try:
+            return self._indices[value]
+        except KeyError:
+            index = len(self.strings)
+            self._indices[value] = index
+            self.strings.append(value)
+            return index
+
+
+def _encode_columns(fields_by_block_index, string_table):
+    """
+    Converts an iterable of (block_index, fields dict) pairs into a map of
+    field name to (encoding, block indices, values).
+    """
+    columns = {}
+    for block_index, fields in fields_by_block_index:
+        for field_name, value in fields.items():
+            indices, values = columns.setdefault(field_name, ([], []))
+            indices.append(block_index)
+            values.append(value)
+
+    encoded_columns = {}
+    for field_name, (indices, values) in columns.items():
+        if all(type(value) is str for value in values):  # pylint: disable=unidiomatic-typecheck
+            encoded_columns[field_name] = (
+                _INTERNED_STRINGS,
+                indices,
+                [string_table.intern(value) for value in values],
+            )
+        else:
+            encoded_columns[field_name] = (_RAW_VALUES, indices, values)
+    return encoded_columns
+
+
+def _serialize_columnar(block_relations, transformer_data, block_data_map):
+    """
+    Serializes the given block structure data in the columnar format.
+    """
+    block_keys = list(block_relations)
+    block_keys.extend(key for key in block_data_map if key not in block_relations)
+    index_of = {block_key: index for index, block_key in enumerate(block_keys)}
+
+    relations = [
+        (
+            [index_of[child] for child in block_relations[block_key].children],
+            [index_of[parent] for parent in block_relations[block_key].parents],
+        )
+        for block_key in block_keys[:len(block_relations)]
+    ]
+
+    string_table = _StringTable()
+    data_indices = [index_of[block_key] for block_key in block_data_map]
+    xblock_columns = _encode_columns(
+        ((index_of[block_key], block_data.fields) for block_key, block_data in block_data_map.items()),
+        string_table,
+    )
+
+    transformer_block_data = {}
+    for block_key, block_data in block_data_map.items():
+        for transformer_name, block_transformer_data in block_data.transformer_data.items():
+            transformer_block_data.setdefault(transformer_name, []).append(
+                (index_of[block_key], block_transformer_data.fields)
+            )
+    transformer_columns = {
+        transformer_name: (
+            [block_index for block_index, _ in fields_by_block_index],
+            _encode_columns(fields_by_block_index, string_table),
+        )
+        for transformer_name, fields_by_block_index in transformer_block_data.items()
+    }
+
+    payload = (
+        block_keys,
+        len(block_relations),
+        relations,
+        string_table.strings,
+        data_indices,
+        xblock_columns,
+        transformer_columns,
+        {name: data.fields for name, data in transformer_data.items()},
+    )
+    return (
+        _COLUMNAR_HEADER +
+        bytes([COLUMNAR_FORMAT_VERSION]) +
+        zlib.compress(pickle.dumps(payload, 4))
+    )
+
+
+def _deserialize_columnar(serialized_data):
+    """
+    Deserializes data serialized in the columnar format.
+
+    Block relations and structure-wide transformer data are decoded
+    eagerly.  The per-block data map is returned as a _LazyBlockDataMap,
+    which only decodes a block's fields when they are first accessed.
+    """
+    header_length = len(_COLUMNAR_HEADER)
+    version = serialized_data[header_length]
+    if version != COLUMNAR_FORMAT_VERSION:
+        raise ValueError(f'Unsupported columnar block structure format version: {version}')
+
+    (
+        block_keys,
+        num_related_blocks,
+        relations,
+        strings,
+        data_indices,
+        xblock_columns,
+        transformer_columns,
+        structure_transformer_fields,
+    ) = pickle.loads(zlib.decompress(serialized_data[header_length + 1:]))
+
+    block_relations = {}
+    for block_key, (children, parents) in zip(block_keys[:num_related_blocks], relations):
+        block_relation = _BlockRelations()
+        block_relation.children = [block_keys[index] for index in children]
+        block_relation.parents = [block_keys[index] for index in parents]
+        block_relations[block_key] = block_relation
+
+    transformer_data = TransformerDataMap()
+    for transformer_name, fields in structure_transformer_fields.items():
+        transformer_data[transformer_name] = TransformerData()
+        transformer_data[transformer_name].fields = fields
+
+    table = _BlockTable(block_keys, strings, data_indices, xblock_columns, transformer_columns)
+    return block_relations, transformer_data, _LazyBlockDataMap(table)
+
+
+class _BlockTable:
+    """
+    Read-only, columnar table of the collected data of a block structure.
+
+    Columns are decoded into {block_index: value} maps on first access
+    and then shared by all blocks, and all copies of the structure.
+    """
+    def __init__(self, block_keys, strings, data_indices, xblock_columns, transformer_columns):
+        self.block_keys = block_keys
+        self.data_indices = data_indices
+        self.index_of = {block_keys[block_index]: block_index for block_index in data_indices}
+        self._strings = strings
+        self._encoded_columns = {None: xblock_columns}
+        self._transformer_indices = {}
+        for transformer_name, (indices, encoded_columns) in transformer_columns.items():
+            self._encoded_columns[transformer_name] = encoded_columns
+            self._transformer_indices[transformer_name] = set(indices)
+        self._decoded_columns = {}
+
+    def column(self, transformer_name, field_name):
+        """
+        Returns the decoded {block_index: value} map for the given
+        field.  A transformer_name of None denotes xBlock fields.
+        """
+        column_key = (transformer_name, field_name)
+        try:
+            return self._decoded_columns[column_key]
+        except KeyError:
+            pass
+
+        try:
+            encoding, indices, values = self._encoded_columns[transformer_name][field_name]
+        except KeyError:
+            column = {}
+        else:
+            if encoding == _INTERNED_STRINGS:
+                strings = self._strings
+                values = [strings[value] for value in values]
+            column = dict(zip(indices, values))
+        self._decoded_columns[column_key] = column
+        return column
+
+    def field_names(self, transformer_name, block_index):
+        """
+        Returns the names of the fields stored for the given block.
+        """
+        return [
+            field_name
+            for field_name in self._encoded_columns.get(transformer_name, {})
+            if block_index in self.column(transformer_name, field_name)
+        ]
+
+    def transformer_names(self, block_index):
+        """
+        Returns the names of the transformers with data for the given block.
+        """
+        return [
+            transformer_name
+            for transformer_name, indices in self._transformer_indices.items()
+            if block_index in indices
+        ]
+
+
+class _LazyFields(MutableMapping):
+    """
+    The fields dict of a single block's BlockData or TransformerData,
+    decoded from a _BlockTable one field at a time on first access.
+    Local modifications are kept on the instance and never affect the
+    shared table.
+    """
+    def __init__(self, table, transformer_name, block_index):
+        self._table = table
+        self._transformer_name = transformer_name
+        self._block_index = block_index
+        self._values = {}
+        self._deleted = set()
+
+    def __getitem__(self, field_name):
+        try:
+            return self._values[field_name]
+        except KeyError:
+            if field_name in self._deleted:
+                raise
+        value = self._table.column(self._transformer_name, field_name)[self._block_index]
+        self._values[field_name] = value
+        return value
+
+    def __setitem__(self, field_name, value):
+        self._values[field_name] = value
+        self._deleted.discard(field_name)
+
+    def __delitem__(self, field_name):
+        if field_name not in self:
+            raise KeyError(field_name)
+        self._values.pop(field_name, None)
+        self._deleted.add(field_name)
+
+    def __iter__(self):
+        stored_names = self._table.field_names(self._transformer_name, self._block_index)
+        for field_name in stored_names:
+            if field_name not in self._deleted:
+                yield field_name
+        for field_name in self._values:
+            if field_name not in stored_names:
+                yield field_name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __deepcopy__(self, memo):
+        lazy_fields = _LazyFields(self._table, self._transformer_name, self._block_index)
+        lazy_fields._values = deepcopy(self._values, memo)
+        lazy_fields._deleted = set(self._deleted)
+        return lazy_fields
+
+    def __reduce__(self):
+        # Pickle as a plain dict, so the shared table is never pickled.
+        return dict, (dict(self.items()),)
+
+
+class _LazyBlockDataMap(MutableMapping):
+    """
+    Map of a block's usage key to its BlockData, constructing each
+    BlockData from a _BlockTable only when the block is first accessed.
+    The fields of constructed BlockData are themselves decoded lazily.
+    """
+    def __init__(self, table):
+        self._table = table
+        self._block_data = {}
+        self._removed = set()
+
+    def __getitem__(self, usage_key):
+        try:
+            return self._block_data[usage_key]
+        except KeyError:
+            if usage_key in self._removed:
+                raise
+        block_index = self._table.index_of[usage_key]
+        block_data = BlockData(usage_key)
+        block_data.fields = _LazyFields(self._table, None, block_index)
+        for transformer_name in self._table.transformer_names(block_index):
+            block_transformer_data = TransformerData()
+            block_transformer_data.fields = _LazyFields(self._table, transformer_name, block_index)
+            block_data.transformer_data[transformer_name] = block_transformer_data
+        self._block_data[usage_key] = block_data
+        return block_data
+
+    def __contains__(self, usage_key):
+        if usage_key in self._block_data:
+            return True
+        return usage_key in self._table.index_of and usage_key not in self._removed
+
+    def __setitem__(self, usage_key, block_data):
+        self._block_data[usage_key] = block_data
+        self._removed.discard(usage_key)
+
+    def __delitem__(self, usage_key):
+        if usage_key not in self:
+            raise KeyError(usage_key)
+        self._block_data.pop(usage_key, None)
+        self._removed.add(usage_key)
+
+    def __iter__(self):
+        block_keys = self._table.block_keys
+        for block_index in self._table.data_indices:
+            usage_key = block_keys[block_index]
+            if usage_key not in self._removed:
+                yield usage_key
+        for usage_key in self._block_data:
+            if usage_key not in self._table.index_of:
+                yield usage_key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def copy(self):
+        """
+        Returns a shallow copy of this map, sharing its table and any
+        BlockData constructed so far.
+        """
+        block_data_map = _LazyBlockDataMap(self._table)
+        block_data_map._block_data = self._block_data.copy()
+        block_data_map._removed = set(self._removed)
+        return block_data_map
+
+    def __deepcopy__(self, memo):
+        block_data_map = _LazyBlockDataMap(self._table)
+        block_data_map._block_data = deepcopy(self._block_data, memo)
+        block_data_map._removed = set(self._removed)
+        return block_data_map
+
+    def __reduce__(self):
+        # Pickle as a plain dict, so the shared table is never pickled.
+        return dict, (dict(self.items()),)
@@ -6,14 +6,12 @@ Module for the Storage of BlockStructure objects.
 
 from logging import getLogger
 
-
-from openedx.core.lib.cache_utils import zpickle, zunpickle
-
 from . import config
 from .block_structure import BlockStructureBlockData
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
 from .models import BlockStructureModel
+from .serialization import PICKLE_FORMAT, deserialize, get_format_version, serialize
 from .transformer_registry import TransformerRegistry
 
 logger = getLogger(__name__)  # pylint: disable=C0103
@@ -193,14 +191,15 @@ class BlockStructureStore:
 
     def _serialize(self, block_structure):
         """
-        Serializes the data for the given block_structure.
+        Serializes the data for the given block_structure, using the
+        currently configured serialization format.
         """
-        data_to_cache = (
+        return serialize(
             block_structure._block_relations,
             block_structure.transformer_data,
             block_structure._block_data_map,
+            serialization_format=config.serialization_format(),
         )
-        return zpickle(data_to_cache)
 
     def _deserialize(self, serialized_data, root_block_usage_key):
         """
@@ -208,7 +207,7 @@ class BlockStructureStore:
         """
 
         try:
-            block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
+            block_relations, transformer_data, block_data_map = deserialize(serialized_data)
         except Exception:
             # Somehow failed to de-serialized the data, assume it's corrupt.
             bs_model = self._get_model(root_block_usage_key)
@@ -231,7 +230,7 @@ class BlockStructureStore:
         if config.STORAGE_BACKING_FOR_CACHE.is_enabled():
             return str(bs_model)
         return "v{version}.root.key.{root_usage_key}".format(
-            version=str(BlockStructureBlockData.VERSION),
+            version=BlockStructureStore._block_structure_schema_version(),
             root_usage_key=str(bs_model.data_usage_key),
         )
 
@@ -245,7 +244,23 @@ class BlockStructureStore:
             data_version=getattr(root_block, 'course_version', None),
             data_edit_timestamp=getattr(root_block, 'subtree_edited_on', None),
             transformers_schema_version=TransformerRegistry.get_write_version_hash(),
-            block_structure_schema_version=str(BlockStructureBlockData.VERSION),
+            block_structure_schema_version=BlockStructureStore._block_structure_schema_version(),
+        )
+
+    @staticmethod
+    def _block_structure_schema_version():
+        """
+        Returns the schema version of the block structure data, including
+        the serialization format it is written in.  The original pickle
+        format is identified by the class version alone so that data
+        stored before the format was selectable remains up-to-date.
+        """
+        serialization_format = config.serialization_format()
+        if serialization_format == PICKLE_FORMAT:
+            return str(BlockStructureBlockData.VERSION)
+        return '{version}.{format_version}'.format(
+            version=BlockStructureBlockData.VERSION,
+            format_version=get_format_version(serialization_format),
         )
 
     @staticmethod
@@ -11,11 +11,13 @@ from datetime import datetime
 from unittest import TestCase
 
 import ddt
+import pytest
 
 from openedx.core.lib.graph_traversals import traverse_post_order
 
-from ..block_structure import BlockStructure, BlockStructureModulestoreData
+from ..block_structure import BlockStructure, BlockStructureModulestoreData, BlockTable
 from ..exceptions import TransformerException
+from ..transformer import combine_filters
 from .helpers import ChildrenMapTestMixin, MockTransformer, MockXBlock
 
 
@@ -248,6 +250,56 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
         block_structure.remove_block_traversal(lambda block: block == 2)
         self.assert_block_structure(block_structure, [[1], [], [], []], missing_blocks=[2])
 
+    @ddt.data(
+        *itertools.product(
+            [
+                ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+                ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+                ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+            ],
+            [None, 1],
+            [
+                [({2}, False)],
+                [({1}, True), ({3}, False)],
+                [({2, 4}, False), ({1, 5}, True)],
+                [({3}, False), ({6, 7}, False)],
+            ],
+        )
+    )
+    @ddt.unpack
+    def test_block_table_removed_blocks(self, children_map, start_node, removals):
+        block_structure = self.create_block_structure(children_map)
+        if start_node is not None and start_node >= len(children_map):
+            return
+        block_table = BlockTable(block_structure, start_node)
+
+        def transform(use_block_table):
+            """
+            Returns the children map of a copy of the block structure
+            transformed by the removal filters.
+            """
+            transformed = block_structure.copy()
+            if start_node is not None:
+                transformed.set_root_block(start_node)
+            filters = [transformed.create_universal_filter()] + [
+                transformed.create_removal_filter(lambda block, blocks=blocks: block in blocks, keep_descendants)
+                for blocks, keep_descendants in removals
+            ]
+            if use_block_table:
+                for block, keep_descendants in block_table.get_removed_blocks(filters):
+                    transformed.remove_block(block, keep_descendants)
+            else:
+                transformed.filter_topological_traversal(combine_filters(transformed, filters))
+            transformed._prune_unreachable()
+            return {block: set(transformed.get_children(block)) for block in transformed}
+
+        assert transform(use_block_table=True) == transform(use_block_table=False)
+
+    def test_block_table_unsupported_filter(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP)
+        with pytest.raises(ValueError):
+            BlockTable(block_structure).get_removed_blocks([lambda block: True])
+
     def test_copy(self):
         def _set_value(structure, value):
             """
@@ -292,3 +344,27 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
         _set_value(new_copy, 'edit2')
         assert _get_value(block_structure) == 'edit1'
         assert _get_value(new_copy) == 'edit2'
+
+    def test_copy_shares_unmodified_data(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP)
+        for block in block_structure:
+            block_structure.override_xblock_field(block, 'field', [block])
+
+        new_copy = block_structure.copy()
+        new_copy.override_xblock_field(1, 'field', 'new value')
+        new_copy.remove_block(4, keep_descendants=False)
+
+        # modified entries are cloned
+        assert new_copy[1] is not block_structure[1]
+        assert new_copy._block_relations[1] is not block_structure._block_relations[1]
+        assert block_structure.get_xblock_field(1, 'field') == [1]
+        assert block_structure.get_children(1) == [3, 4]
+
+        # unmodified entries are shared
+        for block in (0, 2, 3):
+            assert new_copy[block] is block_structure[block]
+            assert new_copy._block_relations[block] is block_structure._block_relations[block]
+
+        # entries shared with the copy are cloned when the original is modified
+        block_structure.override_xblock_field(2, 'field', 'other value')
+        assert new_copy.get_xblock_field(2, 'field') == [2]
@@ -4,17 +4,19 @@ Tests for manager.py
 
 import pytest
 import ddt
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from edx_toggles.toggles.testutils import override_waffle_switch
 
 from ..block_structure import BlockStructureBlockData
 from ..config import STORAGE_BACKING_FOR_CACHE
 from ..exceptions import UsageKeyNotInBlockStructure
 from ..manager import BlockStructureManager
+from ..process_cache import process_cache
 from ..transformers import BlockStructureTransformers
 from .helpers import (
     ChildrenMapTestMixin,
     MockCache,
+    MockFilteringTransformer,
     MockModulestoreFactory,
     MockTransformer,
     UsageKeyFactoryMixin,
@@ -94,6 +96,14 @@ class TestTransformer1(MockTransformer):
         return data_key + 't1.val1.' + str(block_key)
 
 
+class TestFilteringTransformer(MockFilteringTransformer):
+    """
+    Test filtering transformer that removes the block with usage key 3.
+    """
+    def transform_block_filters(self, usage_info, block_structure):
+        return [block_structure.create_removal_filter(lambda block_key: block_key.block_id == '3')]
+
+
 @ddt.ddt
 class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
     """
@@ -167,6 +177,28 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
             )
             self.assert_block_structure(block_structure, expected_structure, missing_blocks=expected_missing_blocks)
 
+    def test_get_transformed_for_usages(self):
+        filtering_transformer = TestFilteringTransformer()
+        registered_transformers = self.registered_transformers + [filtering_transformer]
+        with mock_registered_transformers(registered_transformers):
+            transformers_list = [
+                BlockStructureTransformers(self.registered_transformers),
+                BlockStructureTransformers(registered_transformers),
+            ]
+            unfiltered, filtered = self.bs_manager.get_transformed_for_usages(
+                transformers_list,
+                starting_block_usage_key=self.block_key_factory(1),
+            )
+        self.assert_block_structure(unfiltered, [[], [3, 4], [], [], []], missing_blocks=[0, 2])
+        TestTransformer1.assert_transformed(unfiltered)
+        self.assert_block_structure(filtered, [[], [4], [], [], []], missing_blocks=[0, 2, 3])
+        TestTransformer1.assert_transformed(filtered)
+
+    def test_get_transformed_for_usages_with_nonexistent_starting_block(self):
+        with mock_registered_transformers(self.registered_transformers):
+            with pytest.raises(UsageKeyNotInBlockStructure):
+                self.bs_manager.get_transformed_for_usages([self.transformers], starting_block_usage_key=100)
+
     def test_get_transformed_with_nonexistent_starting_block(self):
         with mock_registered_transformers(self.registered_transformers):
             with pytest.raises(UsageKeyNotInBlockStructure):
@@ -220,3 +252,26 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
         self.bs_manager.clear()
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         assert TestTransformer1.collect_call_count == 2
+
+    @override_settings(BLOCK_STRUCTURES_SETTINGS={'PROCESS_CACHE_MAX_SIZE': 10})
+    def test_get_collected_process_cache(self):
+        process_cache.clear()
+        self.addCleanup(process_cache.clear)
+
+        with mock_registered_transformers(self.registered_transformers):
+            first_block_structure = self.bs_manager.get_collected()
+            self.cache.map.clear()
+            second_block_structure = self.bs_manager.get_collected()
+
+        # served from the process cache, without touching the django cache
+        self.assert_block_structure(second_block_structure, self.children_map)
+        TestTransformer1.assert_collected(second_block_structure)
+        assert TestTransformer1.collect_call_count == 1
+        assert process_cache.stats()['hits'] == 1
+
+        # each caller gets its own copy
+        first_block_structure.remove_block(self.block_key_factory(1), keep_descendants=False)
+        assert self.block_key_factory(1) in second_block_structure
+
+        self.bs_manager.clear()
+        assert process_cache.stats()['size'] == 0
@@ -0,0 +1,70 @@
+"""
+Tests for process_cache.py
+"""
+
+
+from django.test import TestCase, override_settings
+from opaque_keys.edx.locator import CourseLocator
+
+from ..process_cache import BlockStructureProcessCache
+
+
+@override_settings(BLOCK_STRUCTURES_SETTINGS={'PROCESS_CACHE_MAX_SIZE': 2})
+class TestBlockStructureProcessCache(TestCase):
+    """
+    Tests for BlockStructureProcessCache
+    """
+    def setUp(self):
+        super().setUp()
+        self.cache = BlockStructureProcessCache()
+        self.course_key = CourseLocator('org', 'course', 'run')
+        self.root_keys = [
+            CourseLocator('org', f'course{index}', 'run').make_usage_key('course', 'course')
+            for index in range(3)
+        ]
+
+    def make_key(self, root_block_usage_key, data_version='v1'):
+        return self.cache.make_key(root_block_usage_key, {'data_version': data_version})
+
+    def test_disabled_by_default(self):
+        with override_settings(BLOCK_STRUCTURES_SETTINGS={}):
+            assert not self.cache.is_enabled()
+        assert self.cache.is_enabled()
+
+    def test_get_and_set(self):
+        key = self.make_key(self.root_keys[0])
+        assert self.cache.get(key) is None
+        self.cache.set(key, 'structure')
+        assert self.cache.get(key) == 'structure'
+        assert self.cache.get(self.make_key(self.root_keys[0], 'v2')) is None
+        assert self.cache.stats() == dict(size=1, max_size=2, hits=1, misses=2, evictions=0)
+
+    def test_lru_eviction(self):
+        keys = [self.make_key(root_key) for root_key in self.root_keys]
+        self.cache.set(keys[0], 'structure0')
+        self.cache.set(keys[1], 'structure1')
+        self.cache.get(keys[0])
+        self.cache.set(keys[2], 'structure2')
+
+        assert self.cache.get(keys[0]) == 'structure0'
+        assert self.cache.get(keys[1]) is None
+        assert self.cache.get(keys[2]) == 'structure2'
+        assert self.cache.stats()['evictions'] == 1
+
+    def test_set_replaces_old_versions(self):
+        self.cache.set(self.make_key(self.root_keys[0], 'v1'), 'old')
+        self.cache.set(self.make_key(self.root_keys[0], 'v2'), 'new')
+        assert self.cache.get(self.make_key(self.root_keys[0], 'v1')) is None
+        assert self.cache.stats()['size'] == 1
+
+    def test_invalidate(self):
+        course_root_key = self.course_key.make_usage_key('course', 'course')
+        self.cache.set(self.make_key(course_root_key), 'structure')
+        self.cache.set(self.make_key(self.root_keys[0]), 'other')
+
+        self.cache.invalidate(course_key=self.course_key)
+        assert self.cache.get(self.make_key(course_root_key)) is None
+        assert self.cache.get(self.make_key(self.root_keys[0])) == 'other'
+
+        self.cache.invalidate(root_block_usage_key=self.root_keys[0])
+        assert self.cache.get(self.make_key(self.root_keys[0])) is None
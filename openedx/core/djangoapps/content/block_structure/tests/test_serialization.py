@@ -0,0 +1,105 @@
+"""
+Tests for serialization.py
+"""
+
+
+from datetime import datetime
+from unittest import TestCase
+
+import ddt
+
+from ..factory import BlockStructureFactory
+from ..serialization import COLUMNAR_FORMAT, PICKLE_FORMAT, deserialize, get_format_version, serialize
+from .helpers import ChildrenMapTestMixin, MockTransformer
+
+
+@ddt.ddt
+class TestSerialization(TestCase, ChildrenMapTestMixin):
+    """
+    Tests for the block structure serialization formats.
+    """
+    def setUp(self):
+        super().setUp()
+        self.block_structure = self.create_block_structure(self.DAG_CHILDREN_MAP)
+        self.block_structure._add_transformer(MockTransformer)  # pylint: disable=protected-access
+        for block_key in self.block_structure:
+            self.block_structure.override_xblock_field(block_key, 'display_name', 'shared name')
+            self.block_structure.override_xblock_field(block_key, 'start', datetime(2020, 1, block_key + 1))
+            self.block_structure.set_transformer_block_field(block_key, MockTransformer, 'value', [block_key])
+
+    def _round_trip(self, serialization_format):
+        """
+        Serializes and deserializes the test block structure in the given format.
+        """
+        return deserialize(serialize(
+            self.block_structure._block_relations,  # pylint: disable=protected-access
+            self.block_structure.transformer_data,
+            self.block_structure._block_data_map,  # pylint: disable=protected-access
+            serialization_format=serialization_format,
+        ))
+
+    @ddt.data(PICKLE_FORMAT, COLUMNAR_FORMAT)
+    def test_round_trip(self, serialization_format):
+        block_relations, transformer_data, block_data_map = self._round_trip(serialization_format)
+
+        assert list(block_relations) == list(self.block_structure)
+        for block_key in self.block_structure:
+            assert block_relations[block_key].children == self.block_structure.get_children(block_key)
+            assert block_relations[block_key].parents == self.block_structure.get_parents(block_key)
+
+            block_data = block_data_map[block_key]
+            assert block_data.location == block_key
+            assert block_data.display_name == 'shared name'
+            assert block_data.start == datetime(2020, 1, block_key + 1)
+            assert block_data.transformer_data[MockTransformer].value == [block_key]
+
+        assert transformer_data[MockTransformer].fields == self.block_structure.transformer_data[MockTransformer].fields
+
+    def test_columnar_interns_strings(self):
+        _, _, block_data_map = self._round_trip(COLUMNAR_FORMAT)
+        names = {id(block_data.display_name) for block_data in block_data_map.values()}
+        assert len(names) == 1
+
+    def test_columnar_decodes_lazily(self):
+        block_relations, transformer_data, block_data_map = self._round_trip(COLUMNAR_FORMAT)
+        block_structure = BlockStructureFactory.create_new(0, block_relations, transformer_data, block_data_map)
+
+        assert block_structure.get_xblock_field(1, 'display_name') == 'shared name'
+        assert block_structure.get_transformer_block_field(1, MockTransformer, 'value') == [1]
+        assert block_structure.get_xblock_field(1, 'non_existent', 'default') == 'default'
+        assert list(block_data_map._block_data) == [1]  # pylint: disable=protected-access
+        assert len(block_data_map) == len(self.block_structure)
+
+    def test_columnar_copy_is_isolated(self):
+        block_structure = BlockStructureFactory.create_new(0, *self._round_trip(COLUMNAR_FORMAT))
+        block_structure_copy = block_structure.copy()
+
+        block_structure_copy.override_xblock_field(1, 'display_name', 'new name')
+        block_structure_copy.set_transformer_block_field(2, MockTransformer, 'value', 'new value')
+        block_structure_copy.remove_transformer_block_field(3, MockTransformer, 'value')
+        block_structure_copy.remove_block(4, keep_descendants=False)
+
+        assert block_structure.get_xblock_field(1, 'display_name') == 'shared name'
+        assert block_structure_copy.get_xblock_field(1, 'display_name') == 'new name'
+        assert block_structure.get_transformer_block_field(2, MockTransformer, 'value') == [2]
+        assert block_structure_copy.get_transformer_block_field(2, MockTransformer, 'value') == 'new value'
+        assert block_structure.get_transformer_block_field(3, MockTransformer, 'value') == [3]
+        assert block_structure_copy.get_transformer_block_field(3, MockTransformer, 'value') is None
+        assert 4 in block_structure
+        assert 4 not in block_structure_copy
+
+    def test_columnar_is_smaller(self):
+        serialized = {
+            serialization_format: serialize(
+                self.block_structure._block_relations,  # pylint: disable=protected-access
+                self.block_structure.transformer_data,
+                self.block_structure._block_data_map,  # pylint: disable=protected-access
+                serialization_format=serialization_format,
+            )
+            for serialization_format in (PICKLE_FORMAT, COLUMNAR_FORMAT)
+        }
+        assert len(serialized[COLUMNAR_FORMAT]) < len(serialized[PICKLE_FORMAT])
+
+    def test_format_version(self):
+        assert get_format_version(PICKLE_FORMAT) == 'pickle'
+        assert get_format_version(COLUMNAR_FORMAT) == 'columnar1'
@@ -8,7 +8,8 @@ from edx_toggles.toggles.testutils import override_waffle_switch
 
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 
-from ..config import STORAGE_BACKING_FOR_CACHE
+from ..block_structure import BlockStructureBlockData
+from ..config import COLUMNAR_SERIALIZATION, STORAGE_BACKING_FOR_CACHE
 from ..config.models import BlockStructureConfiguration
 from ..exceptions import BlockStructureNotFound
 from ..store import BlockStructureStore
@@ -60,6 +61,28 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
             assert stored_value is not None
             self.assert_block_structure(stored_value, self.children_map)
 
+    @ddt.data(True, False)
+    def test_add_and_get_columnar(self, with_storage_backing):
+        with override_waffle_switch(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
+            with override_waffle_switch(COLUMNAR_SERIALIZATION, active=True):
+                self.store.add(self.block_structure)
+                stored_value = self.store.get(self.block_structure.root_block_usage_key)
+            self.assert_block_structure(stored_value, self.children_map)
+            assert stored_value.get_transformer_block_field(
+                self.block_key_factory(0), MockTransformer, 'test',
+            ) == f'{MockTransformer.name()} val'
+
+    def test_serialization_format_in_schema_version(self):
+        with override_waffle_switch(STORAGE_BACKING_FOR_CACHE, active=True):
+            self.store.add(self.block_structure)
+            root_block_usage_key = self.block_structure.root_block_usage_key
+            with override_waffle_switch(COLUMNAR_SERIALIZATION, active=True):
+                # data stored in the previous format is still readable
+                stored_value = self.store.get(root_block_usage_key)
+                self.assert_block_structure(stored_value, self.children_map)
+                assert self.store._block_structure_schema_version() == f'{BlockStructureBlockData.VERSION}.columnar1'  # pylint: disable=protected-access
+            assert self.store._block_structure_schema_version() == str(BlockStructureBlockData.VERSION)  # pylint: disable=protected-access
+
     @ddt.data(True, False)
     def test_delete(self, with_storage_backing):
         with override_waffle_switch(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
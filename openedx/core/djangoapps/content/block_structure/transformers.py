@@ -103,14 +103,22 @@ class BlockStructureTransformers:
             )
         return True
 
-    def transform(self, block_structure):
+    def transform(self, block_structure, block_table=None):
         """
         The given block structure is transformed by each transformer in the
         collection. Tranformers with filters are combined and run first in a
         single course tree traversal, then remaining transformers are run in
         the order that they were added.
+
+        If a block_table (BlockTable) of the block structure is given, the
+        filters are applied as masks over the table instead of through a
+        traversal of the block structure.  This allows a single table to be
+        shared across many transformations of the same block structure.
         """
-        self._transform_with_filters(block_structure)
+        if block_table is None:
+            self._transform_with_filters(block_structure)
+        else:
+            self._transform_with_filter_masks(block_structure, block_table)
         self._transform_without_filters(block_structure)
 
         # Prune the block structure to remove any unreachable blocks.
@@ -131,6 +139,29 @@ class BlockStructureTransformers:
         combined_filters = combine_filters(block_structure, filters)
         block_structure.filter_topological_traversal(combined_filters)
 
+    def _transform_with_filter_masks(self, block_structure, block_table):
+        """
+        Transforms the given block_structure using the transform_block_filters
+        method from the given transformers, applying the filters as
+        masks over the given block_table.
+        """
+        if not self._transformers['supports_filter']:
+            return
+
+        filters = []
+        for transformer in self._transformers['supports_filter']:
+            filters.extend(transformer.transform_block_filters(self.usage_info, block_structure))
+
+        try:
+            removed_blocks = block_table.get_removed_blocks(filters)
+        except ValueError:
+            # Custom filter functions can only be applied by a traversal.
+            block_structure.filter_topological_traversal(combine_filters(block_structure, filters))
+            return
+
+        for block_key, keep_descendants in removed_blocks:
+            block_structure.remove_block(block_key, keep_descendants)
+
     def _transform_without_filters(self, block_structure):
         """
         Transforms the given block_structure using the transform
@@ -20,6 +20,7 @@ import re
 from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 from xml.sax.saxutils import unescape
 
@@ -75,6 +76,9 @@ html_problem_semantics = [
     "openendedrubric",
 ]
 
+# Number of compiled problem templates kept by each process
+PROBLEM_TEMPLATE_CACHE_SIZE = 512
+
 log = logging.getLogger(__name__)
 
 #-----------------------------------------------------------------------------
@@ -126,6 +130,94 @@ class LoncapaSystem(object):
         self.matlab_api_key = matlab_api_key
 
 
+def assign_response_ids(tree, problem_id):
+    """
+    Assign ids to the responses of the problem tree and to their inputs (the answer ids),
+    and return the (response, inputfields) pairs of the responses, in document order.
+    """
+    responses = []
+    input_tags = inputtypes.registry.registered_tags()
+    response_id = 1
+    for response in tree.xpath('//' + "|//".join(responsetypes.registry.registered_tags())):
+        responsetype_id = problem_id + "_" + str(response_id)
+        # create and save ID for this response
+        response.set('id', responsetype_id)
+        response_id += 1
+
+        answer_id = 1
+        inputfields = tree.xpath(
+            "|".join(['//' + response.tag + '[@id=$id]//' + x for x in input_tags]),
+            id=responsetype_id
+        )
+
+        # assign one answer_id for each input type
+        for entry in inputfields:
+            entry.attrib['response_id'] = str(response_id)
+            entry.attrib['answer_id'] = str(answer_id)
+            entry.attrib['id'] = "%s_%i_%i" % (problem_id, response_id, answer_id)
+            answer_id = answer_id + 1
+
+        responses.append((response, inputfields))
+    return responses
+
+
+class LoncapaProblemTemplate(object):
+    """
+    The parts of a capa problem that don't depend on the seed or on the learner's state:
+    the parsed problem tree, with the ids of its responses and of their inputs assigned,
+    and the positions of the responses and of their inputs in the tree.
+
+    The template is shared by all the LoncapaProblems with the same id and text, so its
+    tree must never be modified: each problem works on its own copy.
+    """
+    def __init__(self, problem_id, problem_text):
+        # Convert startouttext and endouttext to proper <text></text>
+        problem_text = re.sub(r"startouttext\s*/", "text", problem_text)
+        problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
+        self.problem_text = problem_text
+
+        # parse problem XML file into an element tree
+        if isinstance(problem_text, str):
+            # etree chokes on Unicode XML with an encoding declaration
+            problem_text = problem_text.encode('utf-8')
+        self.tree = XML(problem_text)
+        LoncapaProblem.make_xml_compatible(self.tree)
+
+        # Files included by the problem are read by each problem, from the resources of its course,
+        # so the ids of the responses can only be assigned once they are included.
+        self.has_includes = bool(self.tree.findall('.//include'))
+        self.response_positions = None
+        if not self.has_includes:
+            positions = {element: position for position, element in enumerate(self.tree.iter())}
+            self.response_positions = [
+                (positions[response], [positions[inputfield] for inputfield in inputfields])
+                for response, inputfields in assign_response_ids(self.tree, problem_id)
+            ]
+
+    def instantiate(self):
+        """
+        Return a copy of the problem tree, and the (response, inputfields) pairs of its
+        responses, or None if their ids are yet to be assigned.
+        """
+        tree = deepcopy(self.tree)
+        if self.response_positions is None:
+            return tree, None
+        elements = list(tree.iter())
+        return tree, [
+            (elements[response_position], [elements[position] for position in inputfield_positions])
+            for response_position, inputfield_positions in self.response_positions
+        ]
+
+
+@lru_cache(maxsize=PROBLEM_TEMPLATE_CACHE_SIZE)
+def get_problem_template(problem_id, problem_text):
+    """
+    Return the LoncapaProblemTemplate of the problem with the given id and text,
+    compiling it only the first time it's requested.
+    """
+    return LoncapaProblemTemplate(problem_id, problem_text)
+
+
 class LoncapaProblem(object):
     """
     Main class for capa Problems.
@@ -182,19 +274,11 @@ class LoncapaProblem(object):
         self.done = state.get('done', False)
         self.input_state = state.get('input_state', {})
 
-        # Convert startouttext and endouttext to proper <text></text>
-        problem_text = re.sub(r"startouttext\s*/", "text", problem_text)
-        problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
-        self.problem_text = problem_text
-
-        # parse problem XML file into an element tree
-        if isinstance(problem_text, str):
-            # etree chokes on Unicode XML with an encoding declaration
-            problem_text = problem_text.encode('utf-8')
-        self.tree = XML(problem_text)
-
+        # Parse the problem XML, or reuse the tree parsed for another learner
         try:
-            self.make_xml_compatible(self.tree)
+            template = get_problem_template(self.problem_id, problem_text)
+        except etree.XMLSyntaxError:
+            raise
         except Exception:
             capa_block = self.capa_block
             log.exception(
@@ -205,6 +289,9 @@ class LoncapaProblem(object):
             )
             raise
 
+        self.problem_text = template.problem_text
+        self.tree, responses = template.instantiate()
+
         # handle any <include file="foo"> tags
         self._process_includes()
 
@@ -218,7 +305,7 @@ class LoncapaProblem(object):
         # transformations.  This also creates the dict (self.responders) of Response
         # instances for each question in the problem. The dict has keys = xml subtree of
         # Response, values = Response instance
-        self.problem_data = self._preprocess_problem(self.tree, minimal_init)
+        self.problem_data = self._preprocess_problem(self.tree, minimal_init, responses)
 
         if not minimal_init:
             if not self.student_answers:  # True when student_answers is an empty dict
@@ -248,7 +335,8 @@ class LoncapaProblem(object):
         """
         return settings.FEATURES.get('ENABLE_GRADING_METHOD_IN_PROBLEMS', False)
 
-    def make_xml_compatible(self, tree):
+    @staticmethod
+    def make_xml_compatible(tree):
         """
         Adjust tree xml in-place for compatibility before creating
         a problem from it.
@@ -1097,9 +1185,10 @@ class LoncapaProblem(object):
 
         return tree
 
-    def _preprocess_problem(self, tree, minimal_init):  # private
+    def _preprocess_problem(self, tree, minimal_init, responses=None):  # private
         """
-        Assign IDs to all the responses
+        Assign IDs to all the responses, unless the (response, inputfields) pairs of the
+        responses, whose IDs are already assigned, are given
         Assign sub-IDs to all entries (textline, schematic, etc.)
         Annoted correctness and value
         In-place transformation
@@ -1108,29 +1197,13 @@ class LoncapaProblem(object):
 
         Obtain all responder answers and save as self.responder_answers dict (key = response)
         """
-        response_id = 1
+        if responses is None:
+            responses = assign_response_ids(tree, self.problem_id)
+
         problem_data = {}
         self.responders = {}
-        for response in tree.xpath('//' + "|//".join(responsetypes.registry.registered_tags())):
-            responsetype_id = self.problem_id + "_" + str(response_id)
-            # create and save ID for this response
-            response.set('id', responsetype_id)
-            response_id += 1
-
-            answer_id = 1
-            input_tags = inputtypes.registry.registered_tags()
-            inputfields = tree.xpath(
-                "|".join(['//' + response.tag + '[@id=$id]//' + x for x in input_tags]),
-                id=responsetype_id
-            )
-
-            # assign one answer_id for each input type
-            for entry in inputfields:
-                entry.attrib['response_id'] = str(response_id)
-                entry.attrib['answer_id'] = str(answer_id)
-                entry.attrib['id'] = "%s_%i_%i" % (self.problem_id, response_id, answer_id)
-                answer_id = answer_id + 1
-
+        for response, inputfields in responses:
+            responsetype_id = response.get('id')
             self.response_a11y_data(response, inputfields, responsetype_id, problem_data)
 
             # instantiate capa Response
@@ -12,6 +12,7 @@ import ddt
 from lxml import etree
 from markupsafe import Markup
 
+from xmodule.capa.capa_problem import get_problem_template
 from xmodule.capa.correctmap import CorrectMap
 from xmodule.capa.responsetypes import LoncapaProblemError
 from xmodule.capa.tests.helpers import new_loncapa_problem
@@ -423,6 +424,66 @@ class CAPAProblemTest(unittest.TestCase):
         assert problem is not None
 
 
+class CAPAProblemTemplateTest(unittest.TestCase):
+    """ Tests of the problem templates shared by the problems with the same id and text """
+
+    xml = textwrap.dedent("""
+        <problem>
+            <p>Which of these are colors?</p>
+            <choiceresponse>
+                <label>Select the colors</label>
+                <checkboxgroup>
+                    <choice correct="true">Red</choice>
+                    <choice correct="false">Chair</choice>
+                </checkboxgroup>
+            </choiceresponse>
+            <stringresponse answer="blue">
+                <textline label="What color is the sky?"/>
+            </stringresponse>
+        </problem>
+    """)
+
+    def setUp(self):
+        super().setUp()
+        get_problem_template.cache_clear()
+
+    def test_template_shared(self):
+        with patch('xmodule.capa.capa_problem.XML', wraps=etree.XML) as parse:
+            problems = [new_loncapa_problem(self.xml, seed=seed) for seed in (1, 2)]
+        parse.assert_called_once()
+
+        for problem in problems:
+            assert problem.get_answer_ids() == [['1_2_1'], ['1_3_1']]
+            assert sorted(problem.problem_data) == ['1_2_1', '1_3_1']
+            assert problem.problem_data['1_2_1']['label'] == 'Select the colors'
+        assert problems[0].tree is not problems[1].tree
+
+        template_tree = get_problem_template('1', self.xml).tree
+        assert template_tree.find('.//choiceresponse/label') is not None
+        assert problems[0].tree.find('.//choiceresponse/label') is None
+
+    def test_different_ids(self):
+        problems = [new_loncapa_problem(self.xml, problem_id=problem_id) for problem_id in ('1', '2')]
+        assert sorted(problems[0].problem_data) == ['1_2_1', '1_3_1']
+        assert sorted(problems[1].problem_data) == ['2_2_1', '2_3_1']
+
+    def test_compatibility_errors_not_cached(self):
+        xml = """
+            <problem>
+                <optionresponse>
+                    <optioninput>
+                        <option correct="True">A</option>
+                        <option correct="True">B</option>
+                    </optioninput>
+                </optionresponse>
+            </problem>
+        """
+        for _ in range(2):
+            with pytest.raises(LoncapaProblemError):
+                new_loncapa_problem(xml)
+        assert get_problem_template.cache_info().currsize == 0
+
+
 @ddt.ddt
 class CAPAMultiInputProblemTest(unittest.TestCase):
     """ TestCase for CAPA problems with multiple inputtypes """
@@ -336,6 +336,12 @@ class StaticContentStream(StaticContent):  # lint-amnesty, pylint: disable=missi
             position += STREAM_DATA_CHUNK_SIZE
             yield chunk
 
+    def read(self, size=-1):
+        """
+        Reads up to size bytes of the content, so the content can be used as a file object.
+        """
+        return self._stream.read(size)
+
     def close(self):
         self._stream.close()
 
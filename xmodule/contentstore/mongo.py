@@ -6,6 +6,8 @@ MongoDB/GridFS-level code for the contentstore.
 import hashlib
 import json
 import os
+import tarfile
+from time import time
 
 import gridfs
 import pymongo
@@ -218,16 +220,13 @@ class MongoContentStore(ContentStore):
     def export(self, location, output_directory):  # lint-amnesty, pylint: disable=missing-function-docstring
         content = self.find(location)
 
-        filename = content.name
-        if content.import_path is not None:
-            output_directory = output_directory + '/' + os.path.dirname(content.import_path)
+        export_directory, export_name = _export_path(content)
+        if export_directory:
+            output_directory = output_directory + '/' + export_directory
 
         if not os.path.exists(output_directory):
             os.makedirs(output_directory)
 
-        # Escape invalid char from filename.
-        export_name = escape_invalid_characters(name=filename, invalid_char_list=['/', '\\'])
-
         disk_fs = OSFS(output_directory)
 
         with disk_fs.open(export_name, 'wb') as asset_file:
@@ -257,13 +256,38 @@ class MongoContentStore(ContentStore):
             # When debugging course exports, this might be a good place
             # to look. -- pmitros
             self.export(asset['asset_key'], output_directory)
-            for attr, value in asset.items():
-                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
-                    policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
+            _add_asset_policy(policy, asset)
 
         with open(assets_policy_file, 'w') as f:
             json.dump(policy, f, sort_keys=True, indent=4)
 
+    def export_all_for_course_to_tarball(self, course_key, tar_file, output_directory):
+        """
+        Stream all of this course's assets into an open TarFile, under output_directory,
+        without staging them on disk, and return the assets' attributes in the format
+        of the policy file written by export_all_for_course.
+
+        Args:
+            course_key (CourseKey): the :class:`CourseKey` identifying the course
+            tar_file (TarFile): the archive to add the asset files to
+            output_directory: the directory of the archive under which to put the asset files
+        """
+        policy = {}
+        assets, __ = self.get_all_content_for_course(course_key)
+
+        for asset in assets:
+            content = self.find(asset['asset_key'], as_stream=True)
+            try:
+                tarinfo = tarfile.TarInfo('/'.join(filter(None, (output_directory,) + _export_path(content))))
+                tarinfo.size = content.length
+                tarinfo.mtime = time()
+                tar_file.addfile(tarinfo, content)
+            finally:
+                content.close()
+            _add_asset_policy(policy, asset)
+
+        return policy
+
     def get_all_content_thumbnails_for_course(self, course_key):
         return self._get_all_content_for_course(course_key, get_thumbnails=True)[0]
 
@@ -664,3 +688,25 @@ def query_for_course(course_key, category=None):
     else:
         dbkey[f'{prefix}.run'] = course_key.run
     return dbkey
+
+
+def _export_path(content):
+    """
+    Returns the directory, relative to the exported static directory, and the
+    file name to which the given asset is exported.
+    """
+    export_directory = ''
+    if content.import_path is not None:
+        export_directory = os.path.dirname(content.import_path)
+    # Escape invalid char from filename.
+    return export_directory, escape_invalid_characters(name=content.name, invalid_char_list=['/', '\\'])
+
+
+def _add_asset_policy(policy, asset):
+    """
+    Adds the exported attributes of the given asset, as returned by
+    get_all_content_for_course, to the given assets policy.
+    """
+    for attr, value in asset.items():
+        if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
+            policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
@@ -180,6 +180,11 @@ class SignalHandler:
     5. The thing that listens for the signal lives in process, but should do
        almost no work. Its main job is to kick off the celery task that will
        do the actual work.
+    6. The split modulestore sends course_published with a "structure_diff"
+       kwarg: the StructureDiff of the blocks added, removed, moved and changed
+       by the publish, which handlers can pass on to their task with
+       structure_diff.to_dict(course_key) to update incrementally. It is only
+       computed when accessed, and isn't sent by other modulestores.
     """
 
     # If you add a new signal, please don't forget to add it to the _mapping
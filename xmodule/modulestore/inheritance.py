@@ -3,6 +3,7 @@ Support for inheritance of fields down an XBlock hierarchy.
 """
 
 
+import copy
 import warnings
 from django.utils import timezone
 from xblock.core import XBlockMixin
@@ -340,6 +341,93 @@ def own_metadata(block):
     return block.get_explicitly_set_fields_by_scope(Scope.settings)
 
 
+class InheritanceTable:
+    """
+    The values of the inheritable fields that the blocks of a tree inherit
+    from their ancestors, as json values.
+
+    The values are computed at most once per block of the tree, rather than by
+    walking up the ancestors of a block on each access to a field it doesn't
+    set.  Blocks that set no inheritable field share their parent's entry, so
+    the table only holds a dict for each block that sets some.
+
+    The tree is read through two functions, returning the key of the parent
+    of a block (or None) and the inheritable fields set on a block.  Changes
+    made to inheritable fields after the table is built are recorded with
+    set_local and delete_local, and take precedence over the tree's values.
+    """
+    _DELETED = object()
+
+    def __init__(self, get_parent_key, get_local_settings):
+        self._get_parent_key = get_parent_key
+        self._get_local_settings = get_local_settings
+        # {key: {field name: json value, or _DELETED}} of the changes made to blocks
+        self._local_changes = {}
+        # {key: the settings that the block's children inherit}
+        self._passed_down = {}
+
+    def inherited_settings(self, key):
+        """
+        Returns the {field name: json value} dict of the settings that the
+        given block inherits.  The dict is shared and must not be mutated.
+        """
+        parent_key = self._get_parent_key(key)
+        if parent_key is None:
+            return {}
+        return self._settings_passed_down(parent_key)
+
+    def set_local(self, key, name, value):
+        """
+        Records that the given block now sets the given field to the given json value.
+        """
+        self._local_changes.setdefault(key, {})[name] = value
+        self._passed_down.clear()
+
+    def delete_local(self, key, name):
+        """
+        Records that the given block no longer sets the given field.
+        """
+        self.set_local(key, name, self._DELETED)
+
+    def _local_settings(self, key):
+        """
+        Returns the inheritable settings set on the given block, including the recorded changes.
+        """
+        settings = self._get_local_settings(key)
+        changes = self._local_changes.get(key)
+        if changes:
+            settings = dict(settings)
+            for name, value in changes.items():
+                if value is self._DELETED:
+                    settings.pop(name, None)
+                else:
+                    settings[name] = value
+        return settings
+
+    def _settings_passed_down(self, key):
+        """
+        Returns the settings that the children of the given block inherit,
+        computing them for the block's ancestors that don't have them yet.
+        """
+        ancestors = []
+        settings = None
+        while key is not None and key not in ancestors:
+            settings = self._passed_down.get(key)
+            if settings is not None:
+                break
+            ancestors.append(key)
+            key = self._get_parent_key(key)
+
+        if settings is None:
+            settings = {}
+        for ancestor in reversed(ancestors):
+            local_settings = self._local_settings(ancestor)
+            if local_settings:
+                settings = dict(settings, **local_settings)
+            self._passed_down[ancestor] = settings
+        return settings
+
+
 class InheritingFieldData(KvsFieldData):
     """
     A `FieldData` implementation that can inherit value from parents to children.
@@ -353,14 +441,20 @@ class InheritingFieldData(KvsFieldData):
     InheritanceKeyValueStore.
     """
 
-    def __init__(self, inheritable_names, **kwargs):
+    def __init__(self, inheritable_names, inheritance_table=None, table_key=None, **kwargs):
         """
         `inheritable_names` is a list of names that can be inherited from
         parents.
 
+        `inheritance_table` is an optional InheritanceTable of the block's tree,
+        in which the block's key is `table_key`.  When given, inherited values
+        are looked up in it instead of walking up the block's ancestors, and
+        changes to the block's inheritable fields are recorded in it.
         """
         super().__init__(**kwargs)
         self.inheritable_names = set(inheritable_names)
+        self.inheritance_table = inheritance_table
+        self.table_key = table_key
 
     def has_default_value(self, name):
         """
@@ -377,6 +471,19 @@ class InheritingFieldData(KvsFieldData):
         The default for an inheritable name is found on a parent.
         """
         if name in self.inheritable_names:
+            if self.inheritance_table is not None:
+                # In case, if block's parent is of type 'library_content',
+                # bypass inheritance and use kvs' default (see below).
+                if self.has_default_value(name):
+                    ancestor = block.get_parent()
+                    if ancestor and ancestor.location.block_type == 'library_content':
+                        return super().default(block, name)
+                inherited_settings = self.inheritance_table.inherited_settings(self.table_key)
+                if name in inherited_settings:
+                    # Copy the value so that changes to it don't leak into the shared table
+                    return copy.deepcopy(inherited_settings[name])
+                return super().default(block, name)
+
             # Walk up the content tree to find the first ancestor
             # that this field is set on. Use the field from the current
             # block so that if it has a different default than the root
@@ -399,11 +506,33 @@ class InheritingFieldData(KvsFieldData):
                     ancestor = ancestor.get_parent()
         return super().default(block, name)
 
+    def set(self, block, name, value):
+        super().set(block, name, value)
+        if self.inheritance_table is not None and name in self.inheritable_names:
+            self.inheritance_table.set_local(self.table_key, name, value)
+
+    def set_many(self, block, update_dict):
+        super().set_many(block, update_dict)
+        if self.inheritance_table is not None:
+            for name, value in update_dict.items():
+                if name in self.inheritable_names:
+                    self.inheritance_table.set_local(self.table_key, name, value)
+
+    def delete(self, block, name):
+        super().delete(block, name)
+        if self.inheritance_table is not None and name in self.inheritable_names:
+            self.inheritance_table.delete_local(self.table_key, name)
 
-def inheriting_field_data(kvs):
-    """Create an InheritanceFieldData that inherits the names in InheritanceMixin."""
+
+def inheriting_field_data(kvs, inheritance_table=None, table_key=None):
+    """
+    Create an InheritanceFieldData that inherits the names in InheritanceMixin,
+    optionally from the given InheritanceTable.
+    """
     return InheritingFieldData(
         inheritable_names=InheritanceMixin.fields.keys(),  # lint-amnesty, pylint: disable=no-member
+        inheritance_table=inheritance_table,
+        table_key=table_key,
         kvs=kvs,
     )
 
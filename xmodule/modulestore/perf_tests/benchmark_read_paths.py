@@ -0,0 +1,177 @@
+"""
+Times the main read paths of a modulestore on a generated course, and reports
+the timings as JSON results that can be compared across commits.
+
+Each operation is timed with cold modulestore caches: the request, process
+and course structure caches are cleared before each run, so that the timings
+include loading the course's structure and definitions.  Clearing the course
+structure cache clears the whole 'course_structure_cache' Django cache.
+
+Publishes are timed on sequentials that were edited since their last
+publish, so that every run publishes changes.
+"""
+
+
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.perf_tests.generate_course import generate_course
+from xmodule.modulestore.split_mongo.mongo_connection import CourseStructureCache
+from xmodule.modulestore.split_mongo.process_cache import process_cache
+
+# Version of the format of the results; bump it when the meaning of a result changes.
+RESULTS_FORMAT_VERSION = 2
+
+# Number of blocks used by the operations timed on individual blocks.
+SAMPLE_SIZE = 20
+
+
+def time_operation(operation, repeat, setup=None):
+    """
+    Runs the given operation repeat times, each run preceded by an untimed call
+    to setup, and returns the statistics of the run times, in milliseconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        operation()
+        durations.append((time.perf_counter() - start) * 1000)
+    return {
+        'runs': repeat,
+        'min_ms': min(durations),
+        'median_ms': statistics.median(durations),
+        'mean_ms': statistics.mean(durations),
+        'max_ms': max(durations),
+    }
+
+
+def clear_caches(store):
+    """
+    Clears the modulestore caches that outlive a single operation.
+    """
+    if getattr(store, 'request_cache', None) is not None:
+        store.request_cache.data.clear()
+    process_cache.clear()
+    course_structure_cache = CourseStructureCache().cache
+    if course_structure_cache is not None:
+        course_structure_cache.clear()
+
+
+def collect_block_structure(store, course_key):
+    """
+    Builds the block structure of the published course and runs the collect
+    phase of the registered block transformers on it.
+    """
+    # Imported here since the block structure app is only available in the LMS and Studio.
+    from openedx.core.djangoapps.content.block_structure.factory import BlockStructureFactory
+    from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
+
+    with store.branch_setting(ModuleStoreEnum.Branch.published_only, course_key):
+        root_key = store.make_course_usage_key(course_key)
+        block_structure = BlockStructureFactory.create_from_modulestore(root_key, store)
+        BlockStructureTransformers.collect(block_structure)
+
+
+def benchmark_read_paths(store, user_id, shape, repeat=5, include_block_structure=True):
+    """
+    Generates a course of the given CourseShape in the given modulestore, times
+    its read paths, and returns the results as a JSON-serializable dict.
+    """
+    generated = generate_course(store, user_id, shape)
+    course_key = generated.course_key
+    problems = generated.sample('problem', SAMPLE_SIZE) or generated.sample('vertical', SAMPLE_SIZE)
+    sequentials = generated.sample('sequential', SAMPLE_SIZE)
+
+    def for_each(locations, operation):
+        return lambda: [operation(location) for location in locations]
+
+    edit_numbers = itertools.count()
+
+    def edit_sequentials():
+        """
+        Edits the draft of each sequential, so that publishing it publishes a change.
+        """
+        with store.branch_setting(ModuleStoreEnum.Branch.draft_preferred, course_key):
+            for location in sequentials:
+                sequential = store.get_item(location)
+                sequential.display_name = f'Sequential edit {next(edit_numbers)}'
+                store.update_item(sequential, user_id)
+
+    def publish_sequentials():
+        for location in sequentials:
+            store.publish(location, user_id)
+
+    def cold_setup(setup=None):
+        """
+        Returns a setup callback that runs the given setup, if any, and then
+        clears the caches.
+        """
+        def _setup():
+            if setup is not None:
+                setup()
+            clear_caches(store)
+        return _setup
+
+    operations = {
+        'get_course_depth_none': lambda: store.get_course(course_key, depth=None),
+        'get_item': for_each(problems, store.get_item),
+        'get_items_category': lambda: store.get_items(course_key, qualifiers={'category': 'problem'}),
+        'get_items_settings': lambda: store.get_items(
+            course_key, qualifiers={'category': 'vertical'}, settings={'display_name': 'Unit 0.0.0'},
+        ),
+        'get_items_content': lambda: store.get_items(
+            course_key, qualifiers={'category': 'html'}, content={'data': 'missing'},
+        ),
+        'get_parent_location': for_each(problems, store.get_parent_location),
+        'publish': publish_sequentials,
+    }
+    if include_block_structure:
+        operations['block_structure_collect'] = lambda: collect_block_structure(store, course_key)
+
+    setups = {'publish': cold_setup(edit_sequentials)}
+    timings = {
+        name: time_operation(operation, repeat, setup=setups.get(name, cold_setup()))
+        for name, operation in operations.items()
+    }
+    # The per-block operations are also reported per block, to compare shapes with each other.
+    for name, count in (('get_item', len(problems)), ('get_parent_location', len(problems)),
+                        ('publish', len(sequentials))):
+        timings[name]['blocks'] = count
+
+    return {
+        'format_version': RESULTS_FORMAT_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(),
+        'commit': _current_commit(),
+        'python': platform.python_version(),
+        'modulestore': type(store).__name__,
+        'shape': shape.to_dict(),
+        'timings': timings,
+    }
+
+
+def write_results(results, path):
+    """
+    Writes the given results to the given path, as JSON.
+    """
+    with open(path, 'w') as results_file:
+        json.dump(results, results_file, indent=2, sort_keys=True)
+
+
+def _current_commit():
+    """
+    Returns the id of the git commit of the checked out code, or None.
+    """
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, universal_newlines=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
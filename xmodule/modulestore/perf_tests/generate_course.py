@@ -0,0 +1,153 @@
+"""
+Generates synthetic courses of a configurable shape, for modulestore performance tests.
+
+The generated courses are deterministic: the same shape always produces the
+same blocks, in the same order, with the same content.
+"""
+
+
+import itertools
+
+# The payload of the definitions of the leaf block types that have one, by block type.
+DEFINITION_TEMPLATES = {
+    'problem': '<problem><p>{payload}</p><choiceresponse><checkboxgroup>'
+               '<choice correct="true">A</choice><choice correct="false">B</choice>'
+               '</checkboxgroup></choiceresponse></problem>',
+    'html': '<p>{payload}</p>',
+}
+
+
+class CourseShape:
+    """
+    The shape of a synthetic course:
+
+        chapters: number of chapters of the course
+        sequentials: number of sequentials of each chapter
+        verticals: number of verticals of each sequential
+        vertical_depth: number of levels of nested verticals below each sequential
+        leaves: number of leaf blocks of each innermost vertical
+        leaf_mix: (block type, weight) pairs of the types of the leaf blocks
+        definition_size: approximate size, in characters, of the definition of each
+            problem and html block
+    """
+    def __init__(
+        self, name, chapters=4, sequentials=4, verticals=4, vertical_depth=1, leaves=4,
+        leaf_mix=(('problem', 2), ('html', 1), ('video', 1)), definition_size=1000,
+    ):
+        self.name = name
+        self.chapters = chapters
+        self.sequentials = sequentials
+        self.verticals = verticals
+        self.vertical_depth = vertical_depth
+        self.leaves = leaves
+        self.leaf_mix = tuple(leaf_mix)
+        self.definition_size = definition_size
+
+    def leaf_types(self):
+        """
+        Returns an endless iterator of the types of the successive leaf blocks.
+        """
+        return itertools.cycle([block_type for block_type, weight in self.leaf_mix for _ in range(weight)])
+
+    def block_count(self):
+        """
+        Returns the number of blocks of a course of this shape, including its root.
+        """
+        sequentials = self.chapters * self.sequentials
+        verticals = 0
+        innermost_verticals = sequentials
+        for _ in range(self.vertical_depth):
+            innermost_verticals *= self.verticals
+            verticals += innermost_verticals
+        return 1 + self.chapters + sequentials + verticals + innermost_verticals * self.leaves
+
+    def to_dict(self):
+        """
+        Returns the shape as a JSON-serializable dict.
+        """
+        return {
+            'name': self.name,
+            'chapters': self.chapters,
+            'sequentials': self.sequentials,
+            'verticals': self.verticals,
+            'vertical_depth': self.vertical_depth,
+            'leaves': self.leaves,
+            'leaf_mix': [list(pair) for pair in self.leaf_mix],
+            'definition_size': self.definition_size,
+            'block_count': self.block_count(),
+        }
+
+
+# Shapes used by the read path benchmarks, from a small course to a very large one.
+SMALL_COURSE = CourseShape('small', chapters=2, sequentials=2, verticals=2, leaves=2, definition_size=200)
+MEDIUM_COURSE = CourseShape('medium')
+LARGE_COURSE = CourseShape('large', chapters=10, sequentials=6, verticals=6, leaves=5)
+DEEP_COURSE = CourseShape('deep', chapters=3, sequentials=3, verticals=2, vertical_depth=4, leaves=2)
+
+
+class GeneratedCourse:
+    """
+    The keys of the blocks of a generated course, by block type.
+    """
+    def __init__(self, course_key, shape):
+        self.course_key = course_key
+        self.shape = shape
+        self.locations = {}
+
+    def add(self, location):
+        """
+        Records the location of a generated block.
+        """
+        self.locations.setdefault(location.block_type, []).append(location)
+
+    def sample(self, block_type, count):
+        """
+        Returns up to count locations of blocks of the given type, spread evenly over the course.
+        """
+        locations = self.locations.get(block_type, [])
+        step = max(1, len(locations) // count)
+        return locations[::step][:count]
+
+
+def generate_course(store, user_id, shape, org='perf', course='synthetic', run=None):
+    """
+    Creates a course of the given CourseShape in the given modulestore, publishes
+    it, and returns its GeneratedCourse.
+    """
+    course_block = store.create_course(org, course, run or shape.name, user_id)
+    generated = GeneratedCourse(course_block.id, shape)
+    generated.add(course_block.location)
+    leaf_types = shape.leaf_types()
+    payload = ('lorem ipsum ' * (shape.definition_size // 12 + 1))[:shape.definition_size]
+
+    def create(parent_location, block_type, display_name, fields=None):
+        block = store.create_child(
+            user_id, parent_location, block_type, fields=dict(fields or {}, display_name=display_name),
+        )
+        generated.add(block.location)
+        return block.location
+
+    def create_verticals(parent_location, depth, prefix):
+        for vertical in range(shape.verticals):
+            name = f'{prefix}.{vertical}'
+            location = create(parent_location, 'vertical', f'Unit {name}')
+            if depth > 1:
+                create_verticals(location, depth - 1, name)
+                continue
+            for leaf in range(shape.leaves):
+                leaf_type = next(leaf_types)
+                fields = {}
+                if leaf_type in DEFINITION_TEMPLATES:
+                    fields['data'] = DEFINITION_TEMPLATES[leaf_type].format(payload=payload)
+                create(location, leaf_type, f'{leaf_type} {name}.{leaf}', fields)
+
+    with store.bulk_operations(generated.course_key):
+        for chapter in range(shape.chapters):
+            chapter_location = create(course_block.location, 'chapter', f'Section {chapter}')
+            for sequential in range(shape.sequentials):
+                name = f'{chapter}.{sequential}'
+                sequential_location = create(chapter_location, 'sequential', f'Subsection {name}')
+                create_verticals(sequential_location, shape.vertical_depth, name)
+        store.publish(course_block.location, user_id)
+
+    return generated
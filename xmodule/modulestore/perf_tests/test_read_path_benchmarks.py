@@ -0,0 +1,47 @@
+"""
+Benchmarks of the read paths of the split modulestore on generated courses.
+
+These don't run as part of the regular unit tests.  To run them, set the
+MODULESTORE_BENCHMARK_RESULTS_DIR environment variable to a directory in which
+to write the JSON results, one file per course shape, e.g.:
+
+    MODULESTORE_BENCHMARK_RESULTS_DIR=/tmp/benchmarks pytest xmodule/modulestore/perf_tests/test_read_path_benchmarks.py
+
+and compare the files written for different commits.
+"""
+
+
+import os
+import unittest
+
+import ddt
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.perf_tests.benchmark_read_paths import benchmark_read_paths, write_results
+from xmodule.modulestore.perf_tests.generate_course import DEEP_COURSE, LARGE_COURSE, MEDIUM_COURSE, SMALL_COURSE
+from xmodule.modulestore.tests.utils import VersioningModulestoreBuilder
+
+RESULTS_DIR = os.environ.get('MODULESTORE_BENCHMARK_RESULTS_DIR')
+
+# Number of timed runs of each operation.
+REPEAT = int(os.environ.get('MODULESTORE_BENCHMARK_REPEAT', 5))
+
+
+@ddt.ddt
+@unittest.skipUnless(RESULTS_DIR, 'MODULESTORE_BENCHMARK_RESULTS_DIR is not set.')
+class SplitReadPathBenchmarks(unittest.TestCase):
+    """
+    Times the read paths of the split modulestore on courses of several shapes.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @ddt.data(SMALL_COURSE, MEDIUM_COURSE, LARGE_COURSE, DEEP_COURSE)
+    def test_read_paths(self, shape):
+        with VersioningModulestoreBuilder().build() as (_, store):
+            results = benchmark_read_paths(store, ModuleStoreEnum.UserID.test, shape, repeat=REPEAT)
+
+        assert set(results['timings']) >= {'get_course_depth_none', 'get_item', 'get_items_category', 'publish'}
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        write_results(results, os.path.join(RESULTS_DIR, f'split_read_paths_{shape.name}.json'))
@@ -18,11 +18,12 @@ from xmodule.mako_block import MakoDescriptorSystem
 from xmodule.modulestore import BlockData
 from xmodule.modulestore.edit_info import EditInfoRuntimeMixin
 from xmodule.modulestore.exceptions import ItemNotFoundError
-from xmodule.modulestore.inheritance import InheritanceMixin, inheriting_field_data
+from xmodule.modulestore.inheritance import InheritanceMixin, InheritanceTable, inheriting_field_data
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
 from xmodule.modulestore.split_mongo.definition_lazy_loader import DefinitionLazyLoader
 from xmodule.modulestore.split_mongo.id_manager import SplitMongoIdManager
 from xmodule.modulestore.split_mongo.split_mongo_kvs import SplitMongoKVS
+from xmodule.modulestore.split_mongo.structure_index import get_structure_index
 from xmodule.util.misc import get_library_or_course_attribute
 from xmodule.x_module import XModuleMixin
 
@@ -91,6 +92,33 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):  # li
                 parent_map[child] = block_key
         return parent_map
 
+    def _get_parent_key(self, block_key):
+        """
+        Returns the BlockKey of the parent of the given block, or None, using the
+        structure's precomputed index when it has one.
+        """
+        structure_index = get_structure_index(self.course_entry.structure)
+        if structure_index is not None:
+            return structure_index.parent(block_key)
+        return self._parent_map.get(block_key)
+
+    @lazy
+    def _inheritance_table(self):
+        """
+        The InheritanceTable of the structure's blocks, shared by the field data of all of them.
+        """
+        inheritable_names = set(InheritanceMixin.fields)  # pylint: disable=no-member
+        blocks = self.course_entry.structure['blocks']
+
+        def get_local_settings(block_key):
+            block_data = blocks.get(block_key)
+            if block_data is None:
+                return {}
+            fields = block_data.fields
+            return {name: fields[name] for name in inheritable_names.intersection(fields)}
+
+        return InheritanceTable(self._get_parent_key, get_local_settings)
+
     def _load_item(self, usage_key, course_entry_override=None, **kwargs):
         """
         Instantiate the xblock fetching it either from the cache or from the structure
@@ -265,8 +293,8 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):  # li
 
         converted_fields = convert_fields(block_data.fields)
         converted_defaults = convert_fields(block_data.defaults)
-        if block_key in self._parent_map:
-            parent_key = self._parent_map[block_key]
+        parent_key = self._get_parent_key(block_key)
+        if parent_key is not None:
             parent = course_key.make_usage_key(parent_key.type, parent_key.id)
         else:
             parent = None
@@ -304,7 +332,11 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):  # li
         )
 
         if InheritanceMixin in self.modulestore.xblock_mixins:
-            field_data = inheriting_field_data(kvs)
+            if block_key in self.course_entry.structure['blocks']:
+                field_data = inheriting_field_data(kvs, self._inheritance_table, block_key)
+            else:
+                # Blocks that aren't saved yet inherit from the parent they were created for.
+                field_data = inheriting_field_data(kvs)
         else:
             field_data = KvsFieldData(kvs)
 
@@ -3,12 +3,16 @@ Segregation of pymongo functions from the data modeling mechanisms for split mod
 """
 
 
+import copy
 import datetime
 import logging
 import math
 import pickle
 import re
 import zlib
+from array import array
+from collections import OrderedDict
+from collections.abc import MutableMapping
 from contextlib import contextmanager
 from time import time
 
@@ -23,10 +27,16 @@ from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 from edx_django_utils import monitoring
 from edx_django_utils.cache import RequestCache
 
-from common.djangoapps.split_modulestore_django.models import SplitModulestoreCourseIndex
+from common.djangoapps.split_modulestore_django.models import (
+    SplitModulestoreCourseIndex,
+    SplitModulestoreCourseSummary,
+)
+from xmodule.course_block import CourseSummary
 from xmodule.exceptions import HeartbeatFailure
-from xmodule.modulestore import BlockData
+from xmodule.modulestore import BlockData, ModuleStoreEnum
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.process_cache import process_cache
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex, index_structure_blocks
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 from openedx.core.lib.cache_utils import request_cached
 
@@ -190,14 +200,150 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+class CachedStructureBlocks(MutableMapping):
+    """
+    The {BlockKey: BlockData} map of a structure read from the CourseStructureCache.
+
+    The blocks are stored as index arrays of block types and ids, an adjacency
+    list of the indices of their children, and a pickled blob of each block's
+    remaining data.  A block's BlockData is only built when the block is first
+    accessed, so reading a few blocks of a large structure doesn't pay for
+    building all of them.
+
+    Until the blocks are modified, their StructureIndex is available as `index`.
+    """
+    def __init__(self, block_types, block_ids, child_offsets, child_indices, blobs, index=None):
+        self._block_types = block_types
+        self._block_ids = block_ids
+        # The children of block i are child_indices[child_offsets[i]:child_offsets[i + 1]]
+        self._child_offsets = child_offsets
+        self._child_indices = child_indices
+        self._blobs = blobs
+        # BlockKeys are namedtuples, so they can be looked up by (block_type, block_id) tuples.
+        # Blocks that haven't been accessed yet map to their index.
+        self._blocks = dict(zip(zip(block_types, block_ids), range(len(blobs))))
+        self.index = index
+
+    def __getitem__(self, block_key):
+        block_data = self._blocks[block_key]
+        if isinstance(block_data, int):
+            block_data = self._blocks[block_key] = self._decode(block_data)
+        return block_data
+
+    def __setitem__(self, block_key, block_data):
+        self._blocks[block_key] = block_data
+        self.index = None
+
+    def __delitem__(self, block_key):
+        del self._blocks[block_key]
+        self.index = None
+
+    def __deepcopy__(self, memo):
+        # The arrays and blobs are never modified, so copies can share them.
+        blocks = copy.copy(self)
+        blocks._blocks = copy.deepcopy(self._blocks, memo)  # pylint: disable=protected-access
+        # Copies of structures are made to be modified, which the index can't follow.
+        blocks.index = None
+        return blocks
+
+    def __iter__(self):
+        for block_key in self._blocks:
+            yield block_key if isinstance(block_key, BlockKey) else BlockKey(*block_key)
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def _decode(self, index):
+        """
+        Builds the BlockData of the block at the given index.
+        """
+        storable, has_indexed_children = pickle.loads(self._blobs[index])
+        if has_indexed_children:
+            start, end = self._child_offsets[index], self._child_offsets[index + 1]
+            storable['fields']['children'] = [
+                BlockKey(self._block_types[child], self._block_ids[child]) for child in self._child_indices[start:end]
+            ]
+        return BlockData(**storable)
+
+
+def structure_to_cache(structure):
+    """
+    Converts a structure, as returned by structure_from_mongo, to the format
+    stored in the CourseStructureCache, from which structure_from_cache can
+    load it without building an object for each of its blocks.
+
+    Children that are blocks of the structure are stored as indices in an
+    adjacency list; any other block data is pickled separately for each block.
+    The structure's index of parents and reachable blocks is stored with them.
+    """
+    block_keys = list(structure['blocks'])
+    indices = {block_key: index for index, block_key in enumerate(block_keys)}
+    child_offsets = array('l', [0])
+    child_indices = array('l')
+    blobs = []
+    block_children = []
+    for block_key in block_keys:
+        storable = structure['blocks'][block_key].to_storable()
+        children = storable['fields'].get('children')
+        block_children.append(children or [])
+        has_indexed_children = children is not None and all(child in indices for child in children)
+        if has_indexed_children:
+            storable['fields'] = {name: value for name, value in storable['fields'].items() if name != 'children'}
+            child_indices.extend(indices[child] for child in children)
+        child_offsets.append(len(child_indices))
+        blobs.append(pickle.dumps((storable, has_indexed_children), 4))
+
+    return {
+        'structure': {name: value for name, value in structure.items() if name != 'blocks'},
+        'block_types': [block_key.type for block_key in block_keys],
+        'block_ids': [block_key.id for block_key in block_keys],
+        'child_offsets': child_offsets,
+        'child_indices': child_indices,
+        'blobs': blobs,
+        **index_structure_blocks(block_keys, block_children),
+    }
+
+
+def structure_from_cache(cached_structure):
+    """
+    Converts a structure stored in the CourseStructureCache by
+    structure_to_cache back to the format returned by structure_from_mongo.
+    """
+    structure = dict(cached_structure['structure'])
+    structure['blocks'] = CachedStructureBlocks(
+        cached_structure['block_types'],
+        cached_structure['block_ids'],
+        cached_structure['child_offsets'],
+        cached_structure['child_indices'],
+        cached_structure['blobs'],
+        StructureIndex(
+            cached_structure['block_types'],
+            cached_structure['block_ids'],
+            cached_structure['parent_offsets'],
+            cached_structure['parent_indices'],
+            cached_structure['dangling_parents'],
+            cached_structure['reachable'],
+        ) if 'reachable' in cached_structure else None,
+    )
+    return structure
+
+
 class CourseStructureCache:
     """
     Wrapper around django cache object to cache course structure objects.
-    The course structures are pickled and compressed when cached.
+    The course structures are converted by structure_to_cache, pickled and
+    compressed when cached.
+
+    Cache keys are prefixed with the version of the cached format.  Structures
+    cached in previous formats are still read, and upgraded, until they expire:
+    those cached without their StructureIndex from 'v2.' keys, and those where
+    the whole structure was pickled from their unversioned keys.
 
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
     """
+    FORMAT_VERSION = 3
+
     def __init__(self):
         self.cache = None
         try:
@@ -205,40 +351,97 @@ class CourseStructureCache:
         except InvalidCacheBackendError:
             pass
 
+    @classmethod
+    def versioned_key(cls, key):
+        """
+        Returns the cache key of the structure with the given id in the current format.
+        """
+        return f'v{cls.FORMAT_VERSION}.{key}'
+
+    def is_enabled(self):
+        """
+        Returns whether a 'course_structure_cache' is configured.
+        """
+        return self.cache is not None
+
     def get(self, key, course_context=None):
         """Pull the compressed, pickled struct data from cache and deserialize."""
+        cached_structure = self.get_cached(key, course_context)
+        if cached_structure is None:
+            return None
+        return structure_from_cache(cached_structure)
+
+    def get_cached(self, key, course_context=None):
+        """
+        Pull the compressed, pickled struct data from cache and return it
+        in the format of structure_to_cache.
+        """
         if self.cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
-            try:
-                compressed_pickled_data = self.cache.get(key)
-                tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
+            cached_structure = self._get(self.versioned_key(key), lambda data: data, tagger, course_context)
+            cache_format = self.FORMAT_VERSION
+            # Fall back to the previous formats, which may still be cached
+            # while servers that write them are being upgraded.
+            previous_formats = (
+                (2, f'v2.{key}', lambda data: structure_to_cache(structure_from_cache(data))),
+                (1, key, structure_to_cache),
+            )
+            for previous_format, cache_key, load in previous_formats:
+                if cached_structure is not None:
+                    break
+                cached_structure = self._get(cache_key, load, tagger, course_context)
+                cache_format = previous_format
+                if cached_structure is not None:
+                    self.set_cached(key, cached_structure, course_context)
+
+            tagger.tag(from_cache=str(cached_structure is not None).lower())
+            if cached_structure is None:
+                # Always log cache misses, because they are unexpected
+                tagger.sample_rate = 1
+            else:
+                tagger.tag(cache_format=cache_format)
+            return cached_structure
 
-                if compressed_pickled_data is None:
-                    # Always log cache misses, because they are unexpected
-                    tagger.sample_rate = 1
-                    return None
+    def _get(self, cache_key, load, tagger, course_context):
+        """
+        Reads and decompresses the data cached with the given key, and returns
+        the structure loaded from it by the given load function.
+        """
+        try:
+            compressed_pickled_data = self.cache.get(cache_key)
+            if compressed_pickled_data is None:
+                return None
 
-                tagger.measure('compressed_size', len(compressed_pickled_data))
+            tagger.measure('compressed_size', len(compressed_pickled_data))
 
-                pickled_data = zlib.decompress(compressed_pickled_data)
-                tagger.measure('uncompressed_size', len(pickled_data))
+            pickled_data = zlib.decompress(compressed_pickled_data)
+            tagger.measure('uncompressed_size', len(pickled_data))
 
-                return pickle.loads(pickled_data, encoding='latin-1')
-            except Exception:  # lint-amnesty, pylint: disable=broad-except
-                # The cached data is corrupt in some way, get rid of it.
-                log.warning("CourseStructureCache: Bad data in cache for %s", course_context)
-                self.cache.delete(key)
-                return None
+            return load(pickle.loads(pickled_data, encoding='latin-1'))
+        except Exception:  # lint-amnesty, pylint: disable=broad-except
+            # The cached data is corrupt in some way, get rid of it.
+            log.warning("CourseStructureCache: Bad data in cache for %s", course_context)
+            self.cache.delete(cache_key)
+            return None
 
     def set(self, key, structure, course_context=None):
-        """Given a structure, will pickle, compress, and write to cache."""
+        """Given a structure, will convert, pickle, compress, and write to cache."""
+        if self.cache is None:
+            return None
+        self.set_cached(key, structure_to_cache(structure), course_context)
+
+    def set_cached(self, key, cached_structure, course_context=None):
+        """
+        Given a structure in the format of structure_to_cache, will pickle,
+        compress, and write to cache.
+        """
         if self.cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.set", course_context) as tagger:
-            pickled_data = pickle.dumps(structure, 4)  # Protocol can't be incremented until cache is cleared
+            pickled_data = pickle.dumps(cached_structure, 4)
             tagger.measure('uncompressed_size', len(pickled_data))
 
             # 1 = Fastest (slightly larger results)
@@ -249,7 +452,7 @@ class CourseStructureCache:
             # We rely on the course structure cache default timeout, which should be
             # high by default (~ a few days).
             try:
-                self.cache.set(key, compressed_pickled_data)
+                self.cache.set(self.versioned_key(key), compressed_pickled_data)
             except Exception:  # pylint: disable=broad-except
                 total_bytes_in_one_mb = 1024 * 1024
                 chunk_size_in_mbs = round(data_size / total_bytes_in_one_mb, 2)
@@ -336,30 +539,44 @@ class MongoPersistenceBackend:
         """
         Get the structure from the persistence mechanism whose id is the given key.
 
-        This method will use a cached version of the structure if it is available.
+        This method will use a cached version of the structure if it is available,
+        from the process-wide cache or the CourseStructureCache.
         """
         with TIMER.timer("get_structure", course_context) as tagger_get_structure:
+            cached_structure = process_cache.get_structure(key)
+            tagger_get_structure.tag(from_process_cache=str(cached_structure is not None).lower())
+            if cached_structure is not None:
+                return structure_from_cache(cached_structure)
+
             cache = CourseStructureCache()
 
-            structure = cache.get(key, course_context)
-            tagger_get_structure.tag(from_cache=str(bool(structure)).lower())
-            if not structure:
-                # Always log cache misses, because they are unexpected
-                tagger_get_structure.sample_rate = 1
-
-                with TIMER.timer("get_structure.find_one", course_context) as tagger_find_one:
-                    doc = self.structures.find_one({'_id': key})
-                    if doc is None:
-                        log.warning(
-                            "doc was None when attempting to retrieve structure for item with key %s",
-                            str(key)
-                        )
-                        return None
-                    tagger_find_one.measure("blocks", len(doc['blocks']))
-                    structure = structure_from_mongo(doc, course_context)
-                    tagger_find_one.sample_rate = 1
-
-                cache.set(key, structure, course_context)
+            cached_structure = cache.get_cached(key, course_context)
+            tagger_get_structure.tag(from_cache=str(bool(cached_structure)).lower())
+            if cached_structure:
+                process_cache.set_structure(key, cached_structure)
+                return structure_from_cache(cached_structure)
+
+            # Always log cache misses, because they are unexpected
+            tagger_get_structure.sample_rate = 1
+
+            with TIMER.timer("get_structure.find_one", course_context) as tagger_find_one:
+                doc = self.structures.find_one({'_id': key})
+                if doc is None:
+                    log.warning(
+                        "doc was None when attempting to retrieve structure for item with key %s",
+                        str(key)
+                    )
+                    return None
+                tagger_find_one.measure("blocks", len(doc['blocks']))
+                structure = structure_from_mongo(doc, course_context)
+                tagger_find_one.sample_rate = 1
+
+            if cache.is_enabled() or process_cache.is_enabled():
+                cached_structure = structure_to_cache(structure)
+                cache.set_cached(key, cached_structure, course_context)
+                process_cache.set_structure(key, cached_structure)
+                # Return the indexed structure, as a cache hit would.
+                return structure_from_cache(cached_structure)
 
             return structure
 
@@ -543,7 +760,12 @@ class MongoPersistenceBackend:
         Get the definition from the persistence mechanism whose id is the given key
         """
         with TIMER.timer("get_definition", course_context) as tagger:
-            definition = self.definitions.find_one({'_id': key})
+            definition = process_cache.get_definition(key)
+            tagger.tag(from_process_cache=str(definition is not None).lower())
+            if definition is None:
+                definition = self.definitions.find_one({'_id': key})
+                if definition is not None and process_cache.is_enabled():
+                    process_cache.set_definition(definition)
             tagger.measure("fields", len(definition['fields']))
             tagger.tag(block_type=definition['block_type'])
             return definition
@@ -554,8 +776,24 @@ class MongoPersistenceBackend:
         """
         with TIMER.timer("get_definitions", course_context) as tagger:
             tagger.measure('definitions', len(definitions))
-            definitions = self.definitions.find({'_id': {'$in': definitions}})
-            return definitions
+            if not process_cache.is_enabled():
+                return self.definitions.find({'_id': {'$in': definitions}})
+
+            cached_definitions = []
+            missing_ids = []
+            for definition_id in definitions:
+                definition = process_cache.get_definition(definition_id)
+                if definition is None:
+                    missing_ids.append(definition_id)
+                else:
+                    cached_definitions.append(definition)
+            tagger.measure('from_process_cache', len(cached_definitions))
+
+            if missing_ids:
+                for definition in self.definitions.find({'_id': {'$in': missing_ids}}):
+                    process_cache.set_definition(definition)
+                    cached_definitions.append(definition)
+            return cached_definitions
 
     def insert_definition(self, definition, course_context=None):
         """
@@ -606,6 +844,7 @@ class MongoPersistenceBackend:
         If connections is True, then close the connection to the database as well.
         """
         RequestCache(namespace="course_index_cache").clear()
+        process_cache.clear()
 
         self.ensure_connection()
         connection = self.database.client
@@ -625,16 +864,120 @@ class MongoPersistenceBackend:
             connection.close()
 
 
+def course_summary_info(course_block_fields):
+    """
+    Returns the {field name: json value} dict of the CourseSummary fields set in
+    the given fields of a course block.
+    """
+    return {
+        field: course_block_fields[field]
+        for field in CourseSummary.course_info_fields
+        if field in course_block_fields
+    }
+
+
 class DjangoFlexPersistenceBackend(MongoPersistenceBackend):
     """
     Backend for split mongo that can read/write from MySQL and/or S3 instead of Mongo,
     either partially replacing MongoDB or fully replacing it.
     """
 
+    # Branches of courses whose summaries are materialized in SplitModulestoreCourseSummary.
+    SUMMARY_BRANCHES = (ModuleStoreEnum.BranchName.draft, ModuleStoreEnum.BranchName.published)
+    # Maximum number of inserted structures whose course summary is kept until the index points to them.
+    MAX_PENDING_SUMMARIES = 1000
+
     def __init__(self, *args, **kwargs):
         # Initialize the parent MongoDB backend, and tell it that MySQL is in use too, so some things like collision
         # detection will be done at the MySQL layer only and not duplicated at the MongoDB layer.
         super().__init__(*args, **kwargs, with_mysql_subclass=True)
+        # {hex structure id: course summary info} of the recently inserted course structures, which are saved as
+        # SplitModulestoreCourseSummary entries once the course index is updated to point to them.
+        self._pending_summaries = OrderedDict()
+
+    def insert_structure(self, structure, course_context=None):
+        """
+        Insert a new structure into the database, keeping the summary of its course block
+        until the course index is updated to point to it.
+        """
+        super().insert_structure(structure, course_context)
+        root = structure.get('root')
+        if root is None or root.type != 'course' or root not in structure['blocks']:
+            return
+        self._pending_summaries[str(structure['_id'])] = course_summary_info(structure['blocks'][root].fields)
+        while len(self._pending_summaries) > self.MAX_PENDING_SUMMARIES:
+            try:
+                self._pending_summaries.popitem(last=False)
+            except KeyError:
+                break
+
+    def _save_pending_summaries(self, index_obj):
+        """
+        Saves the summaries of the branches of the given SplitModulestoreCourseIndex whose
+        head is a structure inserted by this backend.
+        """
+        for branch in self.SUMMARY_BRANCHES:
+            version = getattr(index_obj, SplitModulestoreCourseIndex.field_name_for_branch(branch))
+            course_info = self._pending_summaries.pop(version, None) if version else None
+            if course_info is not None:
+                SplitModulestoreCourseSummary.objects.update_or_create(
+                    course_index=index_obj, branch=branch, defaults={'version': version, 'course_info': course_info},
+                )
+
+    def find_course_summaries(self, branch, org_target=None, course_keys=None, offset=0, limit=None):
+        """
+        Returns a page of the course indexes that have the given branch, ordered by course id, as
+        (course_index, course_info) pairs, where course_info is the materialized summary of the
+        course block of the head of the branch, or None if there is no up to date summary of it.
+
+        Arguments:
+            branch: one of SUMMARY_BRANCHES
+            org_target: If specified, only return the courses of this org
+            course_keys: If specified, only return the courses with these keys
+            offset, limit: the index of the first course of the page, and the maximum number of
+                courses in the page (all of them if None)
+        """
+        branch_field = SplitModulestoreCourseIndex.field_name_for_branch(branch)
+        queryset = SplitModulestoreCourseIndex.objects.exclude(**{branch_field: ""}).order_by("course_id")
+        if course_keys:
+            queryset = queryset.filter(course_id__in=course_keys)
+        if org_target:
+            queryset = queryset.filter(org=org_target)
+        page = list(queryset[offset:] if limit is None else queryset[offset:offset + limit])
+
+        summaries = {
+            summary.course_index_id: summary
+            for summary in SplitModulestoreCourseSummary.objects.filter(course_index__in=page, branch=branch)
+        }
+        results = []
+        for index_obj in page:
+            summary = summaries.get(index_obj.id)
+            if summary is not None and summary.version == getattr(index_obj, branch_field):
+                results.append((index_obj.as_v1_schema(), summary.course_info))
+            else:
+                results.append((index_obj.as_v1_schema(), None))
+        return results
+
+    def save_course_summaries(self, branch, summaries):
+        """
+        Saves the given (course_index, course_info) summaries of the given branch, computed
+        by the caller for the current version of the branch of each course index.
+        """
+        index_objs = {
+            index_obj.objectid: index_obj
+            for index_obj in SplitModulestoreCourseIndex.objects.filter(
+                objectid__in=[str(course_index['_id']) for course_index, _ in summaries]
+            )
+        }
+        for course_index, course_info in summaries:
+            index_obj = index_objs.get(str(course_index['_id']))
+            if index_obj is None:
+                continue
+            SplitModulestoreCourseSummary.objects.update_or_create(
+                course_index=index_obj,
+                branch=branch,
+                defaults={'version': str(course_index['versions'][branch]), 'course_info': course_info},
+            )
 
     # Structures and definitions are only supported in MongoDB for now.
     # Course indexes are read from MySQL and written to both MongoDB and MySQL
@@ -733,6 +1076,7 @@ class DjangoFlexPersistenceBackend(MongoPersistenceBackend):
         course_index['last_update'] = datetime.datetime.now(pytz.utc)
         new_index = SplitModulestoreCourseIndex(**SplitModulestoreCourseIndex.fields_from_v1_schema(course_index))
         new_index.save()
+        self._save_pending_summaries(new_index)
         # Also write to MongoDB, so we can switch back to using it if this new MySQL version doesn't work well.
         # NOTE: This is REQUIRED for pruning (structures.py) to run safely. Don't remove this write until
         # pruning is modified to read from SplitModulestoreCourseIndex to get active versions.
@@ -789,6 +1133,7 @@ class DjangoFlexPersistenceBackend(MongoPersistenceBackend):
 
         # Save the course index entry and create a historical record:
         index_obj.save()
+        self._save_pending_summaries(index_obj)
 
         # Also write to MongoDB, so we can switch back to using it if this new MySQL version doesn't work well.
         # NOTE: This is REQUIRED for pruning (structures.py) to run safely. Don't remove this write until
@@ -0,0 +1,167 @@
+"""
+Process-wide cache of split modulestore structures and definitions.
+
+Structures and definitions are content-addressed: a document stored under
+a given id is never changed, so a process can keep it for as long as it
+likes without ever serving stale data.  This cache keeps recently used
+documents in memory across requests, in front of the CourseStructureCache
+and MongoDB, within a budget on their total size.
+
+Entries are stored in a serialized form, so that each read returns a
+fresh copy that callers are free to mutate:
+
+    * structures in the format of structure_to_cache, whose blocks are
+      only built when they are accessed, and
+    * definitions as pickled documents.
+"""
+
+
+import logging
+import pickle
+from collections import OrderedDict, defaultdict
+from threading import Lock
+
+from django.conf import settings
+from edx_django_utils import monitoring
+
+log = logging.getLogger(__name__)
+
+STRUCTURE = 'structure'
+DEFINITION = 'definition'
+
+
+class SplitDocumentProcessCache:
+    """
+    Thread-safe LRU map of (document type, document id) keys to serialized
+    documents, bounded by the total approximate size of the documents.
+    """
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.size = 0
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self.evictions = 0
+
+    def max_size(self):
+        """
+        Returns the maximum total size, in bytes, of the cached documents.
+        A value of 0 disables the cache.
+        """
+        # .. setting_name: SPLIT_MODULESTORE_PROCESS_CACHE_MAX_BYTES
+        # .. setting_default: 0
+        # .. setting_description: Approximate maximum number of bytes of split modulestore structures
+        #   and definitions to keep in each process, in front of the course structure cache and
+        #   MongoDB. Set to 0 to disable the process-wide cache.
+        return getattr(settings, 'SPLIT_MODULESTORE_PROCESS_CACHE_MAX_BYTES', 0)
+
+    def is_enabled(self):
+        """
+        Returns whether the process-wide cache is enabled.
+        """
+        return self.max_size() > 0
+
+    def get(self, document_type, document_id):
+        """
+        Returns the serialized document of the given type cached for the
+        given id, or None.
+        """
+        if not self.is_enabled():
+            return None
+        key = (document_type, document_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses[document_type] += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits[document_type] += 1
+        monitoring.increment(f'split_mongo.process_cache.{document_type}.{"hits" if entry else "misses"}')
+        return entry[0] if entry else None
+
+    def set(self, document_type, document_id, serialized_document, size):
+        """
+        Caches the given serialized document of the given type and size for
+        the given id, evicting the least recently used documents if needed.
+        Documents larger than the whole cache are not cached.
+        """
+        max_size = self.max_size()
+        if size > max_size:
+            return
+        key = (document_type, document_id)
+        with self._lock:
+            previous_entry = self._entries.pop(key, None)
+            if previous_entry is not None:
+                self.size -= previous_entry[1]
+            self._entries[key] = (serialized_document, size)
+            self.size += size
+            while self.size > max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    def get_structure(self, structure_id):
+        """
+        Returns the structure cached for the given id, in the format of
+        structure_to_cache, or None.
+        """
+        return self.get(STRUCTURE, structure_id)
+
+    def set_structure(self, structure_id, cached_structure):
+        """
+        Caches the given structure, in the format of structure_to_cache.
+        """
+        size = (
+            sum(len(blob) for blob in cached_structure['blobs']) +
+            sum(len(block_id) for block_id in cached_structure['block_ids']) +
+            sum(
+                cached_structure[name].itemsize * len(cached_structure[name])
+                for name in ('child_offsets', 'child_indices', 'parent_offsets', 'parent_indices')
+            ) +
+            len(cached_structure['reachable'])
+        )
+        self.set(STRUCTURE, structure_id, cached_structure, size)
+
+    def get_definition(self, definition_id):
+        """
+        Returns a copy of the definition cached for the given id, or None.
+        """
+        pickled_definition = self.get(DEFINITION, definition_id)
+        if pickled_definition is None:
+            return None
+        return pickle.loads(pickled_definition)
+
+    def set_definition(self, definition):
+        """
+        Caches the given definition.
+        """
+        pickled_definition = pickle.dumps(definition, 4)
+        self.set(DEFINITION, definition['_id'], pickled_definition, len(pickled_definition))
+
+    def clear(self):
+        """
+        Removes all entries and resets the metrics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = self.evictions = 0
+            self.hits.clear()
+            self.misses.clear()
+
+    def stats(self):
+        """
+        Returns a dict of the cache's current metrics.
+        """
+        with self._lock:
+            return dict(
+                entries=len(self._entries),
+                size=self.size,
+                max_size=self.max_size(),
+                hits=dict(self.hits),
+                misses=dict(self.misses),
+                evictions=self.evictions,
+            )
+
+
+# The single, process-wide instance.
+process_cache = SplitDocumentProcessCache()
@@ -63,6 +63,7 @@ from importlib import import_module
 
 from bson.objectid import ObjectId
 from ccx_keys.locator import CCXBlockUsageLocator, CCXLocator
+from django.utils.functional import SimpleLazyObject
 from mongodb_proxy import autoretry_read
 from opaque_keys.edx.keys import CourseKey
 from opaque_keys.edx.locator import (
@@ -100,7 +101,13 @@ from xmodule.modulestore.exceptions import (
     VersionConflictError
 )
 from xmodule.modulestore.split_mongo import CourseEnvelope
-from xmodule.modulestore.split_mongo.mongo_connection import DuplicateKeyError, DjangoFlexPersistenceBackend
+from xmodule.modulestore.split_mongo.mongo_connection import (
+    DjangoFlexPersistenceBackend,
+    DuplicateKeyError,
+    course_summary_info,
+)
+from xmodule.modulestore.split_mongo.structure_diff import diff_structures
+from xmodule.modulestore.split_mongo.structure_index import get_structure_index
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.partitions.partitions_service import PartitionService
 from xmodule.util.misc import get_library_or_course_attribute
@@ -132,6 +139,9 @@ log = logging.getLogger(__name__)
 # When blacklists are this, all children should be excluded
 EXCLUDE_ALL = '*'
 
+# Number of definitions to load at a time when matching blocks against content qualifiers
+DEFINITIONS_PAGE_SIZE = 1000
+
 
 class SplitBulkWriteRecord(BulkOpsRecord):  # lint-amnesty, pylint: disable=missing-class-docstring
     def __init__(self):
@@ -225,6 +235,23 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
             course_key.replace(branch=None, version_guid=None), ignore_case
         )
 
+    def send_bulk_published_signal(self, bulk_ops_record, course_id):
+        """
+        Sends out the signal that items have been published from within this course,
+        with the StructureDiff of the published branch over the bulk operation as
+        `structure_diff`.  The diff is only computed if a receiver accesses it.
+        """
+        if self.signal_handler and bulk_ops_record.has_publish_item:
+            from_version, to_version = (
+                (index or {}).get('versions', {}).get(ModuleStoreEnum.BranchName.published)
+                for index in (bulk_ops_record.initial_index, bulk_ops_record.index)
+            )
+            course_key = course_id.for_branch(None)
+            structure_diff = SimpleLazyObject(lambda: self.get_structure_diff(course_key, from_version, to_version))
+            # We remove the branch, because publishing always means copying from draft to published
+            self.signal_handler.send("course_published", course_key=course_key, structure_diff=structure_diff)
+            bulk_ops_record.has_publish_item = False
+
     def _clear_bulk_ops_record(self, course_key):
         """
         Clear the record for this course
@@ -980,39 +1007,94 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         Note, this is to find the current head of the named branch type.
         To get specific versions via guid use get_course.
 
+        The summaries are read from their materialized SplitModulestoreCourseSummary
+        entries, and only computed from the course blocks of the courses whose entries
+        are missing or out of date.  Optional `offset` and `limit` kwargs return a page
+        of the summaries, ordered by course id.
+
         :param branch: the branch for which to return courses.
         """
-        def extract_course_summary(course):
-            """
-            Extract course information from the course block for split.
-            """
-            return {
-                field: course.fields[field]
-                for field in CourseSummary.course_info_fields
-                if field in course.fields
-            }
+        offset = kwargs.get('offset', 0)
+        limit = kwargs.get('limit')
+        if branch not in DjangoFlexPersistenceBackend.SUMMARY_BRANCHES or any(self._active_records):
+            # Course indexes changed in active bulk operations aren't saved yet, so they can't be paged in the db.
+            courses_summaries = self._compute_course_summaries(branch, **kwargs)
+            if offset or limit is not None:
+                courses_summaries.sort(key=lambda course_summary: str(course_summary.id))
+                courses_summaries = courses_summaries[offset:None if limit is None else offset + limit]
+            return courses_summaries
+
+        course_infos = self.db_connection.find_course_summaries(
+            branch, org_target=kwargs.get('org'), course_keys=kwargs.get('course_keys'), offset=offset, limit=limit,
+        )
+        missing_indexes = [course_index for course_index, course_info in course_infos if course_info is None]
+        if missing_indexes:
+            computed_infos = self._compute_course_infos(branch, missing_indexes)
+            self.db_connection.save_course_summaries(branch, [
+                (course_index, computed_infos[course_index['_id']])
+                for course_index in missing_indexes
+                if course_index['_id'] in computed_infos
+            ])
+            # Courses whose structure can't be found are left out, as when computing all the summaries.
+            course_infos = [
+                (course_index, computed_infos.get(course_index['_id']) if course_info is None else course_info)
+                for course_index, course_info in course_infos
+            ]
+        return [
+            CourseSummary(self._create_course_locator(course_index, branch=None), **course_info)
+            for course_index, course_info in course_infos
+            if course_info is not None
+        ]
+
+    def _compute_course_infos(self, branch, course_indexes):
+        """
+        Returns the {course index id: course summary info} of the given course indexes,
+        computed from the course blocks of the heads of their given branch, leaving out
+        the courses whose head can't be found.
+        """
+        id_version_map = defaultdict(list)
+        for course_index in course_indexes:
+            id_version_map[course_index['versions'][branch]].append(course_index)
+
+        course_infos = {}
+        for entry in self.find_courselike_blocks_by_id(list(id_version_map), self.DEFAULT_ROOT_COURSE_BLOCK_TYPE):
+            course_info = course_summary_info(self._get_course_block_data(entry).fields)
+            for course_index in id_version_map[entry['_id']]:
+                course_infos[course_index['_id']] = course_info
+        return course_infos
 
+    def _compute_course_summaries(self, branch, **kwargs):
+        """
+        Returns the list of `CourseSummary` of the courses matching the given qualifiers,
+        computed from the course blocks of the heads of the given branch.
+        """
         courses_summaries = []
         for entry, structure_info in self._get_courselike_blocks_for_branch(branch, **kwargs):
             course_locator = self._create_course_locator(structure_info, branch=None)
-            course_block = [
-                block_data
-                for block_key, block_data in entry['blocks'].items()
-                if block_key.type == "course"
-            ]
-            if not course_block:
-                raise ItemNotFoundError
-
-            if len(course_block) > 1:
-                raise MultipleCourseBlocksFound(
-                    "Expected 1 course block to be found in the course, but found {}".format(len(course_block))
-                )
-            course_summary = extract_course_summary(course_block[0])
+            course_summary = course_summary_info(self._get_course_block_data(entry).fields)
             courses_summaries.append(
                 CourseSummary(course_locator, **course_summary)
             )
         return courses_summaries
 
+    def _get_course_block_data(self, entry):
+        """
+        Returns the BlockData of the only course block of the given structure entry.
+        """
+        course_block = [
+            block_data
+            for block_key, block_data in entry['blocks'].items()
+            if block_key.type == "course"
+        ]
+        if not course_block:
+            raise ItemNotFoundError
+
+        if len(course_block) > 1:
+            raise MultipleCourseBlocksFound(
+                "Expected 1 course block to be found in the course, but found {}".format(len(course_block))
+            )
+        return course_block[0]
+
     def get_library_keys(self):
         """
         Returns a list of all unique content library keys in the Split
@@ -1221,27 +1303,42 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         items = []
         qualifiers = qualifiers.copy() if qualifiers else {}  # copy the qualifiers (destructively manipulated here)
 
-        def _block_matches_all(block_data):
+        def _blocks_matching_all(blocks):
             """
-            Check that the block matches all the criteria
+            Returns the keys of the given (block key, block data) pairs whose
+            blocks match all the criteria, in the given order.
             """
             # do the checks which don't require loading any additional data
-            if (
-                self._block_matches(block_data, qualifiers) and
-                self._block_matches(block_data.fields, settings)
-            ):
-                if content:
-                    definition_block = self.get_definition(course_locator, block_data.definition)
-                    return self._block_matches(definition_block['fields'], content)
-                else:
-                    return True
+            candidates = [
+                (block_key, block_data) for block_key, block_data in blocks
+                if self._block_matches(block_data, qualifiers) and self._block_matches(block_data.fields, settings)
+            ]
+            if not content:
+                return [block_key for block_key, _ in candidates]
+
+            # load the definitions of the remaining candidates a page at a time
+            block_keys = []
+            for page_start in range(0, len(candidates), DEFINITIONS_PAGE_SIZE):
+                page = candidates[page_start:page_start + DEFINITIONS_PAGE_SIZE]
+                definitions = {
+                    definition['_id']: definition
+                    for definition in self.get_definitions(
+                        course_locator, [block_data.definition for _, block_data in page]
+                    )
+                }
+                block_keys.extend(
+                    block_key for block_key, block_data in page
+                    if block_data.definition in definitions and
+                    self._block_matches(definitions[block_data.definition]['fields'], content)
+                )
+            return block_keys
 
         if settings is None:
             settings = {}
         if 'name' in qualifiers:
             # odd case where we don't search just confirm
             block_name = qualifiers.pop('name')
-            block_ids = []
+            named_blocks = []
             for block_id, block in course.structure['blocks'].items():
                 # Don't do an in comparison blindly; first check to make sure
                 # that the name qualifier we're looking at isn't a plain string;
@@ -1253,10 +1350,10 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                     name_matches = block_id.id == block_name
                 else:
                     name_matches = block_id.id in block_name
-                if name_matches and _block_matches_all(block):
-                    block_ids.append(block_id)
+                if name_matches:
+                    named_blocks.append((block_id, block))
 
-            return self._load_items(course, block_ids, **kwargs)
+            return self._load_items(course, _blocks_matching_all(named_blocks), **kwargs)
 
         if 'category' in qualifiers:
             qualifiers['block_type'] = qualifiers.pop('category')
@@ -1268,21 +1365,21 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         # No need of these caches unless include_orphans is set to False
         path_cache = None
         parents_cache = None
+        structure_index = get_structure_index(course.structure)
 
-        if not include_orphans:
+        if not include_orphans and structure_index is None:
             path_cache = {}
             parents_cache = self.build_block_key_to_parents_mapping(course.structure)
 
-        for block_id, value in course.structure['blocks'].items():
-            if _block_matches_all(value):
-                if not include_orphans:
-                    if (
-                        block_id.type in DETACHED_XBLOCK_TYPES or
-                        self.has_path_to_root(block_id, course, path_cache, parents_cache)
-                    ):
-                        items.append(block_id)
-                else:
+        for block_id in _blocks_matching_all(course.structure['blocks'].items()):
+            if not include_orphans:
+                if block_id.type in DETACHED_XBLOCK_TYPES or (
+                    structure_index.has_path_to_root(block_id) if structure_index is not None
+                    else self.has_path_to_root(block_id, course, path_cache, parents_cache)
+                ):
                     items.append(block_id)
+            else:
+                items.append(block_id)
 
         if len(items) > 0:
             return self._load_items(course, items, depth=0, **kwargs)
@@ -1322,6 +1419,10 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         if path_cache and block_key in path_cache:
             return path_cache[block_key]
 
+        structure_index = get_structure_index(course.structure)
+        if parents_cache is None and structure_index is not None:
+            return structure_index.has_path_to_root(block_key)
+
         if parents_cache is None:
             xblock_parents = self._get_parents_from_structure(block_key, course.structure)
         else:
@@ -1388,13 +1489,20 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         detached_categories = [name for name, __ in XBlock.load_tagged_classes("detached")]
         course = self._lookup_course(course_key)
-        items = set(course.structure['blocks'].keys())
-        items.remove(course.structure['root'])
-        blocks = course.structure['blocks']
-        for block_id, block_data in blocks.items():
-            items.difference_update(BlockKey(*child) for child in block_data.fields.get('children', []))
-            if block_data.block_type in detached_categories:
-                items.discard(block_id)
+        structure_index = get_structure_index(course.structure)
+        if structure_index is not None:
+            items = {
+                block_id for block_id in structure_index.parentless() if block_id.type not in detached_categories
+            }
+            items.discard(course.structure['root'])
+        else:
+            items = set(course.structure['blocks'].keys())
+            items.remove(course.structure['root'])
+            blocks = course.structure['blocks']
+            for block_id, block_data in blocks.items():
+                items.difference_update(BlockKey(*child) for child in block_data.fields.get('children', []))
+                if block_data.block_type in detached_categories:
+                    items.discard(block_id)
         return [
             course_key.make_usage_key(block_type=block_id.type, block_id=block_id.id)
             for block_id in items
@@ -1447,6 +1555,15 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             'edited_on': course['edited_on']
         }
 
+    def get_structure_diff(self, course_key, from_version, to_version):
+        """
+        Returns the StructureDiff of the blocks between two versions of the structure
+        of the given course.  from_version may be None, for all blocks of to_version.
+        """
+        old_structure = self.get_structure(course_key, from_version) if from_version else None
+        new_structure = self.get_structure(course_key, to_version) if to_version else None
+        return diff_structures(old_structure, new_structure)
+
     def get_definition_history_info(self, definition_locator, course_context=None):
         """
         Because xblocks doesn't give a means to separate the definition's meta information from
@@ -2275,6 +2392,9 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         :param blacklist: a list of usage keys to not change in the destination: i.e., don't add
         if not there, don't update if there.
 
+        Returns the version of the destination branch before the copy, or None if the branch
+        didn't exist, and its new version.
+
         Raises:
             ItemNotFoundError: if it cannot find the course. if the request is to publish a
                 subtree but the ancestors up to and including the course root are not published.
@@ -2344,8 +2464,10 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 self._delete_if_true_orphan(orphan, destination_structure)
 
             # update the db
+            from_version = index_entry['versions'].get(destination_course.branch)
             self.update_structure(destination_course, destination_structure)
             self._update_head(destination_course, index_entry, destination_course.branch, destination_structure['_id'])
+            return from_version, destination_structure['_id']
 
     def copy_from_template(self, source_keys, dest_usage, user_id, head_validation=True):
         """
@@ -3070,6 +3192,9 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         Given a structure, find block_key's parent in that structure. Note returns
         the encoded format for parent
         """
+        structure_index = get_structure_index(structure)
+        if structure_index is not None:
+            return structure_index.parents(block_key)
         return [
             parent_block_key
             for parent_block_key, value in structure['blocks'].items()
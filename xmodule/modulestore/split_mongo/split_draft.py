@@ -1,6 +1,7 @@
 """
 Module for the dual-branch fall-back Draft->Published Versioning ModuleStore
 """
+from django.utils.functional import SimpleLazyObject
 from edx_django_utils.monitoring import function_trace
 from opaque_keys.edx.locator import CourseLocator, LibraryLocator, LibraryUsageLocator
 
@@ -372,7 +373,7 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         Publishes the subtree under location from the draft branch to the published branch
         Returns the newly published item.
         """
-        super().copy(
+        published_versions = super().copy(
             user_id,
             # Directly using the replace function rather than the for_branch function
             # because for_branch obliterates the version_guid and will lead to missed version conflicts.
@@ -385,10 +386,33 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
             blacklist=blacklist
         )
 
-        self._flag_publish_event(location.course_key)
+        self._flag_publish_event(location.course_key, published_versions)
 
         return self.get_item(location.for_branch(ModuleStoreEnum.BranchName.published), **kwargs)
 
+    def _flag_publish_event(self, course_key, published_versions=None):
+        """
+        Fires the course_published signal, unless we're nested in an active bulk operation,
+        at the end of which a publish will be signalled with the diff of the bulk operation.
+
+        Outside of bulk operations, the publish must pass the (from, to) versions of the
+        published branch that it wrote as published_versions, and the signal's structure_diff
+        is the diff between them.  The diff is only computed if a receiver accesses it.
+        """
+        if not self.signal_handler:
+            return
+        bulk_record = self._get_bulk_ops_record(course_key)
+        if bulk_record.active:
+            bulk_record.has_publish_item = True
+        elif published_versions is None:
+            super()._flag_publish_event(course_key)
+        else:
+            # We remove the branch, because publishing always means copying from draft to published
+            course_key = course_key.for_branch(None)
+            from_version, to_version = published_versions
+            structure_diff = SimpleLazyObject(lambda: self.get_structure_diff(course_key, from_version, to_version))
+            self.signal_handler.send("course_published", course_key=course_key, structure_diff=structure_diff)
+
     def unpublish(self, location, user_id, **kwargs):
         """
         Deletes the published version of the item.
@@ -503,13 +527,14 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
             if commit:
                 # update published branch version only if publish and draft point to different versions
                 if versions['published-branch'] != versions['draft-branch']:
+                    published_versions = (versions['published-branch'], versions['draft-branch'])
                     self._update_head(
                         course_locator,
                         index_entry,
                         'published-branch',
                         index_entry['versions']['draft-branch']
                     )
-                    self._flag_publish_event(course_locator)
+                    self._flag_publish_event(course_locator, published_versions)
                     return self.get_course_index(course_locator)['versions']
         return versions
 
@@ -0,0 +1,113 @@
+"""
+Block-level differences between two versions of a split modulestore structure.
+"""
+
+
+from collections import defaultdict
+
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_index import get_structure_index
+
+
+class StructureDiff:
+    """
+    The blocks that differ between two versions of a structure, as sets of BlockKeys:
+
+        added: blocks only in the new version
+        removed: blocks only in the old version
+        moved: blocks in both versions whose parents differ
+        changed: blocks in both versions whose definition, fields (including their
+            children), defaults or asides differ
+    """
+    def __init__(self, from_version, to_version, added=(), removed=(), moved=(), changed=()):
+        self.from_version = from_version
+        self.to_version = to_version
+        self.added = set(added)
+        self.removed = set(removed)
+        self.moved = set(moved)
+        self.changed = set(changed)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.moved or self.changed)
+
+    def __repr__(self):
+        return (
+            f'StructureDiff({self.from_version} -> {self.to_version}: {len(self.added)} added, '
+            f'{len(self.removed)} removed, {len(self.moved)} moved, {len(self.changed)} changed)'
+        )
+
+    def to_dict(self, course_key):
+        """
+        Returns the diff as a JSON-serializable dict, with the blocks as the
+        sorted strings of their usage keys in the given course.
+        """
+        def usage_keys(block_keys):
+            return sorted(str(course_key.make_usage_key(block_key.type, block_key.id)) for block_key in block_keys)
+
+        return {
+            'from_version': str(self.from_version) if self.from_version else None,
+            'to_version': str(self.to_version) if self.to_version else None,
+            'added': usage_keys(self.added),
+            'removed': usage_keys(self.removed),
+            'moved': usage_keys(self.moved),
+            'changed': usage_keys(self.changed),
+        }
+
+
+def diff_structures(old_structure, new_structure):
+    """
+    Returns the StructureDiff between two structures.  Either structure can
+    be None, for a version of a course that didn't exist.
+    """
+    old_blocks = old_structure['blocks'] if old_structure else {}
+    new_blocks = new_structure['blocks'] if new_structure else {}
+    old_block_keys = set(old_blocks)
+    new_block_keys = set(new_blocks)
+    common_block_keys = old_block_keys & new_block_keys
+
+    old_parents = _parents_getter(old_structure)
+    new_parents = _parents_getter(new_structure)
+    return StructureDiff(
+        old_structure['_id'] if old_structure else None,
+        new_structure['_id'] if new_structure else None,
+        added=new_block_keys - old_block_keys,
+        removed=old_block_keys - new_block_keys,
+        moved=(
+            block_key for block_key in common_block_keys
+            if set(old_parents(block_key)) != set(new_parents(block_key))
+        ),
+        changed=(
+            block_key for block_key in common_block_keys
+            if _block_changed(old_blocks[block_key], new_blocks[block_key])
+        ),
+    )
+
+
+def _block_changed(old_block, new_block):
+    """
+    Returns whether the content of the given BlockData differs.
+    """
+    if old_block is new_block:
+        return False
+    return (
+        old_block.definition != new_block.definition or
+        old_block.fields != new_block.fields or
+        old_block.defaults != new_block.defaults or
+        old_block.asides != new_block.asides
+    )
+
+
+def _parents_getter(structure):
+    """
+    Returns a function that returns the parents of a block in the given structure.
+    """
+    if structure is None:
+        return lambda block_key: []
+    structure_index = get_structure_index(structure)
+    if structure_index is not None:
+        return structure_index.parents
+    parents = defaultdict(list)
+    for block_key, block in structure['blocks'].items():
+        for child in block.fields.get('children', []):
+            parents[BlockKey(*child)].append(block_key)
+    return lambda block_key: parents.get(block_key, [])
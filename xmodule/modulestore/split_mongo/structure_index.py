@@ -0,0 +1,148 @@
+"""
+Parent pointers and reachability of the blocks of split modulestore structures.
+
+Split structures only store the children of each block, so finding the
+parents of a block, or whether it can be reached from the course root,
+takes a scan of the whole structure.  Since a structure stored under a
+given id never changes, these are computed once when the structure is
+cached (see structure_to_cache), and stored alongside its blocks.
+"""
+
+
+from array import array
+
+from lazy import lazy
+
+from xmodule.modulestore.split_mongo import BlockKey
+
+# Types of the blocks that are roots of their structures when they have no parents.
+ROOT_BLOCK_TYPES = ('course', 'library')
+
+
+def index_structure_blocks(block_keys, children):
+    """
+    Computes the index of the blocks of a structure, given the list of the
+    structure's BlockKeys and the list of each block's children, in order.
+
+    Returns a dict of:
+        parent_offsets, parent_indices: an adjacency list of the indices of each block's parents
+        dangling_parents: a {BlockKey: [parent index]} dict of the children that aren't
+            blocks of the structure
+        reachable: a bytearray of whether each block can be reached from a root block
+    """
+    indices = {block_key: index for index, block_key in enumerate(block_keys)}
+    parents = [[] for _ in block_keys]
+    child_indices = [[] for _ in block_keys]
+    dangling_parents = {}
+    for index, block_children in enumerate(children):
+        for child in block_children:
+            child_index = indices.get(child)
+            if child_index is None:
+                child_parents = dangling_parents.setdefault(BlockKey(*child), [])
+            else:
+                child_parents = parents[child_index]
+            # A child listed more than once still has its parent listed once.
+            if child_parents and child_parents[-1] == index:
+                continue
+            child_parents.append(index)
+            if child_index is not None:
+                child_indices[index].append(child_index)
+
+    reachable = bytearray(len(block_keys))
+    pending = [
+        index for index, block_key in enumerate(block_keys)
+        if not parents[index] and block_key.type in ROOT_BLOCK_TYPES
+    ]
+    for index in pending:
+        reachable[index] = 1
+    while pending:
+        for child_index in child_indices[pending.pop()]:
+            if not reachable[child_index]:
+                reachable[child_index] = 1
+                pending.append(child_index)
+
+    parent_offsets = array('l', [0])
+    parent_indices = array('l')
+    for block_parents in parents:
+        parent_indices.extend(block_parents)
+        parent_offsets.append(len(parent_indices))
+
+    return {
+        'parent_offsets': parent_offsets,
+        'parent_indices': parent_indices,
+        'dangling_parents': dangling_parents,
+        'reachable': reachable,
+    }
+
+
+class StructureIndex:
+    """
+    Parent and reachability lookups in the blocks of an unmodified structure,
+    from the index computed by index_structure_blocks.
+    """
+    def __init__(self, block_types, block_ids, parent_offsets, parent_indices, dangling_parents, reachable):
+        self._block_types = block_types
+        self._block_ids = block_ids
+        # The parents of block i are parent_indices[parent_offsets[i]:parent_offsets[i + 1]]
+        self._parent_offsets = parent_offsets
+        self._parent_indices = parent_indices
+        self._dangling_parents = dangling_parents
+        self._reachable = reachable
+
+    @lazy
+    def _indices(self):
+        """
+        The {(block_type, block_id): index} map of the blocks.
+        """
+        return dict(zip(zip(self._block_types, self._block_ids), range(len(self._block_ids))))
+
+    def _block_key(self, index):
+        return BlockKey(self._block_types[index], self._block_ids[index])
+
+    def _parent_indices_of(self, block_key):
+        index = self._indices.get(block_key)
+        if index is None:
+            return self._dangling_parents.get(block_key, ())
+        return self._parent_indices[self._parent_offsets[index]:self._parent_offsets[index + 1]]
+
+    def parents(self, block_key):
+        """
+        Returns the BlockKeys of the blocks that have the given block as a child,
+        in the order of the structure's blocks.
+        """
+        return [self._block_key(parent) for parent in self._parent_indices_of(block_key)]
+
+    def parent(self, block_key):
+        """
+        Returns the BlockKey of the last parent of the given block, or None.
+        """
+        parents = self._parent_indices_of(block_key)
+        return self._block_key(parents[-1]) if parents else None
+
+    def has_path_to_root(self, block_key):
+        """
+        Returns whether the given block can be reached from the structure's root,
+        with the same result as SplitMongoModuleStore.has_path_to_root.
+        """
+        index = self._indices.get(block_key)
+        if index is not None:
+            return bool(self._reachable[index])
+        parents = self._dangling_parents.get(block_key)
+        if not parents:
+            return block_key.type in ROOT_BLOCK_TYPES
+        return any(self._reachable[parent] for parent in parents)
+
+    def parentless(self):
+        """
+        Returns the BlockKeys of the blocks that have no parents.
+        """
+        offsets = self._parent_offsets
+        return [self._block_key(index) for index in range(len(self._block_ids)) if offsets[index] == offsets[index + 1]]
+
+
+def get_structure_index(structure):
+    """
+    Returns the StructureIndex of the given structure, or None if the structure
+    wasn't loaded from its cached format or has been modified since.
+    """
+    return getattr(structure['blocks'], 'index', None)
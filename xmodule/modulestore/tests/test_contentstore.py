@@ -3,9 +3,12 @@
 """
 
 
+import io
+import json
 import logging
 import mimetypes
 import shutil
+import tarfile
 import unittest
 from tempfile import mkdtemp
 from uuid import uuid4
@@ -147,6 +150,31 @@ class TestContentstore(unittest.TestCase):
         finally:
             shutil.rmtree(root_dir)
 
+    @ddt.data(True, False)
+    def test_export_for_course_to_tarball(self, deprecated):
+        """
+        Test export into an archive matches the export to a directory
+        """
+        self.set_up_assets(deprecated)
+        root_dir = path.Path(mkdtemp())
+        archive = io.BytesIO()
+        try:
+            self.contentstore.export_all_for_course(
+                self.course1_key, root_dir,
+                path.Path(root_dir / "policy.json"),
+            )
+            with tarfile.open(fileobj=archive, mode='w:gz') as tar_file:
+                policy = self.contentstore.export_all_for_course_to_tarball(self.course1_key, tar_file, 'static')
+
+            archive.seek(0)
+            with tarfile.open(fileobj=archive, mode='r:gz') as tar_file:
+                assert sorted(tar_file.getnames()) == sorted(f'static/{filename}' for filename in self.course1_files)
+                for filename in self.course1_files:
+                    assert tar_file.extractfile(f'static/{filename}').read() == (root_dir / filename).bytes()
+            assert policy == json.loads((root_dir / "policy.json").text())
+        finally:
+            shutil.rmtree(root_dir)
+
     @ddt.data(True, False)
     def test_get_all_content(self, deprecated):
         """
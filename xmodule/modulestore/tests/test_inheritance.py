@@ -12,7 +12,7 @@ from xblock.core import XBlock
 from xblock.fields import ScopeIds
 from xblock.test.tools import TestRuntime
 
-from xmodule.modulestore.inheritance import InheritanceMixin
+from xmodule.modulestore.inheritance import InheritanceMixin, InheritanceTable
 
 
 class TestXBlock(XBlock):
@@ -65,3 +65,62 @@ class TestInheritanceMixin(unittest.TestCase):
         """
         self.add_submission_deadline_information(due_date, graceperiod, self_paced)
         assert is_past_deadline == self.xblock.has_deadline_passed()
+
+
+class TestInheritanceTable(unittest.TestCase):
+    """
+    Tests of the InheritanceTable.
+    """
+
+    def setUp(self):
+        super().setUp()
+        # course -> chapter -> sequential -> (vertical1, vertical2)
+        self.parents = {
+            'chapter': 'course',
+            'sequential': 'chapter',
+            'vertical1': 'sequential',
+            'vertical2': 'sequential',
+        }
+        self.settings = {
+            'course': {'start': '2030-01-01T00:00:00Z', 'graded': False},
+            'sequential': {'graded': True, 'due': '2030-02-01T00:00:00Z'},
+            'vertical2': {'due': '2030-03-01T00:00:00Z'},
+        }
+        self.parent_calls = []
+        self.table = InheritanceTable(self.get_parent_key, lambda key: self.settings.get(key, {}))
+
+    def get_parent_key(self, key):
+        self.parent_calls.append(key)
+        return self.parents.get(key)
+
+    def test_inherited_settings(self):
+        assert self.table.inherited_settings('course') == {}
+        assert self.table.inherited_settings('chapter') == {'start': '2030-01-01T00:00:00Z', 'graded': False}
+        assert self.table.inherited_settings('vertical1') == {
+            'start': '2030-01-01T00:00:00Z', 'graded': True, 'due': '2030-02-01T00:00:00Z',
+        }
+        # A block's own settings aren't inherited by itself.
+        assert self.table.inherited_settings('vertical2') == self.table.inherited_settings('vertical1')
+
+    def test_computed_once(self):
+        self.table.inherited_settings('vertical1')
+        self.parent_calls.clear()
+        self.table.inherited_settings('vertical2')
+        self.table.inherited_settings('vertical1')
+        assert self.parent_calls == ['vertical2', 'vertical1']
+        # Blocks that set nothing share their parent's settings.
+        assert self.table.inherited_settings('sequential') is self.table.inherited_settings('chapter')
+
+    def test_local_changes(self):
+        assert self.table.inherited_settings('vertical1')['due'] == '2030-02-01T00:00:00Z'
+        self.table.set_local('chapter', 'due', '2030-04-01T00:00:00Z')
+        self.table.delete_local('sequential', 'due')
+        assert self.table.inherited_settings('vertical1')['due'] == '2030-04-01T00:00:00Z'
+        self.table.delete_local('chapter', 'due')
+        assert 'due' not in self.table.inherited_settings('vertical1')
+        # The tree's settings are left untouched.
+        assert self.settings['sequential'] == {'graded': True, 'due': '2030-02-01T00:00:00Z'}
+
+    def test_parent_cycle(self):
+        self.parents['course'] = 'vertical1'
+        assert self.table.inherited_settings('vertical1')['graded'] is True
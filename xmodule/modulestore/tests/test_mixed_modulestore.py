@@ -12,7 +12,7 @@ from contextlib import contextmanager
 from shutil import rmtree
 from tempfile import mkdtemp
 from uuid import uuid4
-from unittest.mock import Mock, call, patch
+from unittest.mock import ANY, Mock, call, patch
 
 import ddt
 from openedx_events.content_authoring.data import CourseData, XBlockData
@@ -53,6 +53,7 @@ from xmodule.modulestore.exceptions import (
 from xmodule.modulestore.inheritance import InheritanceMixin
 from xmodule.modulestore.mixed import MixedModuleStore
 from xmodule.modulestore.search import navigation_index, path_to_location
+from xmodule.modulestore.split_mongo import BlockKey
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.modulestore.tests.factories import check_exact_number_of_calls, check_mongo_calls
@@ -2553,7 +2554,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
 
                 # Course creation and publication should fire the signal
                 course = self.store.create_course('org_x', 'course_y', 'run_z', self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
                 signal_handler.reset_mock()
 
                 course_key = course.id
@@ -2563,7 +2564,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
                     Check if the signal has been fired.
                     The course_published signal fires before the _clear_bulk_ops_record.
                     """
-                    signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                    signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
 
                 with patch.object(
                     self.store.thread_cache.default_store, '_clear_bulk_ops_record', wraps=_clear_bulk_ops_record
@@ -2577,7 +2578,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
 
                     assert mock_clear_bulk_ops_record.call_count == 1
 
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
 
     @ddt.data(ModuleStoreEnum.Type.split)
     def test_course_publish_signal_direct_firing(self, default):
@@ -2599,7 +2600,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
 
                 # Course creation and publication should fire the signal
                 course = self.store.create_course('org_x', 'course_y', 'run_z', self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
 
                 course_key = course.id
 
@@ -2609,16 +2610,16 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
                     log.debug('Testing with block type %s', block_type)
                     signal_handler.reset_mock()
                     block = self.store.create_item(self.user_id, course_key, block_type)
-                    signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                    signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
 
                     signal_handler.reset_mock()
                     block.display_name = block_type
                     self.store.update_item(block, self.user_id)
-                    signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                    signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
 
                     signal_handler.reset_mock()
                     self.store.publish(block.location, self.user_id)
-                    signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                    signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
 
     @ddt.data(ModuleStoreEnum.Type.split)
     def test_course_publish_signal_rerun_firing(self, default):
@@ -2640,7 +2641,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
 
                 # Course creation and publication should fire the signal
                 course = self.store.create_course('org_x', 'course_y', 'run_z', self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
 
                 course_key = course.id
 
@@ -2648,7 +2649,9 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
                 signal_handler.reset_mock()
                 dest_course_id = self.store.make_course_key("org.other", "course.other", "run.other")
                 self.store.clone_course(course_key, dest_course_id, self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=dest_course_id)
+                signal_handler.send.assert_called_with(
+                    'course_published', course_key=dest_course_id, structure_diff=ANY
+                )
 
     @ddt.data(ModuleStoreEnum.Type.split)
     def test_course_publish_signal_import_firing(self, default):
@@ -2676,11 +2679,12 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
                     static_content_store=contentstore,
                     create_if_not_present=True,
                 )
+                course_key = self.store.make_course_key('edX', 'toy', '2012_Fall')
                 signal_handler.send.assert_has_calls([
-                    call('pre_publish', course_key=self.store.make_course_key('edX', 'toy', '2012_Fall')),
-                    call('course_published', course_key=self.store.make_course_key('edX', 'toy', '2012_Fall')),
-                    call('pre_publish', course_key=self.store.make_course_key('edX', 'toy', '2012_Fall')),
-                    call('course_published', course_key=self.store.make_course_key('edX', 'toy', '2012_Fall')),
+                    call('pre_publish', course_key=course_key),
+                    call('course_published', course_key=course_key, structure_diff=ANY),
+                    call('pre_publish', course_key=course_key),
+                    call('course_published', course_key=course_key, structure_diff=ANY),
                 ])
 
     @ddt.data(ModuleStoreEnum.Type.split)
@@ -2703,18 +2707,18 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
 
                 # Course creation and publication should fire the signal
                 course = self.store.create_course('org_x', 'course_y', 'run_z', self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
 
                 # Test a draftable block type, which needs to be explicitly published, and nest it within the
                 # normal structure - this is important because some implementors change the parent when adding a
                 # non-published child; if parent is in DIRECT_ONLY_CATEGORIES then this should not fire the event
                 signal_handler.reset_mock()
                 section = self.store.create_item(self.user_id, course.id, 'chapter')
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
 
                 signal_handler.reset_mock()
                 subsection = self.store.create_child(self.user_id, section.location, 'sequential')
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
 
                 # 'units' and 'blocks' are draftable types
                 signal_handler.reset_mock()
@@ -2729,15 +2733,70 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
 
                 signal_handler.reset_mock()
                 self.store.publish(unit.location, self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
 
                 signal_handler.reset_mock()
                 self.store.unpublish(unit.location, self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
 
                 signal_handler.reset_mock()
                 self.store.delete_item(unit.location, self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
+
+    @ddt.data(ModuleStoreEnum.Type.split)
+    def test_course_publish_signal_structure_diff(self, default):
+        with MongoContentstoreBuilder().build() as contentstore:
+            signal_handler = Mock(name='signal_handler')
+            self.store = MixedModuleStore(
+                contentstore=contentstore,
+                create_modulestore_instance=create_modulestore_instance,
+                mappings={},
+                signal_handler=signal_handler,
+                **self.OPTIONS
+            )
+            self.addCleanup(self.store.close_all_connections)
+
+            def published_diff():
+                """
+                Returns the structure_diff of the last course_published signal.
+                """
+                return signal_handler.send.call_args[1]['structure_diff']
+
+            with self.store.default_store(default):
+                course = self.store.create_course('org_x', 'course_y', 'run_z', self.user_id)
+                section = self.store.create_item(self.user_id, course.id, 'chapter')
+                subsection = self.store.create_child(self.user_id, section.location, 'sequential')
+                assert published_diff().added == {BlockKey.from_usage_key(subsection.location)}
+                assert published_diff().changed == {BlockKey.from_usage_key(section.location)}
+
+                unit = self.store.create_child(self.user_id, subsection.location, 'vertical')
+                block = self.store.create_child(self.user_id, unit.location, 'problem')
+                self.store.publish(unit.location, self.user_id)
+                diff = published_diff()
+                assert diff.added == {BlockKey.from_usage_key(unit.location), BlockKey.from_usage_key(block.location)}
+                assert diff.changed == {BlockKey.from_usage_key(subsection.location)}
+                assert not diff.removed
+                assert not diff.moved
+
+                block.display_name = 'Changed'
+                self.store.update_item(block, self.user_id)
+                with self.store.bulk_operations(course.id):
+                    self.store.publish(unit.location, self.user_id)
+                diff = published_diff()
+                assert diff.changed == {BlockKey.from_usage_key(block.location)}
+                assert not diff.added
+                assert diff.to_dict(course.id)['changed'] == [
+                    str(course.id.make_usage_key(block.location.block_type, block.location.block_id))
+                ]
+
+                # a diff evaluated after a later publish is still the diff of its own publish
+                block.display_name = 'Changed again'
+                self.store.update_item(block, self.user_id)
+                self.store.publish(unit.location, self.user_id)
+                deferred_diff = published_diff()
+                self.store.create_child(self.user_id, section.location, 'sequential')
+                assert deferred_diff.changed == {BlockKey.from_usage_key(block.location)}
+                assert not deferred_diff.added
 
     @ddt.data(ModuleStoreEnum.Type.split)
     def test_bulk_course_publish_signal_direct_firing(self, default):
@@ -2759,7 +2818,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
 
                 # Course creation and publication should fire the signal
                 course = self.store.create_course('org_x', 'course_y', 'run_z', self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
 
                 course_key = course.id
 
@@ -2779,7 +2838,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
                         self.store.publish(block.location, self.user_id)
                         signal_handler.send.assert_not_called()
 
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
 
     @ddt.data(ModuleStoreEnum.Type.split)
     def test_bulk_course_publish_signal_publish_firing(self, default):
@@ -2801,7 +2860,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
 
                 # Course creation and publication should fire the signal
                 course = self.store.create_course('org_x', 'course_y', 'run_z', self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
 
                 course_key = course.id
 
@@ -2829,7 +2888,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
                     self.store.publish(unit.location, self.user_id)
                     signal_handler.send.assert_not_called()
 
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
 
                 # Test editing draftable block type without publish
                 signal_handler.reset_mock()
@@ -2840,7 +2899,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
                     signal_handler.send.assert_not_called()
                     self.store.publish(unit.location, self.user_id)
                     signal_handler.send.assert_not_called()
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                signal_handler.send.assert_called_with('course_published', course_key=course.id, structure_diff=ANY)
 
                 signal_handler.reset_mock()
                 with self.store.bulk_operations(course_key):
@@ -3,11 +3,14 @@
 """
 
 
+import copy
 import datetime
 import os
+import pickle
 import random
 import re
 import unittest
+import zlib
 from importlib import import_module
 from unittest.mock import patch
 
@@ -15,6 +18,7 @@ import pytest
 import ddt
 from ccx_keys.locator import CCXBlockUsageLocator
 from django.core.cache import InvalidCacheBackendError, caches
+from django.test import override_settings
 from opaque_keys.edx.locator import BlockUsageLocator, CourseKey, CourseLocator, LocalId
 from testfixtures import LogCapture
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict
@@ -24,7 +28,7 @@ from openedx.core.lib import tempdir
 from openedx.core.lib.tests import attr
 from xmodule.course_block import CourseBlock
 from xmodule.fields import Date, Timedelta
-from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore import BlockData, ModuleStoreEnum
 from xmodule.modulestore.edit_info import EditInfoMixin
 from xmodule.modulestore.exceptions import (
     DuplicateCourseError,
@@ -34,8 +38,14 @@ from xmodule.modulestore.exceptions import (
     VersionConflictError
 )
 from xmodule.modulestore.inheritance import InheritanceMixin
-from xmodule.modulestore.split_mongo import BlockKey
-from xmodule.modulestore.split_mongo.mongo_connection import CourseStructureCache
+from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
+from xmodule.modulestore.split_mongo.mongo_connection import (
+    CachedStructureBlocks,
+    CourseStructureCache,
+    structure_from_cache,
+    structure_to_cache
+)
+from xmodule.modulestore.split_mongo.structure_index import get_structure_index
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_HOST, MONGO_PORT_NUM
@@ -807,7 +817,7 @@ class TestCourseStructureCache(CacheIsolationMixin, SplitModuleTest):
         assert cached_structure == not_cached_structure
 
         # If data is corrupted, get it from mongo again.
-        cache_key = self.new_course.id.version_guid
+        cache_key = CourseStructureCache.versioned_key(self.new_course.id.version_guid)
         enabled_cache.set(cache_key, b"bad_data")
         with check_mongo_calls(1):
             not_corrupt_structure = self._get_structure(self.new_course)
@@ -830,6 +840,119 @@ class TestCourseStructureCache(CacheIsolationMixin, SplitModuleTest):
         # now make sure that you get the same structure
         assert cached_structure == not_cached_structure
 
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_cache_legacy_format(self, mock_get_cache):
+        enabled_cache = caches['default']
+        mock_get_cache.return_value = enabled_cache
+
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # Structures cached in the unversioned pickle format are still read, and upgraded
+        version_guid = self.new_course.id.version_guid
+        enabled_cache.delete(CourseStructureCache.versioned_key(version_guid))
+        enabled_cache.set(version_guid, zlib.compress(pickle.dumps(not_cached_structure, 4), 1))
+        with check_mongo_calls(0):
+            legacy_structure = self._get_structure(self.new_course)
+        assert legacy_structure == not_cached_structure
+        assert enabled_cache.get(CourseStructureCache.versioned_key(version_guid)) is not None
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_cache_loads_blocks_lazily(self, mock_get_cache):
+        mock_get_cache.return_value = caches['default']
+        not_cached_structure = self._get_structure(self.new_course)
+        cached_structure = self._get_structure(self.new_course)
+
+        blocks = cached_structure['blocks']
+        root = cached_structure['root']
+        assert isinstance(blocks, CachedStructureBlocks)
+        assert set(blocks) == set(not_cached_structure['blocks'])
+        assert all(isinstance(block_key, BlockKey) for block_key in blocks)
+        assert blocks[root] == not_cached_structure['blocks'][root]
+
+        # Only the accessed block was built
+        loaded_blocks = blocks._blocks  # pylint: disable=protected-access
+        assert [block_key for block_key, value in loaded_blocks.items() if not isinstance(value, int)] == [root]
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_cache_previous_format(self, mock_get_cache):
+        enabled_cache = caches['default']
+        mock_get_cache.return_value = enabled_cache
+
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # Structures cached without their index are still read, and upgraded
+        version_guid = self.new_course.id.version_guid
+        cached_structure = structure_to_cache(not_cached_structure)
+        for name in ('parent_offsets', 'parent_indices', 'dangling_parents', 'reachable'):
+            del cached_structure[name]
+        enabled_cache.delete(CourseStructureCache.versioned_key(version_guid))
+        enabled_cache.set(f'v2.{version_guid}', zlib.compress(pickle.dumps(cached_structure, 4), 1))
+        with check_mongo_calls(0):
+            previous_structure = self._get_structure(self.new_course)
+        assert previous_structure == not_cached_structure
+        assert get_structure_index(previous_structure) is not None
+        assert enabled_cache.get(CourseStructureCache.versioned_key(version_guid)) is not None
+
+    def test_structure_index(self):
+        course = BlockKey('course', 'course')
+        chapter = BlockKey('chapter', 'chapter')
+        sequential = BlockKey('sequential', 'sequential')
+        orphan = BlockKey('vertical', 'orphan')
+        orphan_child = BlockKey('html', 'orphan_child')
+        missing = BlockKey('html', 'missing')
+        children = {
+            course: [chapter],
+            chapter: [sequential, sequential],
+            sequential: [missing],
+            orphan: [orphan_child, missing],
+            orphan_child: [],
+        }
+        structure = {
+            'root': course,
+            'blocks': {
+                block_key: BlockData(block_type=block_key.type, fields={'children': block_children})
+                for block_key, block_children in children.items()
+            },
+        }
+        cached_structure = structure_from_cache(structure_to_cache(structure))
+        structure_index = get_structure_index(cached_structure)
+
+        # The index gives the same results as scanning the structure
+        store = modulestore()
+        for block_key in list(children) + [missing, BlockKey('html', 'unknown')]:
+            assert structure_index.parents(block_key) == store._get_parents_from_structure(  # pylint: disable=protected-access
+                block_key, structure,
+            )
+            assert structure_index.has_path_to_root(block_key) == store.has_path_to_root(
+                block_key, CourseEnvelope(None, structure),
+            )
+        assert structure_index.parent(missing) == orphan
+        assert set(structure_index.parentless()) == {course, orphan}
+
+        # Copies and modified structures aren't indexed
+        assert get_structure_index(copy.deepcopy(cached_structure)) is None
+        assert get_structure_index(cached_structure) is structure_index
+        cached_structure['blocks'][orphan_child] = BlockData(block_type='html')
+        assert get_structure_index(cached_structure) is None
+
+    @override_settings(SPLIT_MODULESTORE_PROCESS_CACHE_MAX_BYTES=10 * 1024 * 1024)
+    def test_process_cache(self):
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # The dummy course structure cache doesn't cache anything, but the process cache does
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+        assert cached_structure == not_cached_structure
+
+        # Each read returns a copy of the cached structure
+        root = cached_structure['root']
+        cached_structure['blocks'][root].fields['display_name'] = 'Changed'
+        with check_mongo_calls(0):
+            assert self._get_structure(self.new_course) == not_cached_structure
+
     def test_dummy_cache(self):
         with check_mongo_calls(1):
             not_cached_structure = self._get_structure(self.new_course)
@@ -851,14 +974,14 @@ class TestCourseStructureCache(CacheIsolationMixin, SplitModuleTest):
 
         course_cache = CourseStructureCache()
 
-        size = 300000000
-        # this data_chunk will be compressed before being cached
-        data_chunk = b'\x00' * size
+        size = 2 * 1024 * 1024
+        # this structure will be compressed before being cached, and random data doesn't compress
+        structure = self._structure_with_data(os.urandom(size))
 
         logger_name = 'xmodule.modulestore.split_mongo.mongo_connection'
-        expected_message = 'Data caching (course structure) failed on chunk size: 1.25 MB'
+        expected_message = 'Data caching (course structure) failed on chunk size: 2.0 MB'
         with LogCapture(logger_name) as capture:
-            course_cache.set('my_data_chunk', data_chunk)
+            course_cache.set('my_data_chunk', structure)
 
         self.assertEqual(capture.records[0].name, logger_name)
         self.assertEqual(capture.records[0].msg, expected_message)
@@ -870,15 +993,22 @@ class TestCourseStructureCache(CacheIsolationMixin, SplitModuleTest):
         mock_get_cache.return_value = enabled_cache
         course_cache = CourseStructureCache()
         size = 30000
-        data_chunk = b'\x00' * size
+        structure = self._structure_with_data(b'\x00' * size)
 
         logger_name = 'xmodule.modulestore.split_mongo.mongo_connection'
         with LogCapture(logger_name) as capture:
-            course_cache.set('my_data_chunk', data_chunk)
+            course_cache.set('my_data_chunk', structure)
 
         # data chunk was less than 1MB so no logs were added.
         self.assertEqual(len(capture.records), 0)
 
+    def _structure_with_data(self, data):
+        """
+        Helper function to create a structure with a single block containing the given data.
+        """
+        root = BlockKey('course', 'course')
+        return {'root': root, 'blocks': {root: BlockData(block_type='course', fields={'data': data})}}
+
     def _get_structure(self, course):
         """
         Helper function to get a structure from a course.
@@ -1077,6 +1207,33 @@ class SplitModuleItemTests(SplitModuleTest):
         matches = modulestore().get_items(locator, settings={'group_access': {'$exists': False}})
         assert len(matches) == 7
 
+    def test_get_items_content_qualifiers(self):
+        '''
+        get_items(locator, content=...) loads the candidates' definitions in pages
+        '''
+        store = modulestore()
+        locator = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+        content = {'data': {'$exists': True}}
+        blocks = store._lookup_course(locator).structure['blocks']  # pylint: disable=protected-access
+        expected = {
+            block_key for block_key, block_data in blocks.items()
+            if store._block_matches(  # pylint: disable=protected-access
+                store.get_definition(locator, block_data.definition)['fields'], content
+            )
+        }
+
+        with patch.object(
+            store.db_connection, 'get_definitions', wraps=store.db_connection.get_definitions
+        ) as mock_get_definitions:
+            with patch('xmodule.modulestore.split_mongo.split.DEFINITIONS_PAGE_SIZE', 3):
+                with patch.object(store.db_connection, 'get_definition') as mock_get_definition:
+                    matches = store.get_items(locator, content=content)
+
+        assert {BlockKey.from_usage_key(match.location) for match in matches} == expected
+        # the 8 blocks of the course are matched in pages of 3
+        assert mock_get_definitions.call_count == 3
+        assert not mock_get_definition.called
+
     def test_get_parents(self):
         '''
         get_parent_location(locator): BlockUsageLocator
@@ -0,0 +1,79 @@
+""" Test the process-wide cache of split modulestore structures and definitions """
+
+
+import unittest
+from array import array
+
+from django.test import override_settings
+
+from xmodule.modulestore.split_mongo.process_cache import DEFINITION, STRUCTURE, SplitDocumentProcessCache
+
+
+@override_settings(SPLIT_MODULESTORE_PROCESS_CACHE_MAX_BYTES=100)
+class TestSplitDocumentProcessCache(unittest.TestCase):
+    """ Test the size accounting and eviction of SplitDocumentProcessCache """
+
+    def setUp(self):
+        super().setUp()
+        self.cache = SplitDocumentProcessCache()
+
+    def test_get_and_set(self):
+        assert self.cache.get(STRUCTURE, 'a') is None
+        self.cache.set(STRUCTURE, 'a', 'document', 10)
+        assert self.cache.get(STRUCTURE, 'a') == 'document'
+        assert self.cache.get(DEFINITION, 'a') is None
+
+        stats = self.cache.stats()
+        assert stats['size'] == 10
+        assert stats['hits'] == {STRUCTURE: 1}
+        assert stats['misses'] == {STRUCTURE: 1, DEFINITION: 1}
+
+    def test_evicts_least_recently_used(self):
+        self.cache.set(STRUCTURE, 'a', 'a', 40)
+        self.cache.set(STRUCTURE, 'b', 'b', 40)
+        assert self.cache.get(STRUCTURE, 'a') == 'a'
+        self.cache.set(STRUCTURE, 'c', 'c', 40)
+
+        assert self.cache.get(STRUCTURE, 'b') is None
+        assert self.cache.get(STRUCTURE, 'a') == 'a'
+        assert self.cache.get(STRUCTURE, 'c') == 'c'
+        assert self.cache.stats()['size'] == 80
+        assert self.cache.stats()['evictions'] == 1
+
+    def test_replaces_entry(self):
+        self.cache.set(STRUCTURE, 'a', 'old', 40)
+        self.cache.set(STRUCTURE, 'a', 'new', 30)
+        assert self.cache.get(STRUCTURE, 'a') == 'new'
+        assert self.cache.stats()['size'] == 30
+
+    def test_skips_documents_larger_than_cache(self):
+        self.cache.set(STRUCTURE, 'a', 'a', 40)
+        self.cache.set(STRUCTURE, 'b', 'b', 101)
+        assert self.cache.get(STRUCTURE, 'a') == 'a'
+        assert self.cache.get(STRUCTURE, 'b') is None
+
+    def test_definitions_are_copies(self):
+        self.cache.set_definition({'_id': 'a', 'fields': {'data': 'text'}})
+        definition = self.cache.get_definition('a')
+        definition['fields']['data'] = 'changed'
+        assert self.cache.get_definition('a') == {'_id': 'a', 'fields': {'data': 'text'}}
+
+    def test_structure_size(self):
+        self.cache.set_structure('a', {
+            'structure': {},
+            'block_types': ['course', 'chapter'],
+            'block_ids': ['course', 'ch1'],
+            'child_offsets': array('l', [0, 1, 1]),
+            'child_indices': array('l', [1]),
+            'blobs': [b'x' * 10, b'y' * 20],
+            'parent_offsets': array('l', [0, 0, 1]),
+            'parent_indices': array('l', [0]),
+            'dangling_parents': {},
+            'reachable': bytearray([1, 1]),
+        })
+        assert self.cache.stats()['size'] == 30 + 9 + 8 * array('l').itemsize + 2
+
+    @override_settings(SPLIT_MODULESTORE_PROCESS_CACHE_MAX_BYTES=0)
+    def test_disabled(self):
+        self.cache.set(STRUCTURE, 'a', 'a', 1)
+        assert self.cache.get(STRUCTURE, 'a') is None
@@ -6,11 +6,13 @@ Methods for exporting course data to XML
 import logging
 import os
 from abc import abstractmethod
-from json import dumps
+from concurrent.futures import ThreadPoolExecutor
+from json import dump, dumps
 
 import lxml.etree
 from fs.osfs import OSFS
 from opaque_keys.edx.locator import CourseLocator, LibraryLocator
+from path import Path as path
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict, Scope
 from openedx.core.djangoapps.content_tagging.api import (
     export_tags_in_csv_file,
@@ -109,7 +111,7 @@ class ExportManager:
     """
     Manages XML exporting for courselike objects.
     """
-    def __init__(self, modulestore, contentstore, courselike_key, root_dir, target_dir):
+    def __init__(self, modulestore, contentstore, courselike_key, root_dir, target_dir, export_static_assets=True):
         """
         Export all blocks from `modulestore` and content from `contentstore` as xml to `root_dir`.
 
@@ -118,12 +120,15 @@ class ExportManager:
         `courselike_key`: The Locator of the block to export
         `root_dir`: The directory to write the exported xml to
         `target_dir`: The name of the directory inside `root_dir` to write the content to
+        `export_static_assets`: Whether to export the static assets of `contentstore` and their policy,
+            which callers that export them separately turn off
         """
         self.modulestore = modulestore
         self.contentstore = contentstore
         self.courselike_key = courselike_key
         self.root_dir = root_dir
         self.target_dir = str(target_dir)
+        self.export_static_assets = export_static_assets
 
     @abstractmethod
     def get_key(self):
@@ -222,11 +227,12 @@ class CourseExportManager(ExportManager):
         # export the static assets
         policies_dir = export_fs.makedir('policies', recreate=True)
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                root_courselike_dir + '/static/',
-                root_courselike_dir + '/policies/assets.json',
-            )
+            if self.export_static_assets:
+                self.contentstore.export_all_for_course(
+                    self.courselike_key,
+                    root_courselike_dir + '/static/',
+                    root_courselike_dir + '/policies/assets.json',
+                )
 
             # If we are using the default course image, export it to the
             # legacy location to support backwards compatibility.
@@ -329,7 +335,7 @@ class LibraryExportManager(ExportManager):
         # export the static assets
         export_fs.makedir('policies', recreate=True)
 
-        if self.contentstore:
+        if self.contentstore and self.export_static_assets:
             self.contentstore.export_all_for_course(
                 self.courselike_key,
                 self.root_dir + '/' + self.target_dir + '/static/',
@@ -363,6 +369,39 @@ def export_library_to_xml(modulestore, contentstore, library_key, root_dir, libr
     LibraryExportManager(modulestore, contentstore, library_key, root_dir, library_dir).export()
 
 
+def export_to_tarball(export_manager_class, modulestore, contentstore, courselike_key, root_dir, target_dir, tar_file):
+    """
+    Export a course or library with the given ExportManager class into an open TarFile,
+    under `target_dir`.
+
+    The static assets are streamed from `contentstore` straight into the archive by a
+    separate thread, while the blocks are exported as xml to `root_dir`, so only the xml
+    is staged on disk before being added to the archive.
+    """
+    export_manager = export_manager_class(
+        modulestore, contentstore, courselike_key, root_dir, target_dir, export_static_assets=False,
+    )
+    target_dir = str(target_dir)
+    if contentstore:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assets_policy_future = executor.submit(
+                contentstore.export_all_for_course_to_tarball, courselike_key, tar_file, target_dir + '/static',
+            )
+            export_manager.export()
+            assets_policy = assets_policy_future.result()
+
+        policies_dir = path(root_dir) / target_dir / 'policies'
+        policies_dir.makedirs_p()
+        with open(policies_dir / 'assets.json', 'w') as assets_policy_file:
+            dump(assets_policy, assets_policy_file, sort_keys=True, indent=4)
+    else:
+        export_manager.export()
+
+    # Added after the static assets, so that files staged in the static directory,
+    # like the legacy course image, replace any asset at the same path when extracted.
+    tar_file.add(path(root_dir) / target_dir, arcname=target_dir)
+
+
 def adapt_references(subtree, destination_course_key, export_fs):
     """
     Map every reference in the subtree into destination_course_key and set it back into the xblock fields
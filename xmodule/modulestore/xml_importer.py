@@ -27,8 +27,12 @@ import mimetypes
 import os
 import re
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from time import time
 
 import xblock
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils.translation import gettext as _
 from lxml import etree
@@ -38,6 +42,7 @@ from path import Path as path
 from xblock.core import XBlockMixin
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict, Scope
 from xblock.runtime import DictKeyValueStore, KvsFieldData
+from edx_django_utils.monitoring import set_custom_attribute
 
 from common.djangoapps.util.monitoring import monitor_import_failure
 from xmodule.assetstore import AssetMetadata
@@ -117,11 +122,17 @@ class LocationMixin(XBlockMixin):
         )
 
 
-class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docstring
-    def __init__(self, static_content_store, course_data_path, target_id):
+class StaticContentImporter:
+    """
+    Imports the static files of a course into the static content store.
+
+    The files of a directory are uploaded by up to max_workers threads at a time.
+    """
+    def __init__(self, static_content_store, course_data_path, target_id, max_workers=1):
         self.static_content_store = static_content_store
         self.target_id = target_id
         self.course_data_path = course_data_path
+        self.max_workers = max_workers
         try:
             with open(course_data_path / 'policies/assets.json') as f:
                 self.policy = json.load(f)
@@ -138,6 +149,7 @@ class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docs
         remap_dict = {}
 
         static_dir = self.course_data_path / content_subdir
+        file_paths = []
         for dirname, _, filenames in os.walk(static_dir):
             for filename in filenames:
 
@@ -148,15 +160,24 @@ class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docs
                         log.debug('skipping static content %s...', file_path)
                     continue
 
-                if verbose:
-                    log.debug('importing static content %s...', file_path)
+                file_paths.append(file_path)
 
-                imported_file_attrs = self.import_static_file(file_path, base_dir=static_dir)
+        def import_file(file_path):
+            if verbose:
+                log.debug('importing static content %s...', file_path)
+            return self.import_static_file(file_path, base_dir=static_dir)
+
+        if self.max_workers > 1 and len(file_paths) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                imported_files_attrs = list(executor.map(import_file, file_paths))
+        else:
+            imported_files_attrs = [import_file(file_path) for file_path in file_paths]
 
-                if imported_file_attrs:
-                    # store the remapping information which will be needed
-                    # to subsitute in the module data
-                    remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
+        for imported_file_attrs in imported_files_attrs:
+            if imported_file_attrs:
+                # store the remapping information which will be needed
+                # to subsitute in the module data
+                remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
 
         return remap_dict
 
@@ -256,6 +277,13 @@ class ImportManager:
             create this file to implement custom logic in their course.
 
         default_class, load_error_blocks: are arguments for constructing the XMLModuleStore (see its doc)
+
+        static_content_workers: the number of static files to upload concurrently. Defaults to the
+            COURSE_IMPORT_STATIC_CONTENT_WORKERS setting.
+
+    The time taken by each phase of the import of each courselike is logged, reported as custom
+    monitoring attributes, and kept in `phase_timings` until the import of the next courselike starts.
+    The parse phase is shared by all courselikes.
     """
     store_class = XMLModuleStore
 
@@ -268,6 +296,7 @@ class ImportManager:
             create_if_not_present=False, raise_on_failure=False,
             static_content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR,
             python_lib_filename='python_lib.zip',
+            static_content_workers=None,
     ):
         self.store = store
         self.user_id = user_id
@@ -283,17 +312,48 @@ class ImportManager:
         self.do_import_python_lib = do_import_python_lib
         self.create_if_not_present = create_if_not_present
         self.raise_on_failure = raise_on_failure
-        self.xml_module_store = self.store_class(
-            data_dir,
-            default_class=default_class,
-            source_dirs=source_dirs,
-            load_error_blocks=load_error_blocks,
-            xblock_mixins=store.xblock_mixins,
-            xblock_select=store.xblock_select,
-            target_course_id=target_id,
-        )
+        if static_content_workers is None:
+            static_content_workers = getattr(settings, 'COURSE_IMPORT_STATIC_CONTENT_WORKERS', 1)
+        self.static_content_workers = static_content_workers
+        self.phase_timings = {}
+        with self.timed_phase('parse'):
+            self.xml_module_store = self.store_class(
+                data_dir,
+                default_class=default_class,
+                source_dirs=source_dirs,
+                load_error_blocks=load_error_blocks,
+                xblock_mixins=store.xblock_mixins,
+                xblock_select=store.xblock_select,
+                target_course_id=target_id,
+            )
         self.logger, self.errors = make_error_tracker()
 
+    @contextmanager
+    def timed_phase(self, phase):
+        """
+        Adds the time taken by the wrapped code to the timing of the given import phase.
+        """
+        start = time()
+        try:
+            yield
+        finally:
+            self.phase_timings[phase] = self.phase_timings.get(phase, 0) + time() - start
+
+    def report_phase_timings(self, dest_id):
+        """
+        Logs the timings of the import phases, and reports them as custom monitoring attributes.
+        """
+        for phase, seconds in self.phase_timings.items():
+            # .. custom_attribute_name: course_import.{phase}_seconds
+            # .. custom_attribute_description: The number of seconds taken by a phase of a course
+            #   import: parse, published (which includes static, asset_metadata and children), drafts or tags.
+            set_custom_attribute(f'course_import.{phase}_seconds', round(seconds, 3))
+        log.info(
+            'Course import %s: phase timings %s',
+            dest_id,
+            ', '.join(f'{phase}={seconds:.2f}s' for phase, seconds in self.phase_timings.items()),
+        )
+
     def preflight(self):
         """
         Perform any pre-import sanity checks.
@@ -316,7 +376,8 @@ class ImportManager:
         static_content_importer = StaticContentImporter(
             self.static_content_store,
             course_data_path=data_path,
-            target_id=dest_id
+            target_id=dest_id,
+            max_workers=self.static_content_workers,
         )
         if self.do_import_static:
             if self.verbose:
@@ -559,36 +620,42 @@ class ImportManager:
             except DuplicateCourseError:
                 continue
 
-            # This bulk operation wraps all the operations to populate the published branch.
-            with self.store.bulk_operations(dest_id):
+            self.phase_timings = {phase: seconds for phase, seconds in self.phase_timings.items() if phase == 'parse'}
+            # This bulk operation wraps all the operations to populate the published branch,
+            # so that split writes the course's structure once, when it ends.
+            with self.timed_phase('published'), self.store.bulk_operations(dest_id):
                 # Retrieve the course itself.
                 source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
 
                 # Import all static pieces.
-                self.import_static(data_path, dest_id)
+                with self.timed_phase('static'):
+                    self.import_static(data_path, dest_id)
 
                 # Import asset metadata stored in XML.
-                self.import_asset_metadata(data_path, dest_id)
+                with self.timed_phase('asset_metadata'):
+                    self.import_asset_metadata(data_path, dest_id)
 
                 # Import all children
-                self.import_children(source_courselike, courselike, courselike_key, dest_id)
+                with self.timed_phase('children'):
+                    self.import_children(source_courselike, courselike, courselike_key, dest_id)
 
             # This bulk operation wraps all the operations to populate the draft branch with any items
             # from the /drafts subdirectory.
             # Drafts must be imported in a separate bulk operation from published items to import properly,
             # due to the recursive_build() above creating a draft item for each course block
             # and then publishing it.
-            with self.store.bulk_operations(dest_id):
+            with self.timed_phase('drafts'), self.store.bulk_operations(dest_id):
                 # Import all draft items into the courselike.
                 courselike = self.import_drafts(courselike, courselike_key, data_path, dest_id)
 
-            with self.store.bulk_operations(dest_id):
+            with self.timed_phase('tags'), self.store.bulk_operations(dest_id):
                 try:
                     self.import_tags(data_path, dest_id)
                 except FileNotFoundError:
                     logging.info(f'Course import {dest_id}: No tags.csv file present.')
                 except ValueError as e:
                     logging.info(f'Course import {dest_id}: {str(e)}')
+            self.report_phase_timings(dest_id)
             yield courselike
 
 